@@ -0,0 +1,60 @@
+"""Request parsing shared by the bulk import routes."""
+import tempfile
+from typing import Any, Iterable
+from fastapi import HTTPException, Request
+from starlette.datastructures import UploadFile
+from app.services.bulk_io import iter_csv_records
+
+# Uploads larger than this are spooled to disk while parsing
+SPOOL_MAX_SIZE = 1024 * 1024
+
+# Request body documentation for routes that read the raw request
+BULK_OPENAPI: dict[str, Any] = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+            "text/csv": {"schema": {"type": "string"}},
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            },
+        },
+    }
+}
+
+
+async def read_bulk_records(request: Request) -> Iterable[dict[str, Any]]:
+    """
+    Turn a bulk request body into an iterable of raw records.
+
+    Accepts a JSON array, a ``text/csv`` body or a multipart CSV upload in
+    a ``file`` field. CSV is parsed lazily from a spooled file, so large
+    uploads are never held in memory as a whole.
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("application/json"):
+        data = await request.json()
+        if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of objects")
+        return data
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(status_code=400, detail="Expected a CSV file in the 'file' field")
+        return iter_csv_records(upload.file)
+
+    if content_type.startswith("text/csv"):
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        return iter_csv_records(spool)
+
+    raise HTTPException(status_code=415, detail="Use application/json, text/csv or multipart/form-data")
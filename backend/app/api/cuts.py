@@ -1,78 +1,138 @@
 """API routes for required cut management."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.bulk import BULK_OPENAPI, read_bulk_records
+from app.api.listing import MAX_PAGE_SIZE, list_response
+from app.api.projects import get_project_id
+from app.database import get_async_db
 from app.models.required_cut import RequiredCut
+from app.schemas.bulk import BulkImportResponse
 from app.schemas.cut import RequiredCutCreate, RequiredCutUpdate, RequiredCutResponse
+from app.services.bulk_io import bulk_insert, stream_csv, stream_json
+
+EXPORT_FIELDS = ["label", "width", "length", "thickness", "quantity"]
 
 router = APIRouter(prefix="/api/cuts", tags=["cuts"])
 
 
 @router.post("/", response_model=RequiredCutResponse, status_code=201)
-def create_required_cut(cut: RequiredCutCreate, db: Session = Depends(get_db)) -> RequiredCut:
+async def create_required_cut(cut: RequiredCutCreate, project_id: str = Depends(get_project_id),
+                              db: AsyncSession = Depends(get_async_db)) -> RequiredCut:
     """Create a new required cut."""
     # Check for duplicate label
-    existing = db.query(RequiredCut).filter(RequiredCut.label == cut.label).first()
+    existing = await db.scalar(select(RequiredCut).where(RequiredCut.project_id == project_id,
+                                                         RequiredCut.label == cut.label))
     if existing:
         raise HTTPException(status_code=400, detail=f"Required cut with label '{cut.label}' already exists")
     
-    db_cut = RequiredCut(**cut.model_dump())
+    db_cut = RequiredCut(**cut.model_dump(), project_id=project_id)
     db.add(db_cut)
-    db.commit()
-    db.refresh(db_cut)
+    await db.commit()
+    await db.refresh(db_cut)
     return db_cut
 
 
 @router.get("/", response_model=list[RequiredCutResponse])
-def list_required_cuts(db: Session = Depends(get_db)) -> list[RequiredCut]:
-    """List all required cuts."""
-    return db.query(RequiredCut).all()
+async def list_required_cuts(request: Request,
+                             limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                             cursor: str | None = None,
+                             fields: str | None = None,
+                             project_id: str = Depends(get_project_id),
+                             db: AsyncSession = Depends(get_async_db)) -> Response:
+    """
+    List required cuts ordered by creation time.
+
+    Supports cursor pagination (limit/cursor), sparse fields and
+    If-None-Match; see list_response.
+    """
+    return await list_response(request, db, RequiredCut, RequiredCutResponse, limit, cursor, fields,
+                               project_id)
+
+
+@router.post("/bulk", response_model=BulkImportResponse, status_code=201, openapi_extra=BULK_OPENAPI)
+async def bulk_create_required_cuts(request: Request,
+                                    project_id: str = Depends(get_project_id),
+                                    db: AsyncSession = Depends(get_async_db)) -> BulkImportResponse:
+    """
+    Create many required cuts in one transaction.
+
+    Accepts a JSON array, a CSV body or a multipart CSV upload with columns
+    label, width, length, thickness and quantity. Nothing is created if any
+    row is invalid or a label already exists.
+    """
+    records = await read_bulk_records(request)
+    try:
+        created = await bulk_insert(db, RequiredCut, RequiredCutCreate, records, project_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return BulkImportResponse(created=created)
+
+
+@router.get("/export")
+async def export_required_cuts(format: Literal["csv", "json"] = "csv",
+                         project_id: str = Depends(get_project_id)) -> StreamingResponse:
+    """Export the project's required cuts as a streamed CSV or JSON file."""
+    if format == "json":
+        return StreamingResponse(stream_json(RequiredCut, EXPORT_FIELDS, project_id), media_type="application/json")
+    return StreamingResponse(
+        stream_csv(RequiredCut, EXPORT_FIELDS, project_id),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="required_cuts.csv"'}
+    )
 
 
 @router.get("/{cut_id}", response_model=RequiredCutResponse)
-def get_required_cut(cut_id: str, db: Session = Depends(get_db)) -> RequiredCut:
+async def get_required_cut(cut_id: str, project_id: str = Depends(get_project_id),
+                           db: AsyncSession = Depends(get_async_db)) -> RequiredCut:
     """Get a specific required cut by ID."""
-    cut = db.query(RequiredCut).filter(RequiredCut.id == cut_id).first()
-    if not cut:
+    cut = await db.get(RequiredCut, cut_id)
+    if not cut or cut.project_id != project_id:
         raise HTTPException(status_code=404, detail="Required cut not found")
     return cut
 
 
 @router.put("/{cut_id}", response_model=RequiredCutResponse)
-def update_required_cut(cut_id: str, updates: RequiredCutUpdate, 
-                       db: Session = Depends(get_db)) -> RequiredCut:
+async def update_required_cut(cut_id: str, updates: RequiredCutUpdate, 
+                             project_id: str = Depends(get_project_id),
+                             db: AsyncSession = Depends(get_async_db)) -> RequiredCut:
     """Update a required cut."""
-    cut = db.query(RequiredCut).filter(RequiredCut.id == cut_id).first()
-    if not cut:
+    cut = await db.get(RequiredCut, cut_id)
+    if not cut or cut.project_id != project_id:
         raise HTTPException(status_code=404, detail="Required cut not found")
     
     # Check for duplicate label if updating
     if updates.label and updates.label != cut.label:
-        existing = db.query(RequiredCut).filter(RequiredCut.label == updates.label).first()
+        existing = await db.scalar(select(RequiredCut).where(RequiredCut.project_id == project_id,
+                                                             RequiredCut.label == updates.label))
         if existing:
             raise HTTPException(status_code=400, detail=f"Required cut with label '{updates.label}' already exists")
     
     for field, value in updates.model_dump(exclude_unset=True).items():
         setattr(cut, field, value)
     
-    db.commit()
-    db.refresh(cut)
+    await db.commit()
+    await db.refresh(cut)
     return cut
 
 
 @router.delete("", status_code=204)
-def delete_all_required_cuts(db: Session = Depends(get_db)) -> None:
-    """Delete all required cuts."""
-    db.query(RequiredCut).delete()
-    db.commit()
+async def delete_all_required_cuts(project_id: str = Depends(get_project_id),
+                                   db: AsyncSession = Depends(get_async_db)) -> None:
+    """Delete all required cuts of the project."""
+    await db.execute(delete(RequiredCut).where(RequiredCut.project_id == project_id))
+    await db.commit()
 
 
 @router.delete("/{cut_id}", status_code=204)
-def delete_required_cut(cut_id: str, db: Session = Depends(get_db)) -> None:
+async def delete_required_cut(cut_id: str, project_id: str = Depends(get_project_id),
+                              db: AsyncSession = Depends(get_async_db)) -> None:
     """Delete a required cut."""
-    cut = db.query(RequiredCut).filter(RequiredCut.id == cut_id).first()
-    if not cut:
+    cut = await db.get(RequiredCut, cut_id)
+    if not cut or cut.project_id != project_id:
         raise HTTPException(status_code=404, detail="Required cut not found")
     
-    db.delete(cut)
-    db.commit()
+    await db.delete(cut)
+    await db.commit()
@@ -0,0 +1,97 @@
+"""Paginated, sparse and conditional list responses shared by the list routes."""
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import String, and_, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.metrics import CACHE_REQUESTS
+from app.services.table_versions import get_table_version
+
+MAX_PAGE_SIZE = 1000
+
+
+def _encode_cursor(created_at: str, row_id: str) -> str:
+    raw = json.dumps([created_at, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return str(created_at), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)  # enums
+
+
+async def list_response(request: Request, db: AsyncSession, model: Any, schema: type[BaseModel],
+                        limit: int | None, cursor: str | None, fields: str | None,
+                        project_id: str) -> Response:
+    """
+    Build a list response for one project's rows ordered by ``created_at``.
+
+    - ``limit``/``cursor``: keyset pagination on (created_at, id); the next
+      page's cursor is returned in the ``X-Next-Cursor`` and ``Link`` headers.
+    - ``fields``: comma-separated subset of the schema's fields; only those
+      columns are selected and returned.
+    - The ETag combines the table's version counter with the query, so an
+      unchanged table answers ``If-None-Match`` with 304 and no body.
+    """
+    names = list(schema.model_fields)
+    if fields:
+        names = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in names if f not in schema.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    table = model.__tablename__
+    version = await get_table_version(db, table)
+    query_key = hashlib.sha1(f"{project_id}|{limit}|{cursor}|{','.join(names)}".encode()).hexdigest()[:12]
+    etag = f'W/"{table}-{version}-{query_key}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag in request.headers.get("if-none-match", ""):
+        CACHE_REQUESTS.inc(cache=table, result="hit")
+        return Response(status_code=304, headers=headers)
+    CACHE_REQUESTS.inc(cache=table, result="miss")
+
+    # The cursor compares created_at as stored (text in SQLite), so rows
+    # written in the same second are neither skipped nor repeated
+    stored_created_at = type_coerce(model.created_at, String)
+    columns = [getattr(model, c) for c in names if c != "id"]
+    query = (
+        select(model.id, stored_created_at.label("cursor_created_at"), *columns)
+        .where(model.project_id == project_id)
+        .order_by(model.created_at, model.id)
+    )
+    if cursor:
+        created_at, row_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            stored_created_at > created_at,
+            and_(stored_created_at == created_at, model.id > row_id)
+        ))
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(last.cursor_created_at, last.id)
+        headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    content = [{name: _json_value(getattr(row, name)) for name in names} for row in rows]
+    return JSONResponse(content=content, headers=headers)
@@ -1,35 +1,163 @@
 """API routes for cutting plan optimization."""
+import uuid
+from dataclasses import asdict
+from typing import Any, AsyncIterator
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.plan import OptimizationRequest, CuttingPlanResponse
-from app.services.cutting_service import create_optimization_plan
-from app.services.print_template import generate_print_html
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.projects import get_project_id
+from app.config import settings
+from app.database import AsyncSessionLocal, get_async_db
+from app.schemas.plan import (OptimizationRequest, ColumnarCuttingPlanResponse, CuttingPlanResponse, EngineResponse,
+                              PurchasePlanResponse, PurchaseRequest)
+from app.services.admission import AdmissionRejected
+from app.services.cutting_service import create_optimization_plan, create_preview_plan, create_purchase_plan
+from app.services.engines import ENGINES
+from app.services.plan_format import COLUMNAR
+from app.services.profiling import FIXTURE, artifact_path
+from app.services.purchase import SheetType
+from app.services.print_template import generate_print_html, print_plan_data
 
 router = APIRouter(prefix="/api/optimize", tags=["optimization"])
 
 
-@router.post("/", response_model=CuttingPlanResponse)
-def optimize_cutting_plan(request: OptimizationRequest, 
-                          db: Session = Depends(get_db)) -> CuttingPlanResponse:
+def admission_error(e: AdmissionRejected) -> HTTPException:
+    """429/503 response for a job admission control turned away."""
+    return HTTPException(status_code=e.status_code, detail=e.detail,
+                         headers={"Retry-After": str(e.retry_after)})
+
+
+async def refine_plan(request: OptimizationRequest, project_id: str, plan_id: str,
+                      preview: dict[str, Any] | None) -> AsyncIterator[bytes]:
+    """
+    NDJSON lines of a previewed optimization: the preview (unless the job
+    is too large for one), then the full plan stored under plan_id, or an
+    error line in its place.
+    """
+    if preview is not None:
+        yield orjson.dumps(preview) + b"\n"
+    # The request's session is closed once streaming starts
+    async with AsyncSessionLocal() as db:
+        try:
+            body = await create_optimization_plan(db, project_id, kerf_width=request.kerf_width,
+                                                  minimize_saw_time=request.minimize_saw_time,
+                                                  use_remnants=request.use_remnants,
+                                                  algorithm=request.algorithm,
+                                                  time_limit=request.time_limit,
+                                                  warm_start_plan_id=request.warm_start_plan_id,
+                                                  random_seed=request.random_seed,
+                                                  restarts=request.restarts,
+                                                  columnar=request.response_format == COLUMNAR,
+                                                  plan_id=plan_id)
+        except AdmissionRejected as e:
+            body = {"id": plan_id, "error": e.detail, "status_code": e.status_code}
+        except ValueError as e:
+            body = {"id": plan_id, "error": str(e), "status_code": 400}
+        except Exception as e:
+            body = {"id": plan_id, "error": f"Optimization failed: {str(e)}", "status_code": 500}
+    yield orjson.dumps(body) + b"\n"
+
+
+@router.post("/", response_model=CuttingPlanResponse | ColumnarCuttingPlanResponse, response_class=ORJSONResponse,
+             responses={200: {"content": {"application/x-ndjson": {}},
+                              "description": "The plan, or with preview an NDJSON stream of plans"}})
+async def optimize_cutting_plan(request: OptimizationRequest,
+                                project_id: str = Depends(get_project_id),
+                                db: AsyncSession = Depends(get_async_db)) -> ORJSONResponse | StreamingResponse:
     """
     Generate an optimized cutting plan.
     
-    Analyzes all stock sheets and required cuts to produce an optimal
-    cutting plan that minimizes waste and sheets used.
+    Analyzes the project's stock sheets and required cuts to produce an optimal
+    cutting plan that minimizes waste and sheets used. With
+    ``response_format: "columnar"`` the plan comes back in the compact
+    columnar form described in plan_format. ``profile`` and
+    ``dump_fixture`` (when PROFILING_ENABLED is set) add links to a
+    cProfile run and a replayable copy of the inputs. ``algorithm`` picks
+    the packing engine (``auto`` by default); ``warm_start_plan_id`` keeps
+    the still-valid sheets of an earlier plan unless the engine beats it.
+    ``restarts`` runs a fixed number of seeded search restarts instead of
+    a time limit; the same inputs and ``random_seed`` reproduce the plan.
+
+    With ``preview`` the response is NDJSON: first a quick unsaved plan
+    flagged ``preview: true``, then the full plan under the same id (or an
+    ``error`` line with its ``status_code`` if the full solve fails). Jobs
+    above PREVIEW_MAX_PIECES pieces stream the full plan only.
     """
+    if request.preview:
+        if request.profile or request.dump_fixture:
+            raise HTTPException(status_code=400, detail="Profiling can't be combined with preview")
+        plan_id = str(uuid.uuid4())
+        try:
+            preview = await create_preview_plan(db, plan_id, project_id, kerf_width=request.kerf_width,
+                                                use_remnants=request.use_remnants,
+                                                algorithm=request.algorithm,
+                                                time_limit=request.time_limit,
+                                                restarts=request.restarts,
+                                                columnar=request.response_format == COLUMNAR)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(refine_plan(request, project_id, plan_id, preview),
+                                 media_type="application/x-ndjson")
+
     try:
-        return create_optimization_plan(db, kerf_width=request.kerf_width)
+        body = await create_optimization_plan(db, project_id, kerf_width=request.kerf_width,
+                                              minimize_saw_time=request.minimize_saw_time,
+                                              use_remnants=request.use_remnants,
+                                              algorithm=request.algorithm,
+                                              time_limit=request.time_limit,
+                                              warm_start_plan_id=request.warm_start_plan_id,
+                                              random_seed=request.random_seed,
+                                              restarts=request.restarts,
+                                              columnar=request.response_format == COLUMNAR,
+                                              profile=request.profile,
+                                              dump_fixture=request.dump_fixture)
+    except AdmissionRejected as e:
+        raise admission_error(e)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
 
+    return ORJSONResponse(body)
+
+
+@router.get("/engines", response_model=list[EngineResponse])
+async def list_engines() -> list[dict]:
+    """List the packing engines an optimization can ask for, with their capabilities."""
+    return [asdict(engine.info) for engine in ENGINES.values()]
+
+
+@router.post("/purchase", response_model=PurchasePlanResponse, response_class=ORJSONResponse)
+async def plan_stock_purchase(request: PurchaseRequest,
+                              project_id: str = Depends(get_project_id),
+                              db: AsyncSession = Depends(get_async_db)) -> ORJSONResponse:
+    """
+    Choose which sheet sizes to buy for the project's cuts.
+
+    Given candidate sheet sizes with unit prices (in unlimited quantity),
+    returns the cheapest mix that fits every cut, with its cutting plan.
+    The project's stock is ignored and the plan is not stored.
+    """
+    sheet_types = [SheetType(t.label, t.width, t.length, t.thickness, t.unit_price) for t in request.sheet_types]
+    try:
+        body = await create_purchase_plan(db, sheet_types, project_id, kerf_width=request.kerf_width,
+                                          minimize_saw_time=request.minimize_saw_time)
+    except AdmissionRejected as e:
+        raise admission_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Purchase planning failed: {str(e)}")
+    return ORJSONResponse(body)
+
 
 @router.post("/print", response_class=HTMLResponse)
-def export_print_view(request: OptimizationRequest,
-                      db: Session = Depends(get_db)) -> str:
+async def export_print_view(request: OptimizationRequest,
+                            project_id: str = Depends(get_project_id),
+                            db: AsyncSession = Depends(get_async_db)) -> str:
     """
     Generate print-ready HTML for cutting instructions.
     
@@ -43,37 +171,36 @@ def export_print_view(request: OptimizationRequest,
     """
     try:
         # Get the cutting plan
-        plan = create_optimization_plan(db, kerf_width=request.kerf_width)
-        
-        # Convert to dict for template
-        plan_dict = {
-            "assignments": [
-                {
-                    "cut": {
-                        "label": assignment.cut_label,
-                        "width": assignment.cut_width,
-                        "length": assignment.cut_length,
-                        "thickness": assignment.cut_thickness
-                    },
-                    "sheet": {
-                        "label": assignment.sheet_label,
-                        "width": assignment.sheet_width,
-                        "length": assignment.sheet_length
-                    },
-                    "x_position": assignment.x_position,
-                    "y_position": assignment.y_position,
-                    "rotation": assignment.rotation,
-                    "sequence_number": assignment.sequence_number
-                }
-                for assignment in plan.assignments
-            ],
-            "kerf_width": plan.kerf_width
-        }
+        plan = await create_optimization_plan(db, project_id, kerf_width=request.kerf_width,
+                                              minimize_saw_time=request.minimize_saw_time,
+                                              use_remnants=request.use_remnants,
+                                              algorithm=request.algorithm,
+                                              time_limit=request.time_limit,
+                                              warm_start_plan_id=request.warm_start_plan_id,
+                                              random_seed=request.random_seed,
+                                              restarts=request.restarts)
         
         # Generate print HTML
-        return generate_print_html(plan_dict)
+        return generate_print_html(print_plan_data(plan))
         
+    except AdmissionRejected as e:
+        raise admission_error(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Print generation failed: {str(e)}")
+
+
+@router.get("/artifacts/{artifact_id}/{kind}", response_class=FileResponse)
+async def download_artifact(artifact_id: str, kind: str) -> FileResponse:
+    """
+    Download the profile (``.prof``, for pstats or snakeviz) or input
+    fixture (``.json``) of a profiled optimization.
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=403, detail="Profiling is disabled on this server")
+    path = artifact_path(artifact_id, kind)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    media_type = "application/json" if kind == FIXTURE else "application/octet-stream"
+    return FileResponse(str(path), media_type=media_type, filename=path.name)
@@ -0,0 +1,43 @@
+"""API routes for stored cutting plans."""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.projects import get_project_id
+from app.database import get_async_db
+from app.models.cutting_plan import CuttingPlan
+from app.services.export_service import EXPORT_FORMATS, ExportFormat, check_plan_export, stream_plan_export
+
+router = APIRouter(prefix="/api/plans", tags=["plans"])
+
+
+@router.get("/{plan_id}/export")
+async def export_plan(plan_id: str, format: ExportFormat = "csv",
+                      sheet: Optional[int] = Query(default=None, ge=1, description="Export only this sheet"),
+                      project_id: str = Depends(get_project_id),
+                      db: AsyncSession = Depends(get_async_db)) -> StreamingResponse:
+    """
+    Export a stored cutting plan for the workshop machines as a streamed file.
+
+    ``csv`` is a cut list with one row per piece, ``dxf`` draws the sheet
+    outlines and pieces for a CNC router (sheets side by side, in mm) and
+    ``saw`` is a plain-text panel saw program of each sheet's guillotine
+    cut sequence. ``sheet`` limits the export to one sheet.
+    """
+    plan = await db.get(CuttingPlan, plan_id)
+    if not plan or plan.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Cutting plan not found")
+    if sheet is not None and sheet > (plan.sheets_used or 0):
+        raise HTTPException(status_code=404, detail="Sheet not found in cutting plan")
+    try:
+        await check_plan_export(db, plan)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media_type, suffix = EXPORT_FORMATS[format]
+    name = f"plan-{plan.id[:8]}" + (f"-sheet-{sheet}" if sheet else "")
+    return StreamingResponse(
+        stream_plan_export(plan, format, sheet),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}{suffix}"'}
+    )
@@ -0,0 +1,76 @@
+"""API routes for projects and the project scope of every other route."""
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.cutting_plan import CuttingPlan
+from app.models.plan_assignment import PlanAssignment
+from app.models.project import DEFAULT_PROJECT_ID, Project
+from app.models.required_cut import RequiredCut
+from app.models.stock_sheet import StockSheet
+from app.schemas.project import ProjectCreate, ProjectResponse
+
+router = APIRouter(prefix="/api/projects", tags=["projects"])
+
+
+async def get_project_id(project_id: str | None = Query(None, description="Project to work in"),
+                         x_project_id: str | None = Header(None),
+                         db: AsyncSession = Depends(get_async_db)) -> str:
+    """
+    Resolve the project a request works in.
+
+    Taken from the ``project_id`` query parameter (usable in download
+    links) or the ``X-Project-Id`` header, defaulting to the default
+    project.
+    """
+    project_id = project_id or x_project_id or DEFAULT_PROJECT_ID
+    if project_id != DEFAULT_PROJECT_ID and await db.get(Project, project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project_id
+
+
+@router.post("/", response_model=ProjectResponse, status_code=201)
+async def create_project(project: ProjectCreate, db: AsyncSession = Depends(get_async_db)) -> Project:
+    """Create a new project."""
+    existing = await db.scalar(select(Project).where(Project.name == project.name))
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Project with name '{project.name}' already exists")
+
+    db_project = Project(**project.model_dump())
+    db.add(db_project)
+    await db.commit()
+    await db.refresh(db_project)
+    return db_project
+
+
+@router.get("/", response_model=list[ProjectResponse])
+async def list_projects(db: AsyncSession = Depends(get_async_db)) -> list[Project]:
+    """List all projects."""
+    return list((await db.scalars(select(Project).order_by(Project.created_at, Project.id))).all())
+
+
+@router.get("/{project_id}", response_model=ProjectResponse)
+async def get_project(project_id: str, db: AsyncSession = Depends(get_async_db)) -> Project:
+    """Get a specific project by ID."""
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+
+@router.delete("/{project_id}", status_code=204)
+async def delete_project(project_id: str, db: AsyncSession = Depends(get_async_db)) -> None:
+    """Delete a project with its stock sheets, required cuts and plans."""
+    if project_id == DEFAULT_PROJECT_ID:
+        raise HTTPException(status_code=400, detail="The default project cannot be deleted")
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    plan_ids = select(CuttingPlan.id).where(CuttingPlan.project_id == project_id)
+    await db.execute(delete(PlanAssignment).where(PlanAssignment.plan_id.in_(plan_ids)))
+    await db.execute(delete(CuttingPlan).where(CuttingPlan.project_id == project_id))
+    await db.execute(delete(RequiredCut).where(RequiredCut.project_id == project_id))
+    await db.execute(delete(StockSheet).where(StockSheet.project_id == project_id))
+    await db.delete(project)
+    await db.commit()
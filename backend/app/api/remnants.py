@@ -0,0 +1,69 @@
+"""API routes for the remnant (offcut) inventory."""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.projects import get_project_id
+from app.database import get_async_db
+from app.models.cutting_plan import CuttingPlan
+from app.models.remnant import Remnant
+from app.schemas.remnant import RemnantResponse, RemnantHarvestRequest, RemnantHarvestResponse
+from app.services.remnant_service import harvest_plan_remnants
+
+router = APIRouter(prefix="/api/remnants", tags=["remnants"])
+
+
+@router.get("/", response_model=list[RemnantResponse])
+async def list_remnants(thickness: float | None = None,
+                        db: AsyncSession = Depends(get_async_db)) -> list[Remnant]:
+    """List stored remnants, optionally of one thickness, smallest first."""
+    query = select(Remnant).where(Remnant.consumed_plan_id.is_(None))
+    if thickness is not None:
+        query = query.where(Remnant.thickness == thickness)
+    result = await db.scalars(query.order_by(Remnant.thickness, Remnant.width, Remnant.length))
+    return list(result.all())
+
+
+@router.post("/harvest/{plan_id}", response_model=RemnantHarvestResponse, status_code=201)
+async def harvest_remnants(plan_id: str, request: RemnantHarvestRequest,
+                           project_id: str = Depends(get_project_id),
+                           db: AsyncSession = Depends(get_async_db)) -> RemnantHarvestResponse:
+    """
+    Save the usable offcuts of a cutting plan to the remnant inventory.
+
+    Call this once the plan is actually being cut: remnants the plan used
+    are removed from the inventory and its offcuts above the minimum size
+    are added.
+    """
+    plan = await db.get(CuttingPlan, plan_id)
+    if not plan or plan.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Cutting plan not found")
+
+    try:
+        created, consumed = await harvest_plan_remnants(db, plan, request.min_width, request.min_length)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return RemnantHarvestResponse(
+        plan_id=plan.id,
+        created=[RemnantResponse.model_validate(r) for r in created],
+        consumed=consumed
+    )
+
+
+@router.delete("", status_code=204)
+async def delete_all_remnants(db: AsyncSession = Depends(get_async_db)) -> None:
+    """Delete all remnants still in the inventory."""
+    # Consumed remnants stay for the assignments of the plans that cut them
+    await db.execute(delete(Remnant).where(Remnant.consumed_plan_id.is_(None)))
+    await db.commit()
+
+
+@router.delete("/{remnant_id}", status_code=204)
+async def delete_remnant(remnant_id: str, db: AsyncSession = Depends(get_async_db)) -> None:
+    """Delete a remnant."""
+    remnant = await db.get(Remnant, remnant_id)
+    if not remnant or remnant.consumed_plan_id:
+        raise HTTPException(status_code=404, detail="Remnant not found")
+    
+    await db.delete(remnant)
+    await db.commit()
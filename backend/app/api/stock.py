@@ -1,78 +1,138 @@
 """API routes for stock sheet management."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.bulk import BULK_OPENAPI, read_bulk_records
+from app.api.listing import MAX_PAGE_SIZE, list_response
+from app.api.projects import get_project_id
+from app.database import get_async_db
 from app.models.stock_sheet import StockSheet
+from app.schemas.bulk import BulkImportResponse
 from app.schemas.stock import StockSheetCreate, StockSheetUpdate, StockSheetResponse
+from app.services.bulk_io import bulk_insert, stream_csv, stream_json
+
+EXPORT_FIELDS = ["label", "width", "length", "thickness", "quantity", "priority"]
 
 router = APIRouter(prefix="/api/stock", tags=["stock"])
 
 
 @router.post("/", response_model=StockSheetResponse, status_code=201)
-def create_stock_sheet(sheet: StockSheetCreate, db: Session = Depends(get_db)) -> StockSheet:
+async def create_stock_sheet(sheet: StockSheetCreate, project_id: str = Depends(get_project_id),
+                             db: AsyncSession = Depends(get_async_db)) -> StockSheet:
     """Create a new stock sheet."""
     # Check for duplicate label
-    existing = db.query(StockSheet).filter(StockSheet.label == sheet.label).first()
+    existing = await db.scalar(select(StockSheet).where(StockSheet.project_id == project_id,
+                                                        StockSheet.label == sheet.label))
     if existing:
         raise HTTPException(status_code=400, detail=f"Stock sheet with label '{sheet.label}' already exists")
     
-    db_sheet = StockSheet(**sheet.model_dump())
+    db_sheet = StockSheet(**sheet.model_dump(), project_id=project_id)
     db.add(db_sheet)
-    db.commit()
-    db.refresh(db_sheet)
+    await db.commit()
+    await db.refresh(db_sheet)
     return db_sheet
 
 
 @router.get("/", response_model=list[StockSheetResponse])
-def list_stock_sheets(db: Session = Depends(get_db)) -> list[StockSheet]:
-    """List all stock sheets."""
-    return db.query(StockSheet).all()
+async def list_stock_sheets(request: Request,
+                            limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                            cursor: str | None = None,
+                            fields: str | None = None,
+                            project_id: str = Depends(get_project_id),
+                            db: AsyncSession = Depends(get_async_db)) -> Response:
+    """
+    List stock sheets ordered by creation time.
+
+    Supports cursor pagination (limit/cursor), sparse fields and
+    If-None-Match; see list_response.
+    """
+    return await list_response(request, db, StockSheet, StockSheetResponse, limit, cursor, fields,
+                               project_id)
+
+
+@router.post("/bulk", response_model=BulkImportResponse, status_code=201, openapi_extra=BULK_OPENAPI)
+async def bulk_create_stock_sheets(request: Request,
+                                   project_id: str = Depends(get_project_id),
+                                   db: AsyncSession = Depends(get_async_db)) -> BulkImportResponse:
+    """
+    Create many stock sheets in one transaction.
+
+    Accepts a JSON array, a CSV body or a multipart CSV upload with columns
+    label, width, length, thickness, quantity and priority. Nothing is
+    created if any row is invalid or a label already exists.
+    """
+    records = await read_bulk_records(request)
+    try:
+        created = await bulk_insert(db, StockSheet, StockSheetCreate, records, project_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return BulkImportResponse(created=created)
+
+
+@router.get("/export")
+async def export_stock_sheets(format: Literal["csv", "json"] = "csv",
+                        project_id: str = Depends(get_project_id)) -> StreamingResponse:
+    """Export the project's stock sheets as a streamed CSV or JSON file."""
+    if format == "json":
+        return StreamingResponse(stream_json(StockSheet, EXPORT_FIELDS, project_id), media_type="application/json")
+    return StreamingResponse(
+        stream_csv(StockSheet, EXPORT_FIELDS, project_id),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="stock_sheets.csv"'}
+    )
 
 
 @router.get("/{sheet_id}", response_model=StockSheetResponse)
-def get_stock_sheet(sheet_id: str, db: Session = Depends(get_db)) -> StockSheet:
+async def get_stock_sheet(sheet_id: str, project_id: str = Depends(get_project_id),
+                          db: AsyncSession = Depends(get_async_db)) -> StockSheet:
     """Get a specific stock sheet by ID."""
-    sheet = db.query(StockSheet).filter(StockSheet.id == sheet_id).first()
-    if not sheet:
+    sheet = await db.get(StockSheet, sheet_id)
+    if not sheet or sheet.project_id != project_id:
         raise HTTPException(status_code=404, detail="Stock sheet not found")
     return sheet
 
 
 @router.put("/{sheet_id}", response_model=StockSheetResponse)
-def update_stock_sheet(sheet_id: str, updates: StockSheetUpdate, 
-                       db: Session = Depends(get_db)) -> StockSheet:
+async def update_stock_sheet(sheet_id: str, updates: StockSheetUpdate, 
+                             project_id: str = Depends(get_project_id),
+                             db: AsyncSession = Depends(get_async_db)) -> StockSheet:
     """Update a stock sheet."""
-    sheet = db.query(StockSheet).filter(StockSheet.id == sheet_id).first()
-    if not sheet:
+    sheet = await db.get(StockSheet, sheet_id)
+    if not sheet or sheet.project_id != project_id:
         raise HTTPException(status_code=404, detail="Stock sheet not found")
     
     # Check for duplicate label if updating
     if updates.label and updates.label != sheet.label:
-        existing = db.query(StockSheet).filter(StockSheet.label == updates.label).first()
+        existing = await db.scalar(select(StockSheet).where(StockSheet.project_id == project_id,
+                                                            StockSheet.label == updates.label))
         if existing:
             raise HTTPException(status_code=400, detail=f"Stock sheet with label '{updates.label}' already exists")
     
     for field, value in updates.model_dump(exclude_unset=True).items():
         setattr(sheet, field, value)
     
-    db.commit()
-    db.refresh(sheet)
+    await db.commit()
+    await db.refresh(sheet)
     return sheet
 
 
 @router.delete("", status_code=204)
-def delete_all_stock_sheets(db: Session = Depends(get_db)) -> None:
-    """Delete all stock sheets."""
-    db.query(StockSheet).delete()
-    db.commit()
+async def delete_all_stock_sheets(project_id: str = Depends(get_project_id),
+                                  db: AsyncSession = Depends(get_async_db)) -> None:
+    """Delete all stock sheets of the project."""
+    await db.execute(delete(StockSheet).where(StockSheet.project_id == project_id))
+    await db.commit()
 
 
 @router.delete("/{sheet_id}", status_code=204)
-def delete_stock_sheet(sheet_id: str, db: Session = Depends(get_db)) -> None:
+async def delete_stock_sheet(sheet_id: str, project_id: str = Depends(get_project_id),
+                             db: AsyncSession = Depends(get_async_db)) -> None:
     """Delete a stock sheet."""
-    sheet = db.query(StockSheet).filter(StockSheet.id == sheet_id).first()
-    if not sheet:
+    sheet = await db.get(StockSheet, sheet_id)
+    if not sheet or sheet.project_id != project_id:
         raise HTTPException(status_code=404, detail="Stock sheet not found")
     
-    db.delete(sheet)
-    db.commit()
+    await db.delete(sheet)
+    await db.commit()
@@ -0,0 +1,107 @@
+"""API routes for stock storage carry-over between projects."""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.projects import get_project_id
+from app.database import get_async_db
+from app.models.required_cut import RequiredCut
+from app.models.stock_sheet import StockSheet
+from app.models.stored_sheet import StoredSheet
+from app.schemas.stock import StockSheetResponse
+from app.schemas.storage import StoredSheetCreate, StoredSheetResponse, NewProjectResponse
+
+router = APIRouter(prefix="/api/storage", tags=["storage"])
+
+STORED_LABEL_PREFIX = "[Stored] "
+
+
+@router.get("/", response_model=list[StoredSheetResponse])
+async def list_stored_sheets(db: AsyncSession = Depends(get_async_db)) -> list[StoredSheet]:
+    """List all sheets in storage."""
+    return list((await db.scalars(select(StoredSheet))).all())
+
+
+@router.post("/", response_model=list[StoredSheetResponse], status_code=201)
+async def store_sheets(sheets: list[StoredSheetCreate],
+                       db: AsyncSession = Depends(get_async_db)) -> list[StoredSheet]:
+    """
+    Send sheets to storage in one transaction.
+
+    Sheets whose label is already in storage add to its quantity.
+    """
+    labels = list(dict.fromkeys(s.label for s in sheets))
+    stored = {
+        s.label: s
+        for s in await db.scalars(select(StoredSheet).where(StoredSheet.label.in_(labels)))
+    }
+
+    for sheet in sheets:
+        existing = stored.get(sheet.label)
+        if existing is None:
+            existing = StoredSheet(**sheet.model_dump())
+            db.add(existing)
+            stored[sheet.label] = existing
+            continue
+        if (existing.width, existing.length, existing.thickness) != (sheet.width, sheet.length, sheet.thickness):
+            raise HTTPException(status_code=400,
+                                detail=f"Stored sheet '{sheet.label}' has different dimensions")
+        existing.quantity += sheet.quantity
+
+    await db.commit()
+    result = [stored[label] for label in labels]
+    for s in result:
+        await db.refresh(s)
+    return result
+
+
+@router.put("/", response_model=list[StoredSheetResponse])
+async def replace_stored_sheets(sheets: list[StoredSheetCreate],
+                                db: AsyncSession = Depends(get_async_db)) -> list[StoredSheet]:
+    """Replace the contents of storage in one transaction."""
+    await db.execute(delete(StoredSheet))
+    return await store_sheets(sheets, db)
+
+
+@router.delete("", status_code=204)
+async def clear_storage(db: AsyncSession = Depends(get_async_db)) -> None:
+    """Delete all sheets in storage."""
+    await db.execute(delete(StoredSheet))
+    await db.commit()
+
+
+@router.post("/new-project", response_model=NewProjectResponse)
+async def start_new_project(project_id: str = Depends(get_project_id),
+                            db: AsyncSession = Depends(get_async_db)) -> NewProjectResponse:
+    """
+    Start over in a project in one transaction.
+
+    Clears the project's required cuts and stock sheets, loads every stored
+    sheet as its stock and empties storage. Storage itself is shared by all
+    projects, like the shelf it models.
+    """
+    stored = list((await db.scalars(select(StoredSheet))).all())
+
+    await db.execute(delete(RequiredCut).where(RequiredCut.project_id == project_id))
+    await db.execute(delete(StockSheet).where(StockSheet.project_id == project_id))
+    db.add_all([
+        StockSheet(
+            project_id=project_id,
+            width=s.width,
+            length=s.length,
+            thickness=s.thickness,
+            label=f"{STORED_LABEL_PREFIX}{s.label}"[:100],
+            quantity=s.quantity,
+            priority=s.priority
+        )
+        for s in stored
+    ])
+    await db.execute(delete(StoredSheet))
+    await db.commit()
+
+    return NewProjectResponse(
+        stock_sheets=[
+            StockSheetResponse.model_validate(s)
+            for s in await db.scalars(select(StockSheet).where(StockSheet.project_id == project_id))
+        ],
+        loaded_from_storage=len(stored)
+    )
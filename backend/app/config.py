@@ -0,0 +1,73 @@
+"""Application settings, read from environment variables."""
+import os
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    """Deployment settings. Each field can be set with the upper-case env var."""
+
+    # Database URL, defaults to SQLite in the container's data volume
+    database_url: str = "sqlite:////app/data/woodcutter.db"
+    # Async driver URL for the API routes; derived from database_url for SQLite
+    async_database_url: str | None = None
+
+    # SQLite storage profile, applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"  # safe with WAL, far fewer fsyncs than FULL
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size: int = 268435456
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Plan retention: plans older than this many days, or beyond the newest
+    # N plans of their project, are deleted with their assignments (0 disables;
+    # both are off by default so upgrading never deletes saved plans)
+    plan_retention_days: int = 0
+    plan_retention_max_plans: int = 0
+
+    # Hours between maintenance runs: retention, ANALYZE, VACUUM (0 disables)
+    maintenance_interval_hours: float = 24.0
+    # Free-page ratio above which maintenance rebuilds the file with VACUUM
+    vacuum_free_ratio: float = 0.2
+
+    # Worker processes for optimizer runs, leaving a core for the API
+    # (0 runs the optimizer in the API's thread pool instead)
+    optimizer_workers: int = max(1, (os.cpu_count() or 2) - 1)
+    # Jobs a worker runs before it is replaced, capping memory growth (0 = never)
+    solver_max_tasks_per_child: int = 200
+
+    # Admission control for the optimize routes. Jobs of up to
+    # small_job_pieces pieces use the small lane, bigger ones the large
+    # lane; each lane caps running solves and the queue waiting for them
+    small_job_pieces: int = 500
+    small_lane_concurrency: int = 2
+    small_lane_queue: int = 32
+    large_lane_concurrency: int = 1
+    large_lane_queue: int = 4
+    # Seconds a queued job waits for a slot before it is turned away
+    admission_queue_timeout: float = 30.0
+
+    # Previews (preview: true) skip admission control and pack in the API
+    # process, so only jobs of up to this many pieces get one
+    preview_max_pieces: int = 2000
+    # algorithm "auto": jobs above this many pieces use the fast shelf engine
+    auto_fast_engine_pieces: int = 5000
+    # Packings the purchase planner tries per thickness before settling
+    # for the cheapest purchase found so far
+    purchase_max_evaluations: int = 500
+    # Processes one seeded search (algorithm "search") restarts in; results
+    # with a restart count don't depend on it
+    search_workers: int = 1
+
+    # Responses of at least this many bytes are compressed (brotli when the
+    # client accepts it and the brotli package is installed, else gzip)
+    compression_minimum_size: int = 1024
+
+    # Allow optimize requests to ask for a cProfile run (profile) and to
+    # save their inputs as a replayable fixture (dump_fixture)
+    profiling_enabled: bool = False
+    profile_dir: str = "/app/data/profiles"
+    # Hotspots listed in a profiled response
+    profile_top_n: int = 20
+
+
+settings = Settings()
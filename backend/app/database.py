@@ -1,11 +1,16 @@
 """Database configuration and session management."""
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
+from typing import AsyncIterator
+from sqlalchemy import Connection, Table, UniqueConstraint, create_engine, event, insert, inspect, select, text
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import ConnectionPoolEntry
+from sqlalchemy.schema import CreateColumn
+from app.config import settings
 
 # Database URL from environment or default to SQLite
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:////app/data/woodcutter.db")
+DATABASE_URL = settings.database_url
+ASYNC_DATABASE_URL = settings.async_database_url or DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
 
 # Create engine
 engine = create_engine(
@@ -14,17 +19,107 @@ engine = create_engine(
     echo=False  # Set to True for SQL query logging
 )
 
-# Create session factory
+
+def _apply_sqlite_pragmas(dbapi_connection: DBAPIConnection, connection_record: ConnectionPoolEntry) -> None:
+    """Apply the SQLite storage profile from settings to a new connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+# Async engine for the API routes, so database waits don't hold a thread
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+# Create session factories: routes use AsyncSessionLocal; SessionLocal is for
+# maintenance, which runs in a background thread (see services.maintenance)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for models
-Base = declarative_base()
+class Base(DeclarativeBase):
+    pass
+
 
 # Dependency for FastAPI routes
-def get_db():
-    """Get database session."""
-    db = SessionLocal()
-    try:
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def _rebuild_table(conn: Connection, table: Table) -> None:
+    """
+    Recreate a SQLite table from its model and copy its rows over.
+
+    SQLite can't drop a constraint, so this is how a unique constraint
+    or a NOT NULL the model no longer declares is removed.
+    """
+    inspector = inspect(conn)
+    old_columns = {c["name"] for c in inspector.get_columns(table.name)}
+    for index in inspector.get_indexes(table.name):
+        conn.execute(text(f'DROP INDEX IF EXISTS "{index["name"]}"'))
+    legacy = f"_{table.name}_legacy"
+    conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {legacy}"))
+    table.create(bind=conn)
+    columns = ", ".join(c.name for c in table.columns if c.name in old_columns)
+    conn.execute(text(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {legacy}"))
+    conn.execute(text(f"DROP TABLE {legacy}"))
+
+
+def init_db() -> None:
+    """
+    Create all tables and bring tables created by older versions up to date.
+
+    ``create_all`` never alters existing tables, so columns added to a model
+    later are appended with ``ALTER TABLE ... ADD COLUMN`` (with their
+    server default), tables still carrying a unique constraint or a NOT
+    NULL the model dropped are rebuilt, new indexes are created if missing and the
+    default project is seeded.
+    """
+    # Register every model on Base.metadata
+    from app.models import (  # noqa: F401
+        project, stock_sheet, required_cut, cutting_plan, plan_assignment, remnant, stored_sheet,
+        table_version
+    )
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)  # type: ignore[no-untyped-call]
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+
+            declared = {
+                tuple(sorted(c.name for c in constraint.columns))
+                for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+            } | {(c.name,) for c in table.columns if c.unique}
+            stale = [
+                u for u in inspector.get_unique_constraints(table.name)
+                if tuple(sorted(u["column_names"])) not in declared
+            ]
+            relaxed = [
+                c for c in inspector.get_columns(table.name)
+                if not c["nullable"] and c["name"] in table.columns and table.columns[c["name"]].nullable
+            ]
+            if (stale or relaxed) and engine.dialect.name == "sqlite":
+                _rebuild_table(conn, table)
+
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+        default = select(project.Project.id).where(project.Project.id == project.DEFAULT_PROJECT_ID)
+        if conn.execute(default).first() is None:
+            conn.execute(insert(project.Project).values(id=project.DEFAULT_PROJECT_ID, name="Default"))
@@ -1,5 +1,6 @@
 """FastAPI application initialization."""
-from fastapi import FastAPI, Request
+from typing import Any, Awaitable, Callable
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
@@ -28,9 +29,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (plans, exports); registered after CORS so it
+# wraps the already-finished response
+from app.config import settings
+from app.services.compression import CompressionMiddleware
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
 # Error handling middleware
 @app.middleware("http")
-async def error_handling_middleware(request: Request, call_next):
+async def error_handling_middleware(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
     """
     Global error handling middleware.
     Catches exceptions and returns consistent error responses.
@@ -92,13 +99,22 @@ if static_path.exists():
 
 # Health check endpoint
 @app.get("/health")
-async def health_check():
+async def health_check() -> dict[str, Any]:
     """Health check endpoint."""
-    return {"status": "healthy", "service": "woodcutter"}
+    from app.services.solver_pool import solver_pool_health
+    return {"status": "healthy", "service": "woodcutter", "solver_pool": await solver_pool_health()}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Request latencies, optimizer phase timings, cache and queue metrics."""
+    from fastapi.responses import PlainTextResponse
+    from app.services.metrics import CONTENT_TYPE, REGISTRY
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
 
 # Root endpoint - serve index.html
-@app.get("/")
-async def root():
+@app.get("/", response_model=None)
+async def root() -> Response | dict[str, str]:
     """Serve the frontend application."""
     from fastapi.responses import FileResponse
     index_path = static_path / "index.html"
@@ -106,16 +122,45 @@ async def root():
         return FileResponse(str(index_path))
     return {"message": "Sheet Cutting Optimizer API", "docs": "/docs"}
 
+# Time every request, including error handling and compression. Added
+# last, so it is the outermost middleware
+from app.services.metrics import MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
 # Database initialization
-from app.database import Base, engine
+import asyncio
+from app.database import init_db
+from app.services.admission import start_admission
+from app.services.maintenance import maintenance_loop
+from app.services.solver_pool import start_solver_pool, shutdown_solver_pool
+from app.services.table_versions import track_table_versions
+
+track_table_versions()
 
 @app.on_event("startup")
 async def startup_event() -> None:
-    """Initialize database on startup."""
-    Base.metadata.create_all(bind=engine)
+    """Initialize database, start the solver pool and periodic maintenance on startup."""
+    init_db()
+    start_admission()
+    start_solver_pool()
+    app.state.maintenance_task = None
+    if settings.maintenance_interval_hours > 0:
+        app.state.maintenance_task = asyncio.create_task(maintenance_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Stop periodic maintenance and the solver pool."""
+    if app.state.maintenance_task is not None:
+        app.state.maintenance_task.cancel()
+    shutdown_solver_pool()
 
 # Register API routers
-from app.api import stock, cuts, optimize
+from app.api import projects, stock, cuts, optimize, plans, remnants, storage
+app.include_router(projects.router)
 app.include_router(stock.router)
 app.include_router(cuts.router)
 app.include_router(optimize.router)
+app.include_router(plans.router)
+app.include_router(remnants.router)
+app.include_router(storage.router)
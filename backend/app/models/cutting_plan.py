@@ -1,19 +1,29 @@
 """CuttingPlan database model."""
-from sqlalchemy import Column, String, Float, Integer, DateTime
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Float, Integer, DateTime, Boolean, Index
+from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 import uuid
 from app.database import Base
+from app.models.project import DEFAULT_PROJECT_ID
 
 
 class CuttingPlan(Base):
     """Cutting plan model representing optimization result."""
     __tablename__ = "cutting_plans"
+    __table_args__ = (
+        Index("ix_cutting_plans_project_created_at", "project_id", "created_at"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    total_waste = Column(Float, nullable=True)
-    kerf_width = Column(Float, nullable=False, default=3.0)
-    sheets_used = Column(Integer, nullable=True)
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    project_id: Mapped[str] = mapped_column(String, nullable=False, default=DEFAULT_PROJECT_ID, server_default=DEFAULT_PROJECT_ID)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    total_waste: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    kerf_width: Mapped[float] = mapped_column(Float, nullable=False, default=3.0)
+    sheets_used: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    estimated_saw_time: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # seconds
+    remnants_harvested: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True, default=False)
 
     def __repr__(self) -> str:
         return f"<CuttingPlan {self.id} sheets={self.sheets_used} waste={self.total_waste}mm²>"
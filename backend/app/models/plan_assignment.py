@@ -1,5 +1,7 @@
 """PlanAssignment database model."""
-from sqlalchemy import Column, String, Float, Integer, ForeignKey
+from typing import Optional
+from sqlalchemy import String, Float, Integer, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
 import uuid
 from app.database import Base
 
@@ -8,15 +10,32 @@ class PlanAssignment(Base):
     """Plan assignment model mapping cuts to positions on sheets."""
     __tablename__ = "plan_assignments"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    plan_id = Column(String, ForeignKey("cutting_plans.id", ondelete="CASCADE"), nullable=False)
-    sheet_id = Column(String, ForeignKey("stock_sheets.id"), nullable=False)
-    cut_id = Column(String, ForeignKey("required_cuts.id"), nullable=False)
-    x_position = Column(Float, nullable=False)
-    y_position = Column(Float, nullable=False)
-    rotation = Column(Integer, nullable=False)  # 0 or 90 degrees
-    sequence_number = Column(Integer, nullable=False)
-    waste_area = Column(Float, nullable=True)
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    plan_id: Mapped[str] = mapped_column(String, ForeignKey("cutting_plans.id", ondelete="CASCADE"), nullable=False, index=True)
+    # The piece is cut from a stock sheet or from a remnant: exactly one is set
+    sheet_id: Mapped[Optional[str]] = mapped_column(String, ForeignKey("stock_sheets.id"), nullable=True)
+    remnant_id: Mapped[Optional[str]] = mapped_column(String, ForeignKey("remnants.id"), nullable=True)
+    sheet_instance: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # which of the sheet's quantity this is
+    sheet_number: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # position of the sheet in the plan, from 1
+    cut_id: Mapped[str] = mapped_column(String, ForeignKey("required_cuts.id"), nullable=False)
+    x_position: Mapped[float] = mapped_column(Float, nullable=False)
+    y_position: Mapped[float] = mapped_column(Float, nullable=False)
+    rotation: Mapped[int] = mapped_column(Integer, nullable=False)  # 0 or 90 degrees
+    sequence_number: Mapped[int] = mapped_column(Integer, nullable=False)  # order the saw sequence releases the piece
+    waste_area: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # The sheet instance and cut as planned, so exports survive edits and
+    # deletions of the stock, remnants and cuts (NULL in older plans)
+    sheet_label: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # instance label, e.g. "Plywood #2"
+    sheet_width: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    sheet_length: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    cut_label: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    cut_width: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    cut_length: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    cut_thickness: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     def __repr__(self) -> str:
-        return f"<PlanAssignment cut={self.cut_id} on sheet={self.sheet_id} pos=({self.x_position},{self.y_position})>"
+        return f"<PlanAssignment cut={self.cut_id} on sheet={self.sheet_id or self.remnant_id} pos=({self.x_position},{self.y_position})>"
+
+
+# Id of the stock sheet or remnant a piece is cut from, for queries
+ASSIGNMENT_SOURCE_ID = func.coalesce(PlanAssignment.sheet_id, PlanAssignment.remnant_id).label("source_id")
@@ -0,0 +1,23 @@
+"""Project database model."""
+from datetime import datetime
+from sqlalchemy import String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+# Project of rows created before projects existed and of requests that
+# don't name one
+DEFAULT_PROJECT_ID = "default"
+
+
+class Project(Base):
+    """Project (workspace) owning its own stock sheets, required cuts and plans."""
+    __tablename__ = "projects"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    name: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Project {self.name}>"
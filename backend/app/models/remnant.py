@@ -0,0 +1,30 @@
+"""Remnant (offcut) database model."""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Float, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+
+class Remnant(Base):
+    """Usable offcut left over from a cut sheet, kept as stock for later plans."""
+    __tablename__ = "remnants"
+    __table_args__ = (
+        # Size lookups: equality on thickness, then range scans on the sides
+        Index("ix_remnants_thickness_width_length", "thickness", "width", "length"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    width: Mapped[float] = mapped_column(Float, nullable=False)  # always the shorter side
+    length: Mapped[float] = mapped_column(Float, nullable=False)  # always the longer side
+    thickness: Mapped[float] = mapped_column(Float, nullable=False)
+    label: Mapped[str] = mapped_column(String(100), nullable=False)
+    source_plan_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # Plan the remnant was cut up in; kept (out of the inventory) for that plan's assignments
+    consumed_plan_id: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Remnant {self.label} ({self.width}×{self.length}×{self.thickness}mm)>"
@@ -1,9 +1,12 @@
 """StockSheet database model."""
-from sqlalchemy import Column, String, Float, Integer, Enum as SQLEnum, DateTime
+from datetime import datetime
+from sqlalchemy import String, Float, Integer, Index, UniqueConstraint, Enum as SQLEnum, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 import enum
 import uuid
 from app.database import Base
+from app.models.project import DEFAULT_PROJECT_ID
 
 
 class PriorityLevel(str, enum.Enum):
@@ -16,15 +19,22 @@ class PriorityLevel(str, enum.Enum):
 class StockSheet(Base):
     """Stock sheet model representing available material."""
     __tablename__ = "stock_sheets"
+    __table_args__ = (
+        # Labels are unique within a project
+        UniqueConstraint("project_id", "label", name="uq_stock_sheets_project_label"),
+        # Keyset pagination order of the list endpoint, per project
+        Index("ix_stock_sheets_project_created_at_id", "project_id", "created_at", "id"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    width = Column(Float, nullable=False)
-    length = Column(Float, nullable=False)
-    thickness = Column(Float, nullable=False)
-    label = Column(String(100), nullable=False, unique=True)
-    quantity = Column(Integer, nullable=False, default=1)
-    priority = Column(SQLEnum(PriorityLevel), nullable=False, default=PriorityLevel.NORMAL)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    project_id: Mapped[str] = mapped_column(String, nullable=False, default=DEFAULT_PROJECT_ID, server_default=DEFAULT_PROJECT_ID)
+    width: Mapped[float] = mapped_column(Float, nullable=False)
+    length: Mapped[float] = mapped_column(Float, nullable=False)
+    thickness: Mapped[float] = mapped_column(Float, nullable=False)
+    label: Mapped[str] = mapped_column(String(100), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    priority: Mapped[PriorityLevel] = mapped_column(SQLEnum(PriorityLevel), nullable=False, default=PriorityLevel.NORMAL)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     def __repr__(self) -> str:
         return f"<StockSheet {self.label} ({self.width}×{self.length}×{self.thickness}mm)>"
@@ -0,0 +1,25 @@
+"""StoredSheet database model."""
+from datetime import datetime
+from sqlalchemy import String, Float, Integer, Enum as SQLEnum, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+from app.models.stock_sheet import PriorityLevel
+
+
+class StoredSheet(Base):
+    """Unused stock sheet kept in storage and carried over to the next project."""
+    __tablename__ = "stored_sheets"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    width: Mapped[float] = mapped_column(Float, nullable=False)
+    length: Mapped[float] = mapped_column(Float, nullable=False)
+    thickness: Mapped[float] = mapped_column(Float, nullable=False)
+    label: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    priority: Mapped[PriorityLevel] = mapped_column(SQLEnum(PriorityLevel), nullable=False, default=PriorityLevel.NORMAL)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<StoredSheet {self.label} ({self.width}×{self.length}×{self.thickness}mm) qty={self.quantity}>"
@@ -0,0 +1,15 @@
+"""TableVersion database model."""
+from sqlalchemy import String, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class TableVersion(Base):
+    """Write counter per table, bumped in the same transaction as every change."""
+    __tablename__ = "table_versions"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<TableVersion {self.name}={self.version}>"
@@ -0,0 +1,7 @@
+"""Pydantic schemas for bulk import operations."""
+from pydantic import BaseModel
+
+
+class BulkImportResponse(BaseModel):
+    """Schema for bulk import result."""
+    created: int
@@ -1,11 +1,37 @@
 """Pydantic schemas for cutting plan operations."""
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Literal, Optional
 
 
 class OptimizationRequest(BaseModel):
     """Schema for optimization request."""
     kerf_width: float = Field(default=3.0, ge=0, le=10, description="Blade kerf width in millimeters")
+    minimize_saw_time: bool = Field(default=False, description="Use estimated saw time as a secondary objective")
+    use_remnants: bool = Field(default=False, description="Pack stored remnants before stock sheets")
+    algorithm: str = Field(
+        default="auto", description="Packing engine (see GET /api/optimize/engines), or 'auto' to pick by job size"
+    )
+    time_limit: Optional[float] = Field(
+        default=None, gt=0, le=60, description="Seconds a time-bounded engine may search; makes 'auto' search"
+    )
+    response_format: Literal["objects", "columnar"] = Field(
+        default="objects", description="'columnar' returns assignments and saw cuts as parallel arrays"
+    )
+    warm_start_plan_id: Optional[str] = Field(
+        default=None, description="Previous plan to start from; its still-valid sheets are kept unless beaten"
+    )
+    preview: bool = Field(
+        default=False,
+        description="Stream a quick preview plan first, then the full plan under the same id (NDJSON)"
+    )
+    random_seed: int = Field(default=0, ge=0, description="Seed of a seeded engine's random choices")
+    restarts: Optional[int] = Field(
+        default=None, gt=0, le=10000,
+        description="Restarts a seeded engine runs instead of a time limit; the same seed reproduces the plan"
+    )
+    profile: bool = Field(default=False, description="Solve under cProfile and report hotspots (if enabled)")
+    dump_fixture: bool = Field(default=False, description="Save the solve's inputs as a replayable fixture (if enabled)")
 
 
 class CutAssignment(BaseModel):
@@ -20,6 +46,22 @@ class CutAssignment(BaseModel):
     sequence_number: int
     width: float
     length: float
+    thickness: float = 0.0
+
+
+class SawCutResponse(BaseModel):
+    """Schema for one guillotine cut in a sheet's saw sequence."""
+    step: int
+    kind: str
+    stage: int
+    parent: int | None
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    fence: float
+    rotate_before: bool
+    move_fence: bool
 
 
 class SheetPlan(BaseModel):
@@ -30,6 +72,8 @@ class SheetPlan(BaseModel):
     sheet_length: float
     assignments: list[CutAssignment]
     waste_area: float
+    cut_sequence: list[SawCutResponse] = []
+    saw_time: float = 0.0
 
 
 class UnplacedCutResponse(BaseModel):
@@ -53,16 +97,147 @@ class UnusedSheetResponse(BaseModel):
     priority: str
 
 
-class CuttingPlanResponse(BaseModel):
-    """Schema for cutting plan response."""
+class Hotspot(BaseModel):
+    """Schema for one function in a profile summary."""
+    function: str
+    file: str
+    line: int
+    calls: int
+    own_seconds: float
+    cumulative_seconds: float
+
+
+class ProfileSummary(BaseModel):
+    """Schema for the profile of a profiled optimization."""
+    id: str
+    url: str
+    hotspots: list[Hotspot]
+
+
+class EngineResponse(BaseModel):
+    """Schema for a packing engine and its capabilities."""
+    name: str
+    description: str
+    guillotine: bool
+    exact: bool
+    time_bounded: bool
+    supports_remnants: bool
+    max_pieces: Optional[int] = None
+    seeded: bool = False
+
+
+class ColumnarAssignments(BaseModel):
+    """Schema for a sheet's assignments as parallel arrays, in cutting order."""
+    cut: list[int]  # index into the plan's cuts
+    x_position: list[float]
+    y_position: list[float]
+    rotation: list[int]
+
+
+class ColumnarSawCuts(BaseModel):
+    """Schema for a sheet's saw sequence as parallel arrays, in step order."""
+    kind: list[str]
+    stage: list[int]
+    parent: list[int | None]
+    x1: list[float]
+    y1: list[float]
+    x2: list[float]
+    y2: list[float]
+    fence: list[float]
+    rotate_before: list[bool]
+    move_fence: list[bool]
+
+
+class ColumnarSheetPlan(BaseModel):
+    """Schema for a single sheet's cutting plan in the columnar format."""
+    sheet_id: str
+    sheet_label: str
+    sheet_width: float
+    sheet_length: float
+    assignments: ColumnarAssignments
+    waste_area: float
+    cut_sequence: ColumnarSawCuts
+    saw_time: float = 0.0
+
+
+class ColumnarCuts(BaseModel):
+    """Schema for the distinct cuts of a columnar plan, as parallel arrays."""
+    id: list[str]
+    label: list[str]
+    width: list[float]
+    length: list[float]
+    thickness: list[float]
+
+
+class CuttingPlanBase(BaseModel):
+    """Fields shared by both cutting plan response formats."""
     id: str
     created_at: datetime
     total_waste: float
     kerf_width: float
     sheets_used: int
-    sheet_plans: list[SheetPlan]
+    estimated_saw_time: float = 0.0
     unplaced_cuts: list[UnplacedCutResponse] = []
     unused_sheets: list[UnusedSheetResponse] = []
+    algorithm: Optional[str] = None
+    # Seeded engines only: what reproduces the plan
+    random_seed: Optional[int] = None
+    restarts: Optional[int] = None
+    unchanged_sheets: Optional[int] = None
+    # Quick unsaved plan, replaced by the full plan under the same id
+    preview: bool = False
+    profile: Optional[ProfileSummary] = None
+    fixture_url: Optional[str] = None
+
+
+class CuttingPlanResponse(CuttingPlanBase):
+    """Schema for cutting plan response."""
+    sheet_plans: list[SheetPlan]
 
     class Config:
         from_attributes = True
+
+
+class ColumnarCuttingPlanResponse(CuttingPlanBase):
+    """Schema for a cutting plan in the columnar format (``response_format: "columnar"``)."""
+    format: Literal["columnar"]
+    cuts: ColumnarCuts
+    sheet_plans: list[ColumnarSheetPlan]
+
+
+class SheetTypeOption(BaseModel):
+    """Schema for a sheet size the purchase planner may buy."""
+    label: str = Field(..., min_length=1, max_length=100, description="User-friendly name")
+    width: float = Field(..., gt=0, le=10000, description="Width in millimeters")
+    length: float = Field(..., gt=0, le=10000, description="Length in millimeters")
+    thickness: float = Field(..., gt=0, le=300, description="Thickness in millimeters")
+    unit_price: float = Field(..., ge=0, description="Price of one sheet")
+
+
+class PurchaseRequest(BaseModel):
+    """Schema for a stock purchase planning request."""
+    sheet_types: list[SheetTypeOption] = Field(..., min_length=1, max_length=20,
+                                               description="Candidate sheet sizes, each in unlimited quantity")
+    kerf_width: float = Field(default=3.0, ge=0, le=10, description="Blade kerf width in millimeters")
+    minimize_saw_time: bool = Field(default=False, description="Use estimated saw time as a secondary objective")
+
+
+class PurchaseLine(BaseModel):
+    """Schema for one sheet size of a purchase."""
+    label: str
+    width: float
+    length: float
+    thickness: float
+    unit_price: float
+    quantity: int
+    cost: float
+
+
+class PurchasePlanResponse(BaseModel):
+    """Schema for the cheapest purchase and its cutting plan."""
+    total_cost: float
+    sheets: list[PurchaseLine]
+    evaluated: int
+    pruned: int
+    complete: bool
+    plan: CuttingPlanResponse
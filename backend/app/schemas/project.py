@@ -0,0 +1,18 @@
+"""Pydantic schemas for project operations."""
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class ProjectCreate(BaseModel):
+    """Schema for creating a project."""
+    name: str = Field(..., min_length=1, max_length=100, description="User-friendly name")
+
+
+class ProjectResponse(BaseModel):
+    """Schema for project response."""
+    id: str
+    name: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,30 @@
+"""Pydantic schemas for remnant inventory operations."""
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class RemnantResponse(BaseModel):
+    """Schema for remnant response."""
+    id: str
+    width: float
+    length: float
+    thickness: float
+    label: str
+    source_plan_id: str | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RemnantHarvestRequest(BaseModel):
+    """Schema for saving the offcuts of a cutting plan."""
+    min_width: float = Field(default=100.0, gt=0, le=10000, description="Minimum short side in millimeters")
+    min_length: float = Field(default=300.0, gt=0, le=10000, description="Minimum long side in millimeters")
+
+
+class RemnantHarvestResponse(BaseModel):
+    """Schema for the result of saving a plan's offcuts."""
+    plan_id: str
+    created: list[RemnantResponse]
+    consumed: int
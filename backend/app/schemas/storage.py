@@ -0,0 +1,36 @@
+"""Pydantic schemas for stock storage operations."""
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal
+from app.schemas.stock import StockSheetResponse
+
+
+class StoredSheetCreate(BaseModel):
+    """Schema for sending a sheet to storage."""
+    width: float = Field(..., gt=0, le=10000, description="Width in millimeters")
+    length: float = Field(..., gt=0, le=10000, description="Length in millimeters")
+    thickness: float = Field(..., gt=0, le=300, description="Thickness in millimeters")
+    label: str = Field(..., min_length=1, max_length=100, description="User-friendly name")
+    quantity: int = Field(default=1, ge=1, le=100, description="Number of identical sheets")
+    priority: Literal["high", "normal", "low"] = Field(default="normal", description="Use priority")
+
+
+class StoredSheetResponse(BaseModel):
+    """Schema for stored sheet response."""
+    id: str
+    width: float
+    length: float
+    thickness: float
+    label: str
+    quantity: int
+    priority: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class NewProjectResponse(BaseModel):
+    """Schema for the result of starting a new project."""
+    stock_sheets: list[StockSheetResponse]
+    loaded_from_storage: int
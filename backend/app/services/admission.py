@@ -0,0 +1,145 @@
+"""Admission control for optimizer runs.
+
+Solves are CPU-bound, so letting every request start one at once only
+makes all of them slow. Each job is routed by piece count to a lane with
+its own limit on running solves and its own bounded wait queue; a burst of
+large jobs fills the large lane and is turned away there while small jobs
+keep flowing through theirs.
+"""
+import asyncio
+import math
+import time
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+from app.config import settings
+from app.services.metrics import REGISTRY, CallbackCounter, Gauge, GaugeValues
+
+SMALL = "small"
+LARGE = "large"
+
+
+class AdmissionRejected(Exception):
+    """A job could not be admitted; maps to an HTTP status with Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Lane:
+    """Concurrency limit plus a bounded FIFO queue of waiting jobs."""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, timeout: float) -> None:
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.average_seconds = 1.0  # moving average of solve time, for Retry-After
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new job has likely drained."""
+        backlog = self.waiting + self.running
+        return max(1, math.ceil(self.average_seconds * backlog / self.concurrency))
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """
+        Hold a slot of this lane for the duration of the block.
+
+        Raises:
+            AdmissionRejected: 429 when the queue is full, 503 when the job
+                waited admission_queue_timeout seconds without a slot
+        """
+        if not self._slots.locked():
+            await self._slots.acquire()  # free slot and nobody queued: no wait
+        elif self.waiting >= self.queue_size:
+            self.rejected += 1
+            raise AdmissionRejected(
+                429, f"Too many {self.name} optimization jobs queued", self.retry_after()
+            )
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise AdmissionRejected(
+                    503, f"Timed out waiting for a {self.name} optimization slot", self.retry_after()
+                ) from None
+            finally:
+                self.waiting -= 1
+
+        self.running += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+            self.average_seconds = 0.8 * self.average_seconds + 0.2 * (time.monotonic() - started)
+
+
+class AdmissionController:
+    """Routes optimizer jobs to the small or large lane by piece count."""
+
+    def __init__(self, small_job_pieces: int, small: Lane, large: Lane) -> None:
+        self.small_job_pieces = small_job_pieces
+        self.lanes = {SMALL: small, LARGE: large}
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        timeout = settings.admission_queue_timeout
+        return cls(
+            settings.small_job_pieces,
+            Lane(SMALL, settings.small_lane_concurrency, settings.small_lane_queue, timeout),
+            Lane(LARGE, settings.large_lane_concurrency, settings.large_lane_queue, timeout),
+        )
+
+    def lane_for(self, pieces: int) -> Lane:
+        return self.lanes[SMALL if pieces <= self.small_job_pieces else LARGE]
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def start_admission() -> AdmissionController:
+    """(Re)create the lanes from settings; called once the event loop runs."""
+    global _controller
+    _controller = AdmissionController.from_settings()
+    return _controller
+
+
+def get_admission() -> AdmissionController:
+    if _controller is None:
+        return start_admission()
+    return _controller
+
+
+def admit(pieces: int) -> AbstractAsyncContextManager[None]:
+    """Admission context for a job of the given piece count."""
+    return get_admission().lane_for(pieces).admit()
+
+
+def _lane_values(attribute: str) -> Callable[[], GaugeValues]:
+    return lambda: {(name,): getattr(lane, attribute) for name, lane in get_admission().lanes.items()}
+
+
+REGISTRY.register(Gauge(
+    "woodcutter_admission_running", "Optimizations holding a lane slot", ("lane",),
+    callback=_lane_values("running")))
+REGISTRY.register(Gauge(
+    "woodcutter_admission_queue_depth", "Optimizations waiting for a lane slot", ("lane",),
+    callback=_lane_values("waiting")))
+REGISTRY.register(CallbackCounter(
+    "woodcutter_admission_rejected_total", "Optimizations turned away with 429 (queue full)", ("lane",),
+    callback=_lane_values("rejected")))
+REGISTRY.register(CallbackCounter(
+    "woodcutter_admission_timed_out_total", "Optimizations turned away with 503 (wait timed out)", ("lane",),
+    callback=_lane_values("timed_out")))
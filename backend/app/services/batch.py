@@ -0,0 +1,242 @@
+"""Headless batch optimizer: plan job files without the API or a database.
+
+    python -m app.services.batch jobs/ --out plans/ --svg --html --workers 8
+
+A job is either
+
+- a JSON file with ``cuts``, ``sheets`` and optionally ``kerf_width``,
+  ``minimize_saw_time``, ``algorithm`` and ``time_limit`` (profiling
+  fixtures are valid jobs), or
+- a directory with ``cuts.csv`` / ``cuts.json`` and ``sheets.csv`` /
+  ``sheets.json`` (or ``stock.*``), plus optional ``options.json``.
+
+Cut and sheet records use the bulk import columns: label, width, length,
+thickness, quantity and, for sheets, priority; ``id`` is optional. Jobs
+run in parallel, one process per core by default; --algorithm and
+--time-limit apply to jobs that don't set their own. --restarts runs
+that many seeded search restarts per job instead of a time limit, so
+rerunning with the same --seed reproduces every plan. Each job writes
+``<out>/<job>/plan.json`` (the CuttingPlanResponse body) and, on
+request, one SVG per sheet and the print HTML; ``<out>/summary.json``
+lists every job's outcome and the exit status is 1 if any job failed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Optional
+from app.services.bulk_io import iter_csv_records
+from app.services.engines import AUTO, ENGINES, resolve_engine
+from app.services.optimizer import Cut, Sheet
+from app.services.plan_export import sheet_svg
+from app.services.plan_format import plan_body
+from app.services.planner import solve_plan
+from app.services.print_template import generate_print_html, print_plan_data
+
+DEFAULT_KERF = 3.0
+PRIORITIES = {"high", "normal", "low"}
+
+
+def _number(record: dict[str, Any], field: str, where: str, kind: type = float, default: Any = None) -> Any:
+    value = record.get(field, default)
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: {field} must be a number") from None
+    if number <= 0:
+        raise ValueError(f"{where}: {field} must be positive")
+    return number
+
+
+def _cuts(records: Iterable[dict[str, Any]], source: str) -> list[Cut]:
+    cuts = []
+    for i, record in enumerate(records, start=1):
+        where = f"{source} record {i}"
+        label = str(record.get("label") or f"Cut {i}")
+        cuts.append(Cut(
+            id=str(record.get("id") or f"cut{i}"),
+            width=_number(record, "width", where),
+            length=_number(record, "length", where),
+            thickness=_number(record, "thickness", where),
+            label=label,
+            quantity=_number(record, "quantity", where, int, 1),
+        ))
+    return cuts
+
+
+def _sheets(records: Iterable[dict[str, Any]], source: str) -> list[Sheet]:
+    sheets = []
+    for i, record in enumerate(records, start=1):
+        where = f"{source} record {i}"
+        priority = str(record.get("priority") or "normal")
+        if priority not in PRIORITIES:
+            raise ValueError(f"{where}: priority must be one of {', '.join(sorted(PRIORITIES))}")
+        sheets.append(Sheet(
+            id=str(record.get("id") or f"sheet{i}"),
+            width=_number(record, "width", where),
+            length=_number(record, "length", where),
+            thickness=_number(record, "thickness", where),
+            label=str(record.get("label") or f"Sheet {i}"),
+            priority=priority,
+            quantity=_number(record, "quantity", where, int, 1),
+        ))
+    return sheets
+
+
+def _records(directory: Path, *names: str) -> tuple[list[dict[str, Any]], str]:
+    for name in names:
+        for suffix in (".csv", ".json"):
+            path = directory / f"{name}{suffix}"
+            if path.exists():
+                if suffix == ".csv":
+                    with path.open("rb") as stream:
+                        return list(iter_csv_records(stream)), path.name
+                return json.loads(path.read_text()), path.name
+    raise ValueError(f"{directory.name}: no {names[0]}.csv or {names[0]}.json")
+
+
+def load_job(path: Path, algorithm: str = AUTO,
+             time_limit: Optional[float] = None) -> tuple[list[Cut], list[Sheet], float, bool, str, Optional[float]]:
+    """
+    Read a job file or directory.
+
+    Args:
+        path: Job file or directory
+        algorithm: Engine for jobs that don't name one
+        time_limit: Search time for jobs that don't set one
+
+    Returns:
+        (cuts, sheets, kerf width, minimize saw time, algorithm, time limit)
+
+    Raises:
+        ValueError: When the job is missing data or has an invalid record
+    """
+    if path.is_dir():
+        cut_records, cut_source = _records(path, "cuts")
+        sheet_records, sheet_source = _records(path, "sheets", "stock")
+        options_path = path / "options.json"
+        options = json.loads(options_path.read_text()) if options_path.exists() else {}
+    else:
+        options = json.loads(path.read_text())
+        cut_records, cut_source = options.get("cuts", []), "cuts"
+        sheet_records, sheet_source = options.get("sheets", []), "sheets"
+
+    cuts = _cuts(cut_records, cut_source)
+    sheets = _sheets(sheet_records, sheet_source)
+    if not cuts:
+        raise ValueError("No cuts")
+    if not sheets:
+        raise ValueError("No sheets")
+    kerf_width = float(options.get("kerf_width", DEFAULT_KERF))
+    time_limit = options.get("time_limit") or time_limit
+    return (cuts, sheets, kerf_width, bool(options.get("minimize_saw_time", False)),
+            str(options.get("algorithm") or algorithm), None if time_limit is None else float(time_limit))
+
+
+def discover_jobs(root: Path) -> list[Path]:
+    """JSON files and job directories directly under root (or root itself if it is a job)."""
+    if root.is_file() or any((root / f"cuts{s}").exists() for s in (".csv", ".json")):
+        return [root]
+    return sorted(p for p in root.iterdir()
+                  if (p.is_file() and p.suffix == ".json") or (p.is_dir() and not p.name.startswith(".")))
+
+
+def run_job(path: Path, out_dir: Path, svg: bool = False, html: bool = False,
+            algorithm: str = AUTO, time_limit: Optional[float] = None,
+            random_seed: Optional[int] = 0, restarts: Optional[int] = None) -> dict[str, Any]:
+    """
+    Solve one job and write its outputs under out_dir/<job name>.
+
+    Returns:
+        Summary of the job; failures are reported, not raised
+    """
+    name = path.stem if path.is_file() else path.name
+    started = time.perf_counter()
+    try:
+        cuts, sheets, kerf_width, minimize_saw_time, algorithm, time_limit = load_job(path, algorithm, time_limit)
+        engine = resolve_engine(algorithm, sum(c.quantity for c in cuts), time_limit, restarts=restarts)
+        if not ENGINES[engine].info.seeded:
+            random_seed, restarts = None, None
+        solved = solve_plan(cuts, sheets, kerf_width, minimize_saw_time, algorithm=engine, time_limit=time_limit,
+                            random_seed=random_seed, restarts=restarts)
+        body = plan_body(solved, sheets, name, datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        body["algorithm"] = engine
+        body["random_seed"] = random_seed
+        body["restarts"] = restarts
+
+        job_dir = out_dir / name
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / "plan.json").write_text(json.dumps(body, indent=1, ensure_ascii=False))
+        if svg:
+            for number, sheet_plan in enumerate(body["sheet_plans"], start=1):
+                (job_dir / f"sheet-{number:02d}.svg").write_text(sheet_svg(sheet_plan), encoding="utf-8")
+        if html:
+            (job_dir / "print.html").write_text(generate_print_html(print_plan_data(body)), encoding="utf-8")
+    except (OSError, ValueError) as e:
+        return {"job": name, "status": "failed", "error": str(e),
+                "seconds": round(time.perf_counter() - started, 3)}
+
+    sheet_area = sum(layout.sheet.width * layout.sheet.length for layout in solved.layouts)
+    return {
+        "job": name,
+        "status": "ok",
+        "algorithm": engine,
+        "pieces": sum(c.quantity for c in cuts),
+        "sheets_used": body["sheets_used"],
+        "unplaced": len(body["unplaced_cuts"]),
+        "yield_pct": round(100 * (sheet_area - solved.total_waste) / sheet_area, 2) if sheet_area else 0.0,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Optimize a directory of cutting jobs")
+    parser.add_argument("jobs", type=Path, help="job directory, or a single job file/directory")
+    parser.add_argument("--out", type=Path, default=Path("plans"), help="output directory")
+    parser.add_argument("--svg", action="store_true", help="write one SVG diagram per sheet")
+    parser.add_argument("--html", action="store_true", help="write print-ready HTML")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parallel processes")
+    parser.add_argument("--algorithm", default=AUTO, choices=[AUTO, *ENGINES], help="packing engine")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="seconds a time-bounded engine may search per job")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of seeded engines")
+    parser.add_argument("--restarts", type=int, default=None,
+                        help="seeded search restarts per job instead of a time limit (reproducible)")
+    args = parser.parse_args(argv)
+    options = (args.algorithm, args.time_limit, args.seed, args.restarts)
+
+    jobs = discover_jobs(args.jobs)
+    args.out.mkdir(parents=True, exist_ok=True)
+    summaries = []
+    if args.workers <= 1 or len(jobs) <= 1:
+        summaries = [run_job(job, args.out, args.svg, args.html, *options) for job in jobs]
+        for summary in summaries:
+            _print_summary(summary)
+    else:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as pool:
+            futures = [pool.submit(run_job, job, args.out, args.svg, args.html, *options) for job in jobs]
+            for future in as_completed(futures):
+                summaries.append(future.result())
+                _print_summary(summaries[-1])
+
+    summaries.sort(key=lambda s: s["job"])
+    (args.out / "summary.json").write_text(json.dumps(summaries, indent=1) + "\n")
+    failed = sum(1 for s in summaries if s["status"] != "ok")
+    print(f"{len(summaries) - failed} of {len(summaries)} jobs planned, results in {args.out}")
+    return 1 if failed else 0
+
+
+def _print_summary(summary: dict[str, Any]) -> None:
+    if summary["status"] == "ok":
+        print(f"{summary['job']}: {summary['pieces']} pieces on {summary['sheets_used']} sheets, "
+              f"{summary['yield_pct']}% yield, {summary['unplaced']} unplaced ({summary['seconds']} s)", flush=True)
+    else:
+        print(f"{summary['job']}: FAILED {summary['error']}", flush=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
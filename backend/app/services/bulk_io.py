@@ -0,0 +1,142 @@
+"""Bulk import and export of stock sheets and required cuts (CSV/JSON)."""
+import csv
+import io
+import json
+from typing import IO, Any, AsyncIterator, Iterable, Iterator
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models.project import DEFAULT_PROJECT_ID
+
+# Rows validated and inserted per round trip. Also keeps the label lookup
+# below SQLite's limit on bound parameters.
+CHUNK_SIZE = 500
+
+
+def iter_csv_records(stream: IO[bytes]) -> Iterator[dict[str, str]]:
+    """
+    Parse CSV rows lazily from a binary stream.
+
+    Header names are matched case-insensitively and blank rows are skipped,
+    so spreadsheet and CAD exports load without cleanup.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        record = {k: v.strip() for k, v in row.items() if k and v is not None and v.strip() != ""}
+        if record:
+            yield record
+
+
+def _validate_chunk(records: Iterator[tuple[int, dict[str, Any]]], schema: type[BaseModel],
+                    project_id: str, seen: set[str]) -> list[dict[str, Any]]:
+    """Validate the next CHUNK_SIZE numbered records into insertable rows."""
+    chunk: list[dict[str, Any]] = []
+    for number, record in records:
+        try:
+            row = schema.model_validate(record).model_dump()
+            row["project_id"] = project_id
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            raise ValueError(f"Row {number}: {field}: {error['msg']}") from None
+        if row["label"] in seen:
+            raise ValueError(f"Row {number}: duplicate label '{row['label']}'")
+        seen.add(row["label"])
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            break
+    return chunk
+
+
+async def bulk_insert(db: AsyncSession, model: Any, schema: type[BaseModel],
+                      records: Iterable[dict[str, Any]], project_id: str = DEFAULT_PROJECT_ID) -> int:
+    """
+    Validate and insert records in a single transaction.
+
+    Records are consumed in chunks of CHUNK_SIZE: each chunk is parsed and
+    validated in the threadpool (CSV records are read lazily from a file),
+    its labels are checked against the project with one set-based query
+    and the rows are inserted with one executemany. Nothing is committed
+    unless every record is valid.
+
+    Args:
+        db: Database session
+        model: ORM model with a per-project unique ``label`` column
+        schema: Create schema used to validate each record
+        records: Raw records (CSV rows or JSON objects)
+        project_id: Project the rows are created in
+
+    Returns:
+        Number of inserted rows
+
+    Raises:
+        ValueError: On the first invalid record or duplicate label
+    """
+    seen: set[str] = set()
+    numbered = enumerate(records, start=1)
+    created = 0
+    try:
+        while chunk := await run_in_threadpool(_validate_chunk, numbered, schema, project_id, seen):
+            labels = [row["label"] for row in chunk]
+            existing = await db.scalar(
+                select(model.label).where(model.project_id == project_id, model.label.in_(labels)).limit(1)
+            )
+            if existing is not None:
+                raise ValueError(f"Label '{existing}' already exists")
+            await db.execute(insert(model), chunk)
+            created += len(chunk)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return created
+
+
+async def _rows(model: Any, fields: list[str], project_id: str) -> AsyncIterator[tuple[Any, ...]]:
+    """Stream rows in batches through a dedicated session that lives as long as the response."""
+    async with AsyncSessionLocal() as db:
+        columns = [getattr(model, f) for f in fields]
+        query = (
+            select(*columns)
+            .where(model.project_id == project_id)
+            .order_by(model.created_at, model.id)
+            .execution_options(yield_per=CHUNK_SIZE)
+        )
+        async for row in await db.stream(query):
+            yield tuple(v.value if hasattr(v, "value") else v for v in row)
+
+
+async def stream_csv(model: Any, fields: list[str], project_id: str = DEFAULT_PROJECT_ID) -> AsyncIterator[str]:
+    """Stream a project's rows of a table as CSV, one chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    count = 0
+    async for row in _rows(model, fields, project_id):
+        writer.writerow(row)
+        count += 1
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def stream_json(model: Any, fields: list[str], project_id: str = DEFAULT_PROJECT_ID) -> AsyncIterator[str]:
+    """Stream a project's rows of a table as a JSON array without building it in memory."""
+    parts = ["["]
+    count = 0
+    async for row in _rows(model, fields, project_id):
+        parts.append(("," if count else "") + json.dumps(dict(zip(fields, row))))
+        count += 1
+        if len(parts) >= CHUNK_SIZE:
+            yield "".join(parts)
+            parts = []
+    parts.append("]")
+    yield "".join(parts)
@@ -0,0 +1,139 @@
+"""Response compression with brotli when available, gzip otherwise.
+
+Cutting plans for big jobs are hundreds of kilobytes of repetitive JSON;
+they compress well, and the saving dominates the cost of compressing them.
+Brotli is used when the client accepts it and the optional ``brotli``
+package is installed; otherwise gzip. Small bodies, and responses that
+already carry a Content-Encoding, are sent as they are. Each chunk of a
+streamed body is flushed, so lines of an NDJSON stream (such as a plan
+preview) reach the client as they are sent, not with the last one.
+"""
+import zlib
+from typing import Callable, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the encoding to use for a request's Accept-Encoding header."""
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if BROTLI in accepted and brotli is not None:
+        return BROTLI
+    if GZIP in accepted:
+        return GZIP
+    return None
+
+
+class _Compressor:
+    """
+    Incremental compressor with the same interface for both encodings.
+
+    sync emits everything compressed so far without ending the stream,
+    flush ends it.
+    """
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.compress: Callable[[bytes], bytes]
+        self.sync: Callable[[], bytes]
+        self.flush: Callable[[], bytes]
+        if encoding == BROTLI:
+            compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress, self.sync, self.flush = compressor.process, compressor.flush, compressor.finish
+        else:
+            gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+            self.compress, self.flush = gzip.compress, gzip.flush
+            self.sync = lambda: gzip.flush(zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing HTTP responses of at least minimum_size bytes.
+
+    Single-message bodies shorter than minimum_size go out uncompressed;
+    streamed bodies are compressed and flushed chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024,
+                 gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(self, encoding, send)(scope, receive)
+
+
+class _CompressedResponse:
+    """Send wrapper for one response: holds back the start message until the body shows its size."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor = _Compressor(encoding, middleware.gzip_level, middleware.brotli_quality)
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            # Already encoded (or a file served as-is): leave alone
+            self.passthrough = "content-encoding" in Headers(raw=message["headers"])
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        if self.passthrough:
+            if self.start is not None:
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                await self.send(start)
+                await self.send(message)
+                self.passthrough = True
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                await self.send(start)
+                await self.send({"type": "http.response.body",
+                                 "body": self.compressor.compress(body) + self.compressor.sync(), "more_body": True})
+            else:
+                compressed = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        data = self.compressor.compress(body)
+        data += self.compressor.sync() if more_body else self.compressor.flush()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
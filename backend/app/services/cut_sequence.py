@@ -0,0 +1,261 @@
+"""Guillotine cut tree reconstruction and panel-saw sequencing.
+
+A packed sheet is only a set of rectangles; the saw operator needs the
+actual guillotine cuts. This module recovers them from any guillotine
+layout (whatever engine produced it) by recursively splitting panels along
+full-span lines that do not cross a piece, alternating rip and crosscut
+stages the way a panel saw works, and estimates how long the sequence
+takes on the saw.
+
+Coordinates follow the optimizer: ``x`` runs across the sheet width and
+``y`` along the sheet length. A rip cut runs along the length (``x`` is
+constant), a crosscut runs across the width (``y`` is constant).
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from app.services.optimizer import Rectangle
+
+EPSILON = 1e-6
+
+RIP = "rip"
+CROSSCUT = "crosscut"
+TRIM = "trim"
+
+
+@dataclass
+class SawProfile:
+    """Timing model of the panel saw used to estimate saw time (seconds, mm)."""
+    feed_rate: float = 400.0  # mm of cut per second
+    cut_overhead: float = 4.0  # blade in, carriage return
+    fence_move: float = 6.0  # resetting the fence to a new distance
+    rotation: float = 10.0  # turning a panel or stack through 90°
+
+
+@dataclass
+class SawCut:
+    """A single straight cut through a panel."""
+    step: int
+    kind: str  # "rip", "crosscut" or "trim"
+    stage: int
+    parent: Optional[int]  # step of the cut that freed the panel being cut
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    fence: float  # distance from the panel's reference edge
+    move_fence: bool = False
+    rotate_before: bool = False
+
+    @property
+    def length(self) -> float:
+        return abs(self.x2 - self.x1) + abs(self.y2 - self.y1)
+
+    @property
+    def vertical(self) -> bool:
+        return self.x1 == self.x2
+
+
+@dataclass
+class CutSequence:
+    """Ordered guillotine cuts for one sheet plus the saw-time estimate."""
+    cuts: list[SawCut] = field(default_factory=list)
+    piece_order: list[int] = field(default_factory=list)  # piece indices in release order
+    offcuts: list[Rectangle] = field(default_factory=list)
+    rotations: int = 0
+    fence_moves: int = 0
+    saw_time: float = 0.0
+
+
+@dataclass
+class _Panel:
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    pieces: list[int]
+    vertical: bool  # orientation of the stage that cuts this panel
+    stage: int
+    parent: Optional[int]
+
+
+def _stage_cuts(panel: _Panel, boxes: list[tuple[float, float, float, float]],
+                vertical: bool, kerf: float) -> list[float]:
+    """
+    Find every full-span cut position of a panel in one orientation.
+
+    Sweeps the pieces along the cut axis and reports a cut wherever the
+    covered interval ends and the next piece starts at least one kerf
+    later. Leading and trailing waste produce cuts as well.
+    """
+    lo, hi = (panel.x0, panel.x1) if vertical else (panel.y0, panel.y1)
+    spans = sorted(
+        (boxes[i][0], boxes[i][2]) if vertical else (boxes[i][1], boxes[i][3])
+        for i in panel.pieces
+    )
+    positions = []
+    if spans[0][0] - kerf >= lo - EPSILON and spans[0][0] > lo + EPSILON:
+        positions.append(spans[0][0] - kerf)
+    end = spans[0][1]
+    for start, stop in spans[1:]:
+        if start >= end + kerf - EPSILON:
+            positions.append(end)
+        end = max(end, stop)
+    if end < hi - EPSILON:
+        positions.append(end)
+    return positions
+
+
+def _split(panel: _Panel, boxes: list[tuple[float, float, float, float]],
+           positions: list[float], kerf: float, steps: list[int]) -> list[_Panel]:
+    """
+    Split a panel at the given cut positions into sub-panels.
+    Each sub-panel is freed by the cut on its far side (or the last cut).
+    """
+    vertical = panel.vertical
+    lo, hi = (panel.x0, panel.x1) if vertical else (panel.y0, panel.y1)
+    bounds = [lo] + [p + kerf for p in positions]
+    ends = positions + [hi]
+    axis = 0 if vertical else 1
+    members: list[list[int]] = [[] for _ in bounds]
+    for i in panel.pieces:
+        members[bisect_right(bounds, boxes[i][axis] + EPSILON) - 1].append(i)
+
+    children = []
+    for index, (start, stop, pieces) in enumerate(zip(bounds, ends, members)):
+        if stop - start <= EPSILON:
+            continue
+        parent = steps[min(index, len(steps) - 1)]
+        if vertical:
+            child = _Panel(start, panel.y0, min(stop, hi), panel.y1, pieces,
+                           not vertical, panel.stage + 1, parent)
+        else:
+            child = _Panel(panel.x0, start, panel.x1, min(stop, hi), pieces,
+                           not vertical, panel.stage + 1, parent)
+        children.append(child)
+    return children
+
+
+def _signature(panel: _Panel, boxes: list[tuple[float, float, float, float]]) -> tuple:
+    """Shape of a panel and its pieces relative to its origin, used to batch identical panels."""
+    return (
+        round(panel.x1 - panel.x0, 3),
+        round(panel.y1 - panel.y0, 3),
+        tuple(sorted(
+            (round(boxes[i][0] - panel.x0, 3), round(boxes[i][1] - panel.y0, 3),
+             round(boxes[i][2] - boxes[i][0], 3), round(boxes[i][3] - boxes[i][1], 3))
+            for i in panel.pieces
+        )),
+    )
+
+
+def _sequence(sheet_width: float, sheet_length: float,
+              boxes: list[tuple[float, float, float, float]], kerf: float,
+              rip_first: bool, profile: SawProfile) -> CutSequence:
+    result = CutSequence()
+    stack = [_Panel(0.0, 0.0, sheet_width, sheet_length, list(range(len(boxes))),
+                    rip_first, 1, None)]
+    last_vertical: Optional[bool] = None
+    last_fence: Optional[float] = None
+
+    while stack:
+        panel = stack.pop()
+        if not panel.pieces:
+            result.offcuts.append(Rectangle(
+                x=panel.x0, y=panel.y0,
+                width=panel.x1 - panel.x0, length=panel.y1 - panel.y0
+            ))
+            continue
+
+        positions = _stage_cuts(panel, boxes, panel.vertical, kerf)
+        if not positions:
+            # Nothing to cut in this direction: hand the panel to the other stage
+            panel.vertical = not panel.vertical
+            positions = _stage_cuts(panel, boxes, panel.vertical, kerf)
+        if not positions:
+            if len(panel.pieces) > 1:
+                raise ValueError("Layout is not guillotine-cuttable")
+            result.piece_order.append(panel.pieces[0])
+            continue
+
+        vertical = panel.vertical
+        lo = panel.x0 if vertical else panel.y0
+        axis = 0 if vertical else 1
+        starts = sorted(boxes[i][axis] for i in panel.pieces)
+        steps = []
+        previous_edge = lo
+        for position in positions:
+            # A cut with pieces on only one side just removes waste
+            below = bisect_right(starts, position + EPSILON) > bisect_left(starts, previous_edge - EPSILON)
+            above = starts[-1] >= position + kerf - EPSILON
+            kind = (RIP if vertical else CROSSCUT) if below and above else TRIM
+            fence = round(position - previous_edge, 6)
+            cut = SawCut(
+                step=len(result.cuts) + 1,
+                kind=kind,
+                stage=panel.stage,
+                parent=panel.parent,
+                x1=position if vertical else panel.x0,
+                y1=panel.y0 if vertical else position,
+                x2=position if vertical else panel.x1,
+                y2=panel.y1 if vertical else position,
+                fence=fence,
+                move_fence=fence != last_fence,
+                rotate_before=last_vertical is not None and vertical != last_vertical,
+            )
+            result.cuts.append(cut)
+            steps.append(cut.step)
+            result.fence_moves += cut.move_fence
+            result.rotations += cut.rotate_before
+            last_fence = fence
+            last_vertical = vertical
+            previous_edge = position + kerf
+
+        children = _split(panel, boxes, positions, kerf, steps)
+
+        # Process identical panels back to back so fence settings carry over
+        ordered = sorted(children, key=lambda c: _signature(c, boxes))
+        stack.extend(reversed(ordered))
+
+    result.saw_time = (
+        sum(profile.cut_overhead + cut.length / profile.feed_rate for cut in result.cuts)
+        + result.fence_moves * profile.fence_move
+        + result.rotations * profile.rotation
+    )
+    return result
+
+
+def sequence_sheet(sheet_width: float, sheet_length: float,
+                   pieces: Sequence[tuple[float, float, float, float]], kerf: float,
+                   profile: Optional[SawProfile] = None) -> CutSequence:
+    """
+    Build the ordered guillotine cut sequence for one sheet.
+
+    Both starting orientations are tried (rip first and crosscut first) and
+    the one with the lower estimated saw time is returned.
+
+    Args:
+        sheet_width: Sheet width in millimeters
+        sheet_length: Sheet length in millimeters
+        pieces: Placed pieces as (x, y, width, length), already rotated
+        kerf: Blade kerf width in millimeters
+        profile: Saw timing model, defaults to SawProfile()
+
+    Returns:
+        CutSequence with cuts in execution order
+    """
+    profile = profile or SawProfile()
+    boxes = [(x, y, x + w, y + l) for x, y, w, l in pieces]
+    if not boxes:
+        return CutSequence(offcuts=[Rectangle(x=0, y=0, width=sheet_width, length=sheet_length)])
+
+    candidates = []
+    for rip_first in (True, False):
+        try:
+            candidates.append(_sequence(sheet_width, sheet_length, boxes, kerf, rip_first, profile))
+        except ValueError:
+            continue
+    if not candidates:
+        raise ValueError("Layout is not guillotine-cuttable")
+    return min(candidates, key=lambda s: s.saw_time)
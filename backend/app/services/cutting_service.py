@@ -1,34 +1,87 @@
 """Service layer for cutting plan optimization."""
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
 from app.models.stock_sheet import StockSheet
 from app.models.required_cut import RequiredCut
 from app.models.cutting_plan import CuttingPlan
-from app.models.plan_assignment import PlanAssignment
-from app.services.optimizer import GuillotineBinPacker, Cut, Sheet
-from app.schemas.plan import CuttingPlanResponse, SheetPlan, CutAssignment, UnplacedCutResponse, UnusedSheetResponse
-from collections import defaultdict
+from app.models.plan_assignment import ASSIGNMENT_SOURCE_ID, PlanAssignment
+from app.models.project import DEFAULT_PROJECT_ID
+from app.services.admission import admit, get_admission
+from app.services.engines import AUTO, DEFAULT_ENGINE, ENGINES, Seed, resolve_engine
+from app.services.metrics import CACHE_REQUESTS, OPTIMIZER_PHASE_SECONDS, REGISTRY, Gauge, observe_solve
+from app.services.optimizer import Cut, Sheet
+from app.services.plan_format import plan_body
+from app.services.planner import SolvedPlan, plan_input_key, solve_preview, unchanged_sheets
+from app.services.profiling import (FIXTURE, PROFILE, hotspots, new_artifact_id, save_fixture,
+                                    save_profile)
+from app.services.remnant_service import REMNANT_PRIORITY, remnant_sheets
+from app.services.single_flight import SingleFlight
+from app.services.solver_pool import run_solver
+from app.services.purchase import SheetType, plan_purchase
+from app.services.solver_worker import Job, decode_result, encode_job, pack_job, profile_job, solve_job
+from datetime import datetime, timezone
+from fastapi.concurrency import run_in_threadpool
+from typing import Any
+import time
+import uuid
 
+# Assignment rows per INSERT when persisting a plan
+INSERT_CHUNK_ROWS = 5000
 
-def create_optimization_plan(db: Session, kerf_width: float = 3.0) -> CuttingPlanResponse:
+# Identical optimizations in flight at the same time share one solve and plan
+_inflight_plans = SingleFlight()
+
+REGISTRY.register(Gauge(
+    "woodcutter_optimizer_inflight", "Distinct optimizations currently being solved",
+    callback=lambda: len(_inflight_plans)))
+
+
+async def load_cuts(db: AsyncSession, project_id: str = DEFAULT_PROJECT_ID) -> list[Cut]:
+    """
+    Load a project's required cuts in optimizer format.
+
+    Raises:
+        ValueError: When the project has no cuts
     """
-    Create an optimized cutting plan from current stock and cuts.
-    
+    required_cuts = list((await db.scalars(
+        select(RequiredCut).where(RequiredCut.project_id == project_id)
+    )).all())
+    if not required_cuts:
+        raise ValueError("No required cuts specified")
+    return [
+        Cut(
+            id=c.id,
+            width=c.width,
+            length=c.length,
+            thickness=c.thickness,
+            label=c.label,
+            quantity=c.quantity
+        )
+        for c in required_cuts
+    ]
+
+
+async def load_plan_inputs(db: AsyncSession, project_id: str = DEFAULT_PROJECT_ID,
+                           use_remnants: bool = False) -> tuple[list[StockSheet], list[Cut], list[Sheet]]:
+    """
+    Load a project's stock sheets and required cuts in optimizer format.
+
     Args:
         db: Database session
-        kerf_width: Blade kerf width in millimeters
-        
+        project_id: Project to plan
+        use_remnants: Add matching remnants to the sheets
+
     Returns:
-        CuttingPlanResponse with optimization results
+        (stock sheet rows, cuts, sheets)
     """
-    # Fetch all stock sheets and required cuts
-    stock_sheets = db.query(StockSheet).all()
-    required_cuts = db.query(RequiredCut).all()
-    
+    stock_sheets = list((await db.scalars(
+        select(StockSheet).where(StockSheet.project_id == project_id)
+    )).all())
     if not stock_sheets:
         raise ValueError("No stock sheets available")
-    if not required_cuts:
-        raise ValueError("No required cuts specified")
-    
+    cuts = await load_cuts(db, project_id)
+
     # Convert to optimizer format
     sheets = [
         Sheet(
@@ -42,148 +95,365 @@ def create_optimization_plan(db: Session, kerf_width: float = 3.0) -> CuttingPla
         )
         for s in stock_sheets
     ]
-    
-    cuts = [
-        Cut(
-            id=c.id,
-            width=c.width,
-            length=c.length,
-            thickness=c.thickness,
-            label=c.label,
-            quantity=c.quantity
-        )
-        for c in required_cuts
-    ]
-    
-    # Run optimization
-    optimizer = GuillotineBinPacker(kerf=kerf_width)
-    placements, unplaced = optimizer.optimize(cuts, sheets)
-    
-    # Helper to get original sheet ID (strips __instN suffix from expanded sheets)
-    def original_id(sheet_id):
-        s = str(sheet_id)
-        return s.split('__inst')[0]
-    
-    # Create cutting plan record
+
+    if use_remnants:
+        sheets.extend(await remnant_sheets(db, cuts))
+
+    return stock_sheets, cuts, sheets
+
+
+async def load_seed(db: AsyncSession, plan_id: str, project_id: str = DEFAULT_PROJECT_ID) -> Seed:
+    """
+    Load a stored plan's layouts to warm-start an optimization from.
+
+    Raises:
+        ValueError: When the project has no such plan
+    """
+    plan = await db.get(CuttingPlan, plan_id)
+    if not plan or plan.project_id != project_id:
+        raise ValueError("Warm-start plan not found")
+    rows = await db.execute(
+        select(ASSIGNMENT_SOURCE_ID, PlanAssignment.sheet_instance, PlanAssignment.cut_id,
+               PlanAssignment.x_position, PlanAssignment.y_position, PlanAssignment.rotation)
+        .where(PlanAssignment.plan_id == plan_id)
+        .order_by(ASSIGNMENT_SOURCE_ID, PlanAssignment.sheet_instance, PlanAssignment.sequence_number)
+    )
+    layouts: dict[tuple[str, int], list[tuple[str, float, float, bool]]] = {}
+    for sheet_id, instance, cut_id, x, y, rotation in rows:
+        layouts.setdefault((sheet_id, instance or 0), []).append((cut_id, x, y, rotation == 90))
+    return [(sheet_id, instance, placements) for (sheet_id, instance), placements in layouts.items()]
+
+
+async def save_plan(db: AsyncSession, solved: SolvedPlan,
+                    project_id: str = DEFAULT_PROJECT_ID, plan_id: str | None = None) -> CuttingPlan:
+    """
+    Persist a solved plan and its assignments in one transaction.
+
+    Each assignment also keeps its sheet's position in the plan, instance
+    label and size and its cut's label and size as planned, which the
+    exports read (see export_service).
+
+    Args:
+        db: Database session
+        solved: Result of solve_plan
+        project_id: Project the plan belongs to
+        plan_id: Id to store the plan under (generated when not given)
+
+    Returns:
+        The stored CuttingPlan
+    """
     plan = CuttingPlan(
-        kerf_width=kerf_width,
-        sheets_used=len(set(p.sheet.id for p in placements)),
-        total_waste=0.0  # Will calculate below
+        project_id=project_id,
+        kerf_width=solved.kerf_width,
+        sheets_used=len(solved.layouts),
+        total_waste=solved.total_waste,
+        estimated_saw_time=solved.saw_time
     )
+    if plan_id is not None:
+        plan.id = plan_id
     db.add(plan)
-    db.flush()
-    
-    # Group placements by sheet instance
-    placements_by_sheet = defaultdict(list)
-    for placement in placements:
-        placements_by_sheet[placement.sheet.id].append(placement)
-    
-    # Create plan assignments and calculate waste
-    total_waste = 0.0
-    sequence = 1
-    
-    for sheet_id, sheet_placements in placements_by_sheet.items():
-        orig_id = original_id(sheet_id)
-        sheet = next(s for s in sheets if s.id == orig_id)
-        sheet_area = sheet.width * sheet.length
-        used_area = sum(p.cut.width * p.cut.length for p in sheet_placements)
-        waste_area = sheet_area - used_area
-        total_waste += waste_area
-        
-        for placement in sheet_placements:
-            assignment = PlanAssignment(
-                plan_id=plan.id,
-                sheet_id=orig_id,
-                cut_id=placement.cut.id,
-                x_position=placement.x,
-                y_position=placement.y,
-                rotation=90 if placement.rotated else 0,
-                sequence_number=sequence,
-                waste_area=waste_area if sequence == 1 else None
-            )
-            db.add(assignment)
-            sequence += 1
-    
-    plan.total_waste = total_waste
-    db.commit()
-    db.refresh(plan)
-    
-    # Build response
-    sheet_plans = []
-    for sheet_id, sheet_placements in placements_by_sheet.items():
-        orig_id = original_id(sheet_id)
-        sheet = next(s for s in sheets if s.id == orig_id)
-        # Use the expanded instance label from the placement
-        instance_label = sheet_placements[0].sheet.label
-        sheet_area = sheet.width * sheet.length
-        used_area = sum(p.cut.width * p.cut.length for p in sheet_placements)
-        
-        assignments = [
-            CutAssignment(
-                cut_id=p.cut.id,
-                cut_label=p.cut.label,
-                sheet_id=orig_id,
-                sheet_label=instance_label,
-                x_position=p.x,
-                y_position=p.y,
-                rotation=90 if p.rotated else 0,
-                sequence_number=i + 1,
-                width=p.cut.width,
-                length=p.cut.length
-            )
-            for i, p in enumerate(sheet_placements)
-        ]
-        
-        sheet_plans.append(SheetPlan(
-            sheet_id=orig_id,
-            sheet_label=instance_label,
-            sheet_width=sheet.width,
-            sheet_length=sheet.length,
-            assignments=assignments,
-            waste_area=sheet_area - used_area
-        ))
-    
-    # Build unplaced cuts response
-    unplaced_response = [
-        UnplacedCutResponse(
-            cut_id=u.cut.id,
-            cut_label=u.cut.label,
-            width=u.cut.width,
-            length=u.cut.length,
-            thickness=u.cut.thickness,
-            reason=u.reason
-        )
-        for u in unplaced
-    ]
-    
-    # Calculate unused sheets (original qty minus instances used)
-    used_instances = defaultdict(int)
-    for sheet_id in placements_by_sheet:
-        used_instances[original_id(sheet_id)] += 1
-    
-    unused_sheets_response = []
-    for s in stock_sheets:
-        original_qty = getattr(s, 'quantity', 1) or 1
-        used_qty = used_instances.get(s.id, 0)
-        remaining = original_qty - used_qty
-        if remaining > 0:
-            unused_sheets_response.append(UnusedSheetResponse(
-                sheet_id=s.id,
-                label=s.label,
-                width=s.width,
-                length=s.length,
-                thickness=s.thickness,
-                quantity=remaining,
-                priority=s.priority.value
-            ))
-    
-    return CuttingPlanResponse(
-        id=plan.id,
-        created_at=plan.created_at,
-        total_waste=plan.total_waste,
-        kerf_width=plan.kerf_width,
-        sheets_used=plan.sheets_used,
-        sheet_plans=sheet_plans,
-        unplaced_cuts=unplaced_response,
-        unused_sheets=unused_sheets_response
+    await db.flush()
+
+    # Insert straight from the placement table, a chunk of rows at a time
+    table = solved.table
+    cuts, cut_column, x_column, y_column, rotated_column = table.cuts, table.cut, table.x, table.y, table.rotated
+    rows: list[dict[str, Any]] = []
+    for number, layout in enumerate(solved.layouts, start=1):
+        instance, sheet = layout.instance, layout.sheet
+        remnant = sheet.priority == REMNANT_PRIORITY
+        sheet_id, remnant_id = (None, layout.source_id) if remnant else (layout.source_id, None)
+        for i, row in enumerate(range(layout.start, layout.stop)):
+            cut = cuts[cut_column[row]]
+            rows.append({
+                "plan_id": plan.id,
+                "sheet_id": sheet_id,
+                "remnant_id": remnant_id,
+                "sheet_instance": instance,
+                "sheet_number": number,
+                "cut_id": cut.id,
+                "x_position": x_column[row],
+                "y_position": y_column[row],
+                "rotation": 90 if rotated_column[row] else 0,
+                "sequence_number": i + 1,
+                "waste_area": layout.waste_area if i == 0 else None,
+                "sheet_label": sheet.label,
+                "sheet_width": sheet.width,
+                "sheet_length": sheet.length,
+                "cut_label": cut.label,
+                "cut_width": cut.width,
+                "cut_length": cut.length,
+                "cut_thickness": cut.thickness
+            })
+            if len(rows) == INSERT_CHUNK_ROWS:
+                await db.execute(insert(PlanAssignment), rows)
+                rows = []
+    if rows:
+        await db.execute(insert(PlanAssignment), rows)
+
+    await db.commit()
+    await db.refresh(plan)
+    return plan
+
+
+def build_plan_response(plan: CuttingPlan, solved: SolvedPlan,
+                        stock_sheets: list[StockSheet], columnar: bool = False) -> dict[str, Any]:
+    """
+    Build the API response body for a stored plan.
+
+    The body is assembled as plain dicts and lists in the shape of
+    CuttingPlanResponse: every value comes straight from the solver, so
+    per-object model validation (tens of thousands of assignments on big
+    jobs) would only cost time. Routes serialize it with orjson.
+
+    Args:
+        plan: Stored cutting plan
+        solved: Result of solve_plan the plan was stored from
+        stock_sheets: Stock sheet rows the plan was solved with
+        columnar: Build the columnar format (see plan_format)
+
+    Returns:
+        Response body matching CuttingPlanResponse
+    """
+    return plan_body(solved, stock_sheets, plan.id, plan.created_at, columnar)
+
+
+async def create_optimization_plan(db: AsyncSession, project_id: str = DEFAULT_PROJECT_ID,
+                                   kerf_width: float = 3.0,
+                                   minimize_saw_time: bool = False,
+                                   use_remnants: bool = False,
+                                   algorithm: str = AUTO,
+                                   time_limit: float | None = None,
+                                   warm_start_plan_id: str | None = None,
+                                   random_seed: int = 0,
+                                   restarts: int | None = None,
+                                   columnar: bool = False,
+                                   plan_id: str | None = None,
+                                   profile: bool = False,
+                                   dump_fixture: bool = False) -> dict[str, Any]:
+    """
+    Create an optimized cutting plan from a project's stock and cuts.
+
+    The solve itself runs in the solver process pool once admission
+    control lets it through; only loading, persisting and building the
+    response happen in the API process. Requests arriving while a solve of
+    the same inputs is in flight wait for it and return the same plan;
+    profiled requests always run their own solve.
+
+    Args:
+        db: Database session
+        project_id: Project to plan
+        kerf_width: Blade kerf width in millimeters
+        minimize_saw_time: Use estimated saw time as a secondary objective
+        use_remnants: Pack matching remnants before any stock sheet
+        algorithm: Packing engine name, or "auto" to pick one by job size
+            and time limit
+        time_limit: Seconds a time-bounded engine may search
+        warm_start_plan_id: Stored plan whose still-valid sheets are kept
+            unless the engine finds a better plan; adds "unchanged_sheets"
+            to the body
+        random_seed: Seed of a seeded engine's random choices
+        restarts: Restarts a seeded engine runs instead of searching for
+            time_limit; the same inputs, seed and restarts give the same plan
+        columnar: Return the plan in the columnar format
+        plan_id: Id to store the plan under, such as the id of its preview
+            (see create_preview_plan); such requests run their own solve
+        profile: Solve under cProfile; adds a "profile" summary to the body
+        dump_fixture: Save the solve's inputs; adds "fixture_url" to the body
+
+    Returns:
+        Response body matching CuttingPlanResponse (see build_plan_response)
+
+    Raises:
+        AdmissionRejected: When the job's lane is full or the wait timed out
+        PermissionError: When profile or dump_fixture is asked for while
+            profiling is disabled
+        ValueError: For an unknown algorithm or one that can't take the
+            job or a restart count, or an unknown warm-start plan
+    """
+    if (profile or dump_fixture) and not settings.profiling_enabled:
+        raise PermissionError("Profiling is disabled on this server")
+
+    stock_sheets, cuts, sheets = await load_plan_inputs(db, project_id, use_remnants)
+    seed = await load_seed(db, warm_start_plan_id, project_id) if warm_start_plan_id else None
+    # End the read transaction so queued jobs don't hold pooled connections
+    await db.commit()
+
+    pieces = sum(c.quantity for c in cuts)
+    engine = resolve_engine(algorithm, pieces, time_limit, use_remnants, settings.auto_fast_engine_pieces, restarts)
+    # Only seeded engines take (and report) a seed and restart count
+    seeded = ENGINES[engine].info.seeded
+    engine_seed = random_seed if seeded else None
+    engine_restarts = restarts if seeded else None
+    job = encode_job(cuts, sheets, kerf_width, minimize_saw_time, engine, time_limit, seed,
+                     engine_seed, engine_restarts, settings.search_workers)
+    # Profile and fixture of one request share an id (unused otherwise)
+    artifact_id = new_artifact_id()
+    extras: dict[str, Any] = {}
+    if dump_fixture:
+        await run_in_threadpool(save_fixture, artifact_id, job)
+        extras["fixture_url"] = f"/api/optimize/artifacts/{artifact_id}/{FIXTURE}"
+
+    solved_here = False
+
+    async def solve_and_save() -> dict[str, Any]:
+        nonlocal solved_here
+        solved_here = True
+        async with admit(pieces):
+            if profile:
+                result, raw_stats = await run_solver(profile_job, job)
+            else:
+                result = await run_solver(solve_job, job)
+        solved = decode_result(result, cuts, sheets, kerf_width)
+        observe_solve(solved.pack_stats, solved.sequence_seconds)
+
+        started = time.perf_counter()
+        plan = await save_plan(db, solved, project_id, plan_id)
+        OPTIMIZER_PHASE_SECONDS.observe(time.perf_counter() - started, phase="persist")
+
+        started = time.perf_counter()
+        body = build_plan_response(plan, solved, stock_sheets, columnar)
+        body["algorithm"] = engine
+        body["random_seed"] = engine_seed
+        body["restarts"] = engine_restarts
+        if seed is not None:
+            body["unchanged_sheets"] = unchanged_sheets(solved, seed)
+        OPTIMIZER_PHASE_SECONDS.observe(time.perf_counter() - started, phase="response")
+
+        if profile:
+            path = await run_in_threadpool(save_profile, artifact_id, raw_stats)
+            body["profile"] = {
+                "id": artifact_id,
+                "url": f"/api/optimize/artifacts/{artifact_id}/{PROFILE}",
+                "hotspots": await run_in_threadpool(hotspots, path, settings.profile_top_n),
+            }
+        return body
+
+    if profile or plan_id is not None:
+        body = await solve_and_save()
+    else:
+        key = plan_input_key(cuts, sheets, kerf_width, minimize_saw_time, engine, time_limit, warm_start_plan_id,
+                             engine_seed, engine_restarts)
+        # Callers only share a body built in the format they asked for
+        key = f"{key}:columnar" if columnar else key
+        try:
+            body = await _inflight_plans.run(key, solve_and_save)
+        finally:
+            CACHE_REQUESTS.inc(cache="plans", result="miss" if solved_here else "hit")
+    # Coalesced callers share one body; don't add extras to it in place
+    return {**body, **extras} if extras else body
+
+
+async def create_preview_plan(db: AsyncSession, plan_id: str, project_id: str = DEFAULT_PROJECT_ID,
+                              kerf_width: float = 3.0,
+                              use_remnants: bool = False,
+                              algorithm: str = AUTO,
+                              time_limit: float | None = None,
+                              restarts: int | None = None,
+                              columnar: bool = False) -> dict[str, Any] | None:
+    """
+    Build a quick, unsaved plan to show while the full solve runs.
+
+    The preview is packed first-fit decreasing without saw sequencing (see
+    planner.solve_preview) in the API process, skipping admission control
+    and the solver pool queue. That is only cheap for small jobs: above
+    settings.preview_max_pieces pieces there is no preview.
+
+    Args:
+        db: Database session
+        plan_id: Id of the preview, which the full plan is to be stored
+            under (create_optimization_plan's plan_id)
+        project_id: Project to plan
+        kerf_width: Blade kerf width in millimeters
+        use_remnants: Pack matching remnants before any stock sheet
+        algorithm: Engine the full solve will use, checked up front so a
+            job it can't take fails before any preview is shown
+        time_limit: Seconds the full solve's engine may search
+        restarts: Restarts the full solve's engine runs
+        columnar: Return the plan in the columnar format
+
+    Returns:
+        Response body matching CuttingPlanResponse, with "preview" set, or
+        None for a job too large to preview
+
+    Raises:
+        ValueError: For an unknown algorithm or one that can't take the
+            job or a restart count
+    """
+    stock_sheets, cuts, sheets = await load_plan_inputs(db, project_id, use_remnants)
+    await db.commit()
+    pieces = sum(c.quantity for c in cuts)
+    resolve_engine(algorithm, pieces, time_limit, use_remnants, settings.auto_fast_engine_pieces, restarts)
+    if pieces > settings.preview_max_pieces:
+        return None
+
+    started = time.perf_counter()
+    solved = await run_in_threadpool(solve_preview, cuts, sheets, kerf_width)
+    body = plan_body(solved, stock_sheets, plan_id, datetime.now(timezone.utc), columnar)
+    body["algorithm"] = DEFAULT_ENGINE
+    body["preview"] = True
+    OPTIMIZER_PHASE_SECONDS.observe(time.perf_counter() - started, phase="preview")
+    return body
+
+
+async def create_purchase_plan(db: AsyncSession, sheet_types: list[SheetType],
+                               project_id: str = DEFAULT_PROJECT_ID,
+                               kerf_width: float = 3.0,
+                               minimize_saw_time: bool = False) -> dict[str, Any]:
+    """
+    Find the cheapest purchase of sheet types for a project's cuts.
+
+    Every candidate packing runs in the solver pool under an admission
+    slot of its own, in the lane of the project's cut count, so a
+    purchase search takes its turn with other optimizations instead of
+    packing the whole pool under one slot. At most as many candidates
+    run at a time as the lane and the pool both allow. The winning
+    purchase is solved once more with saw sequencing for its plan, which
+    is returned but not stored: its sheets are not in stock yet.
+
+    Args:
+        db: Database session
+        sheet_types: Candidate sheet types, each in unlimited quantity
+        project_id: Project whose cuts are planned
+        kerf_width: Blade kerf width in millimeters
+        minimize_saw_time: Use estimated saw time as a secondary objective
+
+    Returns:
+        Response body matching PurchasePlanResponse
+
+    Raises:
+        AdmissionRejected: When the job's lane is full or the wait timed out
+        ValueError: When the project has no cuts or some cut fits no sheet type
+    """
+    cuts = await load_cuts(db, project_id)
+    await db.commit()
+
+    lane = get_admission().lane_for(sum(c.quantity for c in cuts))
+
+    async def evaluate(job: Job) -> tuple[dict[str, int], int]:
+        async with lane.admit():
+            packed: tuple[dict[str, int], int] = await run_solver(pack_job, job)
+        return packed
+
+    purchase = await plan_purchase(
+        cuts, sheet_types, kerf_width, evaluate,
+        parallelism=max(1, min(settings.optimizer_workers, lane.concurrency)),
+        max_evaluations=settings.purchase_max_evaluations,
     )
+    sheets = purchase.sheets()
+    async with lane.admit():
+        result = await run_solver(solve_job, encode_job(cuts, sheets, kerf_width, minimize_saw_time))
+    solved = decode_result(result, cuts, sheets, kerf_width)
+
+    return {
+        "total_cost": purchase.cost,
+        "sheets": [
+            {"label": t.label, "width": t.width, "length": t.length, "thickness": t.thickness,
+             "unit_price": t.unit_price, "quantity": quantity, "cost": quantity * t.unit_price}
+            for t, quantity in zip(sheet_types, purchase.quantities)
+            if quantity
+        ],
+        "evaluated": purchase.evaluated,
+        "pruned": purchase.pruned,
+        "complete": purchase.complete,
+        "plan": plan_body(solved, [], str(uuid.uuid4()), datetime.now(timezone.utc)),
+    }
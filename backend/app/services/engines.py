@@ -0,0 +1,607 @@
+"""Registry of packing engines selectable per optimization.
+
+Every engine turns cuts and sheets into placements on quantity-1 sheet
+instances, like GuillotineBinPacker.optimize, and describes itself with
+EngineInfo so callers (and the "auto" mode) can pick one by capability:
+
+- guillotine: the first-fit-decreasing guillotine packer
+- search: seeded randomized restarts of the same packer, keeping the
+  best layout found; runs for a time limit, or for a fixed number of
+  restarts that reproduces the same plan from the same seed (see
+  SearchEngine)
+- exhaustive: every distinct piece order through the packer; the best
+  of those orders (not a proven optimum), for very small jobs only
+- shelf: near-linear strip packing for very large jobs
+
+All engines produce guillotine layouts, which the saw sequencing relies
+on. Any engine can be warm-started from a previous plan (see warm_start):
+the previous layouts become the incumbent the engine has to beat.
+
+Like the packer, this module is imported by optimizer workers and stays
+free of web and database code.
+"""
+import math
+import multiprocessing
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from dataclasses import dataclass, replace
+from itertools import permutations
+from multiprocessing.context import BaseContext
+from typing import Any, Iterator, Optional, TYPE_CHECKING
+from app.services.optimizer import (
+    Cut, GuillotineBinPacker, PackStats, Placement, Sheet, UnplacedCut,
+    expand_cuts, expand_sheets, sort_sheets, unplaced_cuts,
+)
+
+if TYPE_CHECKING:
+    from app.services.cut_sequence import SawProfile
+
+AUTO = "auto"
+DEFAULT_ENGINE = "guillotine"
+# Seconds a time-bounded engine runs when the request sets no time limit
+DEFAULT_TIME_LIMIT = 2.0
+# auto: jobs above this many pieces go to the shelf engine
+AUTO_FAST_PIECES = 5000
+# Shared sheet count and restart before any packing is known
+NO_LIMIT = 2 ** 62
+
+Packing = tuple[list[Placement], list[UnplacedCut], PackStats]
+# (placements, unplaced cuts) an engine has to beat
+Incumbent = tuple[list[Placement], list[UnplacedCut]]
+# Layouts of a previous plan: (sheet id, instance, [(cut id, x, y, rotated)]) per sheet
+Seed = list[tuple[str, int, list[tuple[str, float, float, bool]]]]
+
+
+@dataclass(frozen=True)
+class EngineInfo:
+    """Capabilities of an engine."""
+    name: str
+    description: str
+    guillotine: bool
+    exact: bool
+    time_bounded: bool
+    supports_remnants: bool
+    # Largest job (in pieces) the engine accepts, None for no limit
+    max_pieces: Optional[int] = None
+    # Takes a random seed and a restart count (see SearchEngine)
+    seeded: bool = False
+
+
+class Engine(ABC):
+    """Base class of registered engines."""
+    info: EngineInfo
+
+    @abstractmethod
+    def optimize(self, cuts: list[Cut], sheets: list[Sheet], kerf: float,
+                 saw_profile: Optional["SawProfile"] = None,
+                 time_limit: Optional[float] = None,
+                 incumbent: Optional[Incumbent] = None,
+                 random_seed: Optional[int] = None,
+                 restarts: Optional[int] = None,
+                 workers: int = 1) -> Packing:
+        """
+        Pack cuts onto sheets.
+
+        Args:
+            cuts: Required cuts (quantities are expanded by the engine)
+            sheets: Available sheets (quantities are expanded by the engine)
+            kerf: Blade kerf width in millimeters
+            saw_profile: When given, saw time is a secondary objective
+            time_limit: Seconds a time-bounded engine may search
+            incumbent: Packing of the same cuts and sheets to start from;
+                it is returned unless the engine finds a strictly better one
+            random_seed: Seed of a seeded engine's random choices
+            restarts: Restarts a seeded engine runs instead of searching
+                for time_limit
+            workers: Processes a seeded engine may restart in
+
+        Returns:
+            (placements, unplaced cuts, statistics of the run)
+        """
+
+
+def packing_score(placements: list[Placement], unplaced: list[UnplacedCut]) -> tuple[float, int, float]:
+    """Lower is better: unplaced area, then sheets used, then area of the sheets used."""
+    used = {p.sheet.id: p.sheet for p in placements}
+    return (
+        sum(u.cut.width * u.cut.length for u in unplaced),
+        len(used),
+        sum(s.width * s.length for s in used.values()),
+    )
+
+
+def _keep_better(packing: Incumbent, incumbent: Optional[Incumbent]) -> Incumbent:
+    """The incumbent unless packing scores strictly better."""
+    if incumbent is not None and packing_score(*incumbent) <= packing_score(*packing):
+        return incumbent
+    return packing
+
+
+def sheet_lower_bound(pieces: list[Cut], sheets: list[Sheet]) -> int:
+    """
+    Fewest sheets any layout can use: per thickness, piece area over the
+    largest sheet of that thickness (kerf ignored).
+    """
+    largest: dict[float, float] = {}
+    for s in sheets:
+        largest[s.thickness] = max(largest.get(s.thickness, 0.0), s.width * s.length)
+    area: dict[float, float] = {}
+    for c in pieces:
+        if c.thickness in largest:
+            area[c.thickness] = area.get(c.thickness, 0.0) + c.width * c.length * c.quantity
+    return sum(math.ceil(total / largest[t]) for t, total in area.items())
+
+
+class GuillotineEngine(Engine):
+    info = EngineInfo(
+        name="guillotine",
+        description="First-fit decreasing guillotine packing",
+        guillotine=True, exact=False, time_bounded=False, supports_remnants=True,
+    )
+
+    def optimize(self, cuts: list[Cut], sheets: list[Sheet], kerf: float,
+                 saw_profile: Optional["SawProfile"] = None,
+                 time_limit: Optional[float] = None,
+                 incumbent: Optional[Incumbent] = None,
+                 random_seed: Optional[int] = None,
+                 restarts: Optional[int] = None,
+                 workers: int = 1) -> Packing:
+        packer = GuillotineBinPacker(kerf=kerf, saw_profile=saw_profile)
+        placements, unplaced = _keep_better(packer.optimize(cuts, sheets), incumbent)
+        return placements, unplaced, packer.stats
+
+
+def restart_order(pieces: list[Cut], random_seed: int, restart: int) -> list[Cut]:
+    """
+    Piece order a search restart packs.
+
+    Decreasing area with multiplicative noise keeps big pieces early while
+    still exploring different first fits. Every restart draws from its own
+    generator, so its order depends on the seed and its number only, not
+    on the process or the restarts run before it.
+    """
+    rng = random.Random(f"{random_seed}:{restart}")
+    return sorted(pieces, key=lambda c: -c.width * c.length * rng.uniform(0.6, 1.4))
+
+
+class SharedBest:
+    """
+    What the processes of a search share: the fewest sheets of a packing
+    that places every piece, which lets them stop restarts that can only be
+    worse, and the first restart that reached the sheet lower bound, after
+    which no restart can change the result.
+
+    The area (or waste) of the best packing is not shared: packings
+    compare on sheet count before area, so a restart that has used more
+    area than the best one can still finish on fewer sheets, and one that
+    has used as many sheets with pieces left is already stopped on the
+    count alone. Equal counts are settled when the results are gathered.
+    """
+
+    def __init__(self, context: Optional[BaseContext] = None) -> None:
+        self.values = (context or multiprocessing.get_context()).Array("q", [NO_LIMIT, NO_LIMIT])
+
+    def sheets(self) -> int:
+        return int(self.values[0])
+
+    def last_restart(self) -> int:
+        return int(self.values[1])
+
+    def offer(self, score: tuple[float, int, float], restart: int, bound: tuple[float, int]) -> None:
+        """Record the score of a finished restart (-1 for the starting packing)."""
+        with self.values.get_lock():
+            if score[0] == 0 and score[1] < self.values[0]:
+                self.values[0] = score[1]
+            if score[:2] <= bound and restart < self.values[1]:
+                self.values[1] = restart
+
+
+def _run_restarts(packer: GuillotineBinPacker, pieces: list[Cut], instances: list[Sheet],
+                  shared: SharedBest, bound: tuple[float, int], random_seed: int, first: int, step: int,
+                  restarts: Optional[int], deadline: Optional[float]) -> list[tuple[tuple[float, int, float], int]]:
+    """
+    Run restarts first, first + step, ... until restarts, the deadline or
+    the shared last restart.
+
+    Returns:
+        (score, restart) of every restart not stopped for being worse
+    """
+    found = []
+    restart = first
+    while (restart <= shared.last_restart() and (restarts is None or restart < restarts)
+           and (deadline is None or time.time() < deadline)):
+        candidate = packer.pack_limited(restart_order(pieces, random_seed, restart), instances, shared.sheets)
+        if candidate is not None:
+            score = packing_score(*candidate)
+            shared.offer(score, restart, bound)
+            found.append((score, restart))
+        restart += step
+    return found
+
+
+# Search state of a worker process, set by _init_search_worker
+_search_worker_args: tuple = ()
+
+
+def _init_search_worker(*args: Any) -> None:
+    global _search_worker_args
+    _search_worker_args = args
+
+
+def _search_worker(first: int) -> list[tuple[tuple[float, int, float], int]]:
+    kerf, saw_profile, pieces, instances, shared, bound, random_seed, step, restarts, deadline = _search_worker_args
+    packer = GuillotineBinPacker(kerf=kerf, saw_profile=saw_profile)
+    return _run_restarts(packer, pieces, instances, shared, bound, random_seed, first, step, restarts, deadline)
+
+
+class SearchEngine(Engine):
+    """
+    Randomized restarts of the guillotine packer, starting from first-fit
+    decreasing (or the incumbent).
+
+    Restarts are numbered and restart i packs restart_order(pieces, seed,
+    i). With a restart count the result is the best of restarts 0 to
+    count - 1, lowest number first among equal scores, so the same inputs
+    and seed always give the same plan. Without one, restarts run until
+    the time limit.
+
+    With several workers, worker w runs restarts w, w + workers, ... in
+    its own process. The workers share the best sheet count in shared
+    memory: a restart stops as soon as it has used that many sheets with
+    pieces left. Only restarts strictly worse than one already found are
+    stopped, and restarts after the first one to reach the lower bound are
+    dropped, so the plan of a restart count doesn't depend on the number
+    of workers or their timing either.
+    """
+    info = EngineInfo(
+        name="search",
+        description="Seeded randomized restarts of the guillotine packer, for a time limit or a restart count",
+        guillotine=True, exact=False, time_bounded=True, supports_remnants=True, seeded=True,
+    )
+
+    def __init__(self, seed: int = 0) -> None:
+        self.seed = seed
+
+    def optimize(self, cuts: list[Cut], sheets: list[Sheet], kerf: float,
+                 saw_profile: Optional["SawProfile"] = None,
+                 time_limit: Optional[float] = None,
+                 incumbent: Optional[Incumbent] = None,
+                 random_seed: Optional[int] = None,
+                 restarts: Optional[int] = None,
+                 workers: int = 1) -> Packing:
+        packer = GuillotineBinPacker(kerf=kerf, saw_profile=saw_profile)
+        # Start from first-fit decreasing or the given incumbent, whichever is better
+        best = _keep_better(packer.optimize(cuts, sheets), incumbent)
+        best_score = packing_score(*best)
+        bound = (0.0, sheet_lower_bound(cuts, sheets))
+        if best_score[:2] <= bound or restarts == 0:
+            return best[0], best[1], packer.stats
+
+        random_seed = self.seed if random_seed is None else random_seed
+        # A time limit is wall-clock time and so never reproducible
+        deadline = None if restarts is not None else time.time() + (time_limit or DEFAULT_TIME_LIMIT)
+        pieces = expand_cuts(cuts)
+        instances = sort_sheets(expand_sheets(sheets))
+        if workers > 1:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            context = multiprocessing.get_context(method)
+            shared = SharedBest(context)
+            shared.offer(best_score, -1, bound)
+            args = (kerf, saw_profile, pieces, instances, shared, bound, random_seed, workers, restarts, deadline)
+            with context.Pool(workers, initializer=_init_search_worker, initargs=args) as pool:
+                found = [result for results in pool.map(_search_worker, range(workers)) for result in results]
+        else:
+            shared = SharedBest()
+            shared.offer(best_score, -1, bound)
+            found = _run_restarts(packer, pieces, instances, shared, bound, random_seed, 0, 1, restarts, deadline)
+
+        # Restarts after the first at the bound ran only on timing
+        found = [result for result in found if result[1] <= shared.last_restart()]
+        if found:
+            score, restart = min(found)
+            if score < best_score:
+                best = packer.pack(restart_order(pieces, random_seed, restart), instances)
+        return best[0], best[1], packer.stats
+
+
+def _distinct_orders(pieces: list[Cut]) -> Iterator[list[Cut]]:
+    """Every order of the pieces, counting identical pieces once."""
+    seen = set()
+    for order in permutations(range(len(pieces))):
+        key = tuple((pieces[i].id, pieces[i].width, pieces[i].length) for i in order)
+        if key not in seen:
+            seen.add(key)
+            yield [pieces[i] for i in order]
+
+
+class ExhaustiveEngine(Engine):
+    info = EngineInfo(
+        name="exhaustive",
+        description="Every distinct piece order through the guillotine packer; best of those orders",
+        guillotine=True, exact=False, time_bounded=False, supports_remnants=True,
+        max_pieces=7,
+    )
+
+    def optimize(self, cuts: list[Cut], sheets: list[Sheet], kerf: float,
+                 saw_profile: Optional["SawProfile"] = None,
+                 time_limit: Optional[float] = None,
+                 incumbent: Optional[Incumbent] = None,
+                 random_seed: Optional[int] = None,
+                 restarts: Optional[int] = None,
+                 workers: int = 1) -> Packing:
+        pieces = expand_cuts(cuts)
+        if self.info.max_pieces is not None and len(pieces) > self.info.max_pieces:
+            raise ValueError(f"The exhaustive engine handles at most {self.info.max_pieces} pieces")
+        packer = GuillotineBinPacker(kerf=kerf, saw_profile=saw_profile)
+        best = _keep_better(packer.optimize(cuts, sheets), incumbent)
+        best_score = packing_score(*best)
+        bound = (0.0, sheet_lower_bound(cuts, sheets))
+
+        instances = sort_sheets(expand_sheets(sheets))
+        for order in _distinct_orders(pieces):
+            if best_score[:2] <= bound:
+                break  # no order can use fewer sheets
+            candidate = packer.pack(order, instances)
+            score = packing_score(*candidate)
+            if score < best_score:
+                best, best_score = candidate, score
+        return best[0], best[1], packer.stats
+
+
+class ShelfEngine(Engine):
+    """
+    Strip packing: pieces sorted by height fill full-width strips (rips)
+    that are crosscut into pieces, and shorter pieces stack within a
+    crosscut. A sheet is full once LOOKAHEAD pieces have not fit on it, so
+    the cost grows linearly with the pieces apart from the sort, at the
+    cost of some yield against the guillotine packer.
+    """
+    info = EngineInfo(
+        name="shelf",
+        description="Fast strip packing for very large jobs",
+        guillotine=True, exact=False, time_bounded=False, supports_remnants=True,
+    )
+    # Pieces passed over on a sheet before it is considered full
+    LOOKAHEAD = 64
+
+    def optimize(self, cuts: list[Cut], sheets: list[Sheet], kerf: float,
+                 saw_profile: Optional["SawProfile"] = None,
+                 time_limit: Optional[float] = None,
+                 incumbent: Optional[Incumbent] = None,
+                 random_seed: Optional[int] = None,
+                 restarts: Optional[int] = None,
+                 workers: int = 1) -> Packing:
+        stats = PackStats()
+        started = time.perf_counter()
+        pieces = expand_cuts(cuts)
+        instances = expand_sheets(sheets)
+        stats.pieces = len(pieces)
+        stats.expand_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        instances = sort_sheets(instances)
+        by_thickness: dict[float, list[Cut]] = {}
+        for piece in pieces:
+            by_thickness.setdefault(piece.thickness, []).append(piece)
+        for group in by_thickness.values():
+            group.sort(key=lambda c: (max(c.width, c.length), min(c.width, c.length)), reverse=True)
+        stats.sort_seconds = time.perf_counter() - started
+
+        placements: list[Placement] = []
+        remaining: list[Cut] = []
+        for thickness, group in by_thickness.items():
+            queue = deque(group)
+            for sheet in (s for s in instances if s.thickness == thickness):
+                if not queue:
+                    break
+                started = time.perf_counter()
+                remaining.extend(self._fill_sheet(sheet, queue, kerf, placements))
+                stats.sheet_seconds.append(time.perf_counter() - started)
+            remaining.extend(queue)
+        placements, unplaced = _keep_better((placements, unplaced_cuts(remaining, instances)), incumbent)
+        return placements, unplaced, stats
+
+    def _fill_sheet(self, sheet: Sheet, queue: deque, kerf: float, placements: list[Placement]) -> list[Cut]:
+        """
+        Fill one sheet from the front of the queue.
+
+        Pieces that don't fit are put back at the front, in order, once
+        LOOKAHEAD of them have been passed over (or the queue runs out).
+
+        Returns:
+            Pieces that fit no sheet of this size at all
+        """
+        strips: list[list] = []  # [y, height, x used, stacks]; a stack is [x, width, height used]
+        next_y = 0.0
+        skipped: list[Cut] = []
+        deferred: list[Cut] = []
+        while queue and len(deferred) < self.LOOKAHEAD:
+            piece = queue.popleft()
+            long_side, short_side = max(piece.width, piece.length), min(piece.width, piece.length)
+            orientations = ((short_side, long_side), (long_side, short_side))
+            placed = False
+            # Stack on top of an earlier piece of a strip (a third, crosscut
+            # stage), else add to the end of a strip, else open a new strip
+            for strip in strips:
+                for stack in strip[3]:
+                    for w, h in orientations:
+                        if w + kerf <= stack[1] and stack[2] + h + kerf <= strip[1]:
+                            placements.append(Placement(piece, sheet, stack[0], strip[0] + stack[2],
+                                                        rotated=w != piece.width))
+                            stack[2] += h + kerf
+                            placed = True
+                            break
+                    if placed:
+                        break
+                else:
+                    for w, h in orientations:
+                        if h + kerf <= strip[1] and strip[2] + w + kerf <= sheet.width:
+                            placements.append(Placement(piece, sheet, strip[2], strip[0], rotated=w != piece.width))
+                            strip[3].append([strip[2], w + kerf, h + kerf])
+                            strip[2] += w + kerf
+                            placed = True
+                            break
+                if placed:
+                    break
+            else:
+                for w, h in orientations:
+                    if w + kerf <= sheet.width and h + kerf <= sheet.length:
+                        break
+                else:
+                    skipped.append(piece)  # larger than the sheet either way
+                    continue
+                if next_y + h + kerf > sheet.length:
+                    deferred.append(piece)
+                    continue
+                placements.append(Placement(piece, sheet, 0.0, next_y, rotated=w != piece.width))
+                strips.append([next_y, h + kerf, w + kerf, [[0.0, w + kerf, h + kerf]]])
+                next_y += h + kerf
+        queue.extendleft(reversed(deferred))
+        return skipped
+
+
+def _layout_fits(placements: list[Placement], sheet: Sheet, kerf: float) -> bool:
+    """Whether pieces lie inside the sheet, kerf apart, in a guillotine-cuttable layout."""
+    from app.services.cut_sequence import sequence_sheet
+
+    boxes = sorted((p.x, p.y, p.x + p.width + kerf, p.y + p.length + kerf) for p in placements)
+    for i, (x1, y1, x2, y2) in enumerate(boxes):
+        if x1 < 0 or y1 < 0 or x2 > sheet.width + 1e-6 or y2 > sheet.length + 1e-6:
+            return False
+        for bx1, by1, _, by2 in boxes[i + 1:]:
+            if bx1 >= x2 - 1e-6:
+                break  # sorted by x: no later box reaches back into this one
+            if by1 < y2 - 1e-6 and y1 < by2 - 1e-6:
+                return False
+    try:
+        sequence_sheet(sheet.width, sheet.length, [(p.x, p.y, p.width, p.length) for p in placements], kerf)
+    except ValueError:
+        return False
+    return True
+
+
+def warm_start(engine: "Engine", seed: Seed, cuts: list[Cut], sheets: list[Sheet], kerf: float,
+               saw_profile: Optional["SawProfile"] = None) -> Incumbent:
+    """
+    Packing that keeps the sheets of a previous plan that are still valid.
+
+    A previous sheet is kept as it was when the sheet instance still
+    exists and its layout still fits: every piece is still required (in
+    that quantity), on the sheet's thickness, and the layout is inside
+    the sheet, kerf apart and guillotine-cuttable. The remaining cuts are
+    packed onto the remaining sheets by the engine (by the guillotine
+    packer for a time-bounded engine, which searches from the result).
+
+    Returns:
+        (placements, unplaced cuts), to pass to the engine as incumbent
+    """
+    instances: dict[tuple[str, int], Sheet] = {}
+    for stock in sheets:
+        for number, instance in enumerate(expand_sheets([stock])):
+            instances[(stock.id, number)] = instance
+    by_id = {c.id: c for c in cuts}
+    available = {c.id: c.quantity for c in cuts}
+
+    kept: list[Placement] = []
+    kept_sheets: set[str] = set()
+    for sheet_id, number, rows in seed:
+        sheet = instances.get((sheet_id, number))
+        if sheet is None or sheet.id in kept_sheets:
+            continue
+        needed = Counter(cut_id for cut_id, *_ in rows)
+        if any(cut_id not in by_id or by_id[cut_id].thickness != sheet.thickness or count > available[cut_id]
+               for cut_id, count in needed.items()):
+            continue
+        placements = [Placement(replace(by_id[cut_id], quantity=1), sheet, x, y, rotated)
+                      for cut_id, x, y, rotated in rows]
+        if not _layout_fits(placements, sheet, kerf):
+            continue
+        for cut_id, count in needed.items():
+            available[cut_id] -= count
+        kept.extend(placements)
+        kept_sheets.add(sheet.id)
+
+    rest_cuts = [replace(c, quantity=available[c.id]) for c in cuts if available[c.id] > 0]
+    rest_sheets = [s for s in instances.values() if s.id not in kept_sheets]
+    builder = ENGINES[DEFAULT_ENGINE] if engine.info.time_bounded else engine
+    placements, unplaced, _ = builder.optimize(rest_cuts, rest_sheets, kerf, saw_profile)
+    # Reasons refer to all sheets, not only the ones left over
+    return kept + placements, unplaced_cuts([u.cut for u in unplaced], list(instances.values()))
+
+
+ENGINES: dict[str, Engine] = {}
+
+
+def register_engine(engine: Engine) -> Engine:
+    """Make an engine selectable by its info.name."""
+    if engine.info.name in ENGINES or engine.info.name == AUTO:
+        raise ValueError(f"Engine {engine.info.name} is already registered")
+    ENGINES[engine.info.name] = engine
+    return engine
+
+
+for _engine in (GuillotineEngine(), SearchEngine(), ExhaustiveEngine(), ShelfEngine()):
+    register_engine(_engine)
+
+
+def get_engine(name: str) -> Engine:
+    """
+    Look up a registered engine.
+
+    Raises:
+        ValueError: For an unknown name
+    """
+    engine = ENGINES.get(name)
+    if engine is None:
+        raise ValueError(f"Unknown algorithm: {name} (choose from {AUTO}, {', '.join(ENGINES)})")
+    return engine
+
+
+def choose_engine(pieces: int, time_limit: Optional[float] = None, use_remnants: bool = False,
+                  fast_pieces: int = AUTO_FAST_PIECES, restarts: Optional[int] = None) -> str:
+    """
+    Engine the "auto" mode uses for a job.
+
+    Tiny jobs get the exhaustive engine, jobs with a restart count the
+    seeded search, jobs above fast_pieces the shelf engine (if it can
+    pack remnants when they must be used), jobs with a time limit the
+    time-bounded search and everything else the guillotine packer.
+    """
+    exhaustive = ENGINES.get("exhaustive")
+    if exhaustive is not None and exhaustive.info.max_pieces is not None and pieces <= exhaustive.info.max_pieces:
+        return "exhaustive"
+    if restarts and "search" in ENGINES:
+        return "search"
+    shelf = ENGINES.get("shelf")
+    if pieces > fast_pieces and shelf is not None and (shelf.info.supports_remnants or not use_remnants):
+        return "shelf"
+    if time_limit and "search" in ENGINES:
+        return "search"
+    return DEFAULT_ENGINE
+
+
+def resolve_engine(algorithm: str, pieces: int, time_limit: Optional[float] = None,
+                   use_remnants: bool = False, fast_pieces: int = AUTO_FAST_PIECES,
+                   restarts: Optional[int] = None) -> str:
+    """
+    Name of the engine to run for a requested algorithm.
+
+    Raises:
+        ValueError: For an unknown algorithm, a job too large for the
+            engine, remnants with an engine that can't use them, or a
+            restart count for an engine that isn't seeded
+    """
+    if algorithm == AUTO:
+        name = choose_engine(pieces, time_limit, use_remnants, fast_pieces, restarts)
+    else:
+        name = algorithm
+    info = get_engine(name).info
+    if restarts is not None and algorithm != AUTO and not info.seeded:
+        raise ValueError(f"The {name} engine takes no restart count")
+    if info.max_pieces is not None and pieces > info.max_pieces:
+        raise ValueError(f"The {name} engine handles at most {info.max_pieces} pieces")
+    if use_remnants and not info.supports_remnants:
+        raise ValueError(f"The {name} engine can't pack remnants")
+    return name
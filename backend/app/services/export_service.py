@@ -0,0 +1,200 @@
+"""Machine exports (CSV cut list, DXF, saw program) of stored cutting plans.
+
+A stored plan is only its CuttingPlan row and one PlanAssignment row per
+piece, which keeps its sheet's position, instance label and size and its
+cut's label and size as planned. stored_sheet_plans rebuilds the plan's
+sheets from those rows one sheet at a time, reading the assignments in
+batches, so the writers in plan_export can stream plans of any size.
+Plans stored before the assignments kept those fall back to the current
+stock sheet, remnant and cut rows.
+"""
+from typing import Any, AsyncIterator, Iterable, Iterator, Literal, Optional
+from anyio import from_thread
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool
+from app.database import AsyncSessionLocal
+from app.models.cutting_plan import CuttingPlan
+from app.models.plan_assignment import ASSIGNMENT_SOURCE_ID, PlanAssignment
+from app.models.remnant import Remnant
+from app.models.required_cut import RequiredCut
+from app.models.stock_sheet import StockSheet
+from app.services.bulk_io import CHUNK_SIZE
+from app.services.cut_sequence import sequence_sheet
+from app.services.plan_export import stream_cut_list, stream_dxf, stream_saw_program
+
+ExportFormat = Literal["csv", "dxf", "saw"]
+
+# Media type and file suffix of each export format
+EXPORT_FORMATS: dict[str, tuple[str, str]] = {
+    "csv": ("text/csv", ".csv"),
+    "dxf": ("application/dxf", ".dxf"),
+    "saw": ("text/plain", "-saw.txt"),
+}
+
+
+async def check_plan_export(db: AsyncSession, plan: CuttingPlan) -> None:
+    """
+    Make sure a stored plan can still be exported before streaming it.
+
+    Only plans stored without the planned sheet and cut sizes depend on
+    the stock sheet, remnant and cut rows still existing.
+
+    Raises:
+        ValueError: When such a plan's cuts or sheets were deleted
+    """
+    missing_cut = await db.scalar(
+        select(PlanAssignment.id)
+        .outerjoin(RequiredCut, PlanAssignment.cut_id == RequiredCut.id)
+        .where(PlanAssignment.plan_id == plan.id, PlanAssignment.cut_width.is_(None), RequiredCut.id.is_(None))
+        .limit(1)
+    )
+    if missing_cut is not None:
+        raise ValueError("Plan references required cuts that no longer exist")
+
+    missing_sheet = await db.scalar(
+        select(PlanAssignment.id)
+        .outerjoin(StockSheet, PlanAssignment.sheet_id == StockSheet.id)
+        .outerjoin(Remnant, ASSIGNMENT_SOURCE_ID == Remnant.id)
+        .where(PlanAssignment.plan_id == plan.id, PlanAssignment.sheet_width.is_(None),
+               StockSheet.id.is_(None), Remnant.id.is_(None))
+        .limit(1)
+    )
+    if missing_sheet is not None:
+        raise ValueError("Plan references stock sheets that no longer exist")
+
+
+def _sheet_plan(sheet_id: str, first: Any, assignments: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "sheet_id": sheet_id,
+        "sheet_label": first.sheet_label,
+        "sheet_width": first.sheet_width,
+        "sheet_length": first.sheet_length,
+        "assignments": assignments,
+        "cut_sequence": [],
+    }
+
+
+async def stored_sheet_plans(plan_id: str, sheet: Optional[int] = None) -> AsyncIterator[dict[str, Any]]:
+    """
+    Rebuild a stored plan's sheets as plan body ``sheet_plans`` entries.
+
+    Runs in a dedicated session that lives as long as the stream (see
+    bulk_io). Sheets come in plan order (grouped by sheet and instance for
+    older plans); pieces follow their stored cutting order. The sheets'
+    cut sequences are left empty (see with_saw_cuts).
+
+    Args:
+        plan_id: Stored plan, checked with check_plan_export
+        sheet: Only this sheet (numbered from 1 in plan order)
+    """
+    async with AsyncSessionLocal() as db:
+        query = (
+            select(
+                ASSIGNMENT_SOURCE_ID, PlanAssignment.sheet_instance, PlanAssignment.sheet_number,
+                PlanAssignment.cut_id, PlanAssignment.x_position, PlanAssignment.y_position,
+                PlanAssignment.rotation, PlanAssignment.sequence_number,
+                func.coalesce(PlanAssignment.sheet_label, StockSheet.label, Remnant.label).label("sheet_label"),
+                func.coalesce(PlanAssignment.sheet_width, StockSheet.width, Remnant.width).label("sheet_width"),
+                func.coalesce(PlanAssignment.sheet_length, StockSheet.length, Remnant.length).label("sheet_length"),
+                func.coalesce(PlanAssignment.cut_label, RequiredCut.label).label("cut_label"),
+                func.coalesce(PlanAssignment.cut_width, RequiredCut.width).label("width"),
+                func.coalesce(PlanAssignment.cut_length, RequiredCut.length).label("length"),
+                func.coalesce(PlanAssignment.cut_thickness, RequiredCut.thickness).label("thickness"),
+            )
+            .outerjoin(RequiredCut, PlanAssignment.cut_id == RequiredCut.id)
+            .outerjoin(StockSheet, PlanAssignment.sheet_id == StockSheet.id)
+            .outerjoin(Remnant, ASSIGNMENT_SOURCE_ID == Remnant.id)
+            .where(PlanAssignment.plan_id == plan_id)
+            .order_by(PlanAssignment.sheet_number, ASSIGNMENT_SOURCE_ID, PlanAssignment.sheet_instance,
+                      PlanAssignment.sequence_number)
+            .execution_options(yield_per=CHUNK_SIZE)
+        )
+        if sheet is not None:
+            # Older plans have no sheet numbers; their sheets are counted below
+            query = query.where(or_(PlanAssignment.sheet_number == sheet, PlanAssignment.sheet_number.is_(None)))
+
+        counted = number = 0
+        key: Optional[tuple[str, int]] = None
+        first: Any = None
+        assignments: list[dict[str, Any]] = []
+        async for row in await db.stream(query):
+            row_key = (row.source_id, row.sheet_instance or 0)
+            if row_key != key:
+                if key is not None and (sheet is None or number == sheet):
+                    yield _sheet_plan(key[0], first, assignments)
+                counted += 1
+                number = row.sheet_number or counted
+                if sheet is not None and number > sheet:
+                    return
+                key, first, assignments = row_key, row, []
+            assignments.append({
+                "cut_id": row.cut_id,
+                "cut_label": row.cut_label,
+                "x_position": row.x_position,
+                "y_position": row.y_position,
+                "rotation": row.rotation,
+                "sequence_number": row.sequence_number,
+                "width": row.width,
+                "length": row.length,
+                "thickness": row.thickness,
+            })
+        if key is not None and (sheet is None or number == sheet):
+            yield _sheet_plan(key[0], first, assignments)
+
+
+def with_saw_cuts(sheet_plans: Iterable[dict[str, Any]], kerf_width: float) -> Iterator[dict[str, Any]]:
+    """Fill in each sheet's guillotine cut sequence, recomputed from its pieces."""
+    for sheet_plan in sheet_plans:
+        boxes = [
+            (a["x_position"], a["y_position"], a["length"], a["width"]) if a["rotation"] == 90
+            else (a["x_position"], a["y_position"], a["width"], a["length"])
+            for a in sheet_plan["assignments"]
+        ]
+        saw_cuts = sequence_sheet(sheet_plan["sheet_width"], sheet_plan["sheet_length"], boxes, kerf_width).cuts
+        sheet_plan["cut_sequence"] = [
+            {
+                "step": c.step,
+                "kind": c.kind,
+                "stage": c.stage,
+                "parent": c.parent,
+                "x1": c.x1,
+                "y1": c.y1,
+                "x2": c.x2,
+                "y2": c.y2,
+                "fence": c.fence,
+                "rotate_before": c.rotate_before,
+                "move_fence": c.move_fence,
+            }
+            for c in saw_cuts
+        ]
+        yield sheet_plan
+
+
+async def _next_sheet(sheet_plans: AsyncIterator[dict[str, Any]]) -> dict[str, Any]:
+    return await sheet_plans.__anext__()
+
+
+def _from_event_loop(sheet_plans: AsyncIterator[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Iterate an async iterator of the event loop from an anyio worker thread."""
+    while True:
+        try:
+            yield from_thread.run(_next_sheet, sheet_plans)
+        except StopAsyncIteration:
+            return
+
+
+def stream_plan_export(plan: CuttingPlan, format: ExportFormat, sheet: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    Stream a stored plan (checked with check_plan_export) in a machine format.
+
+    The writers and the saw sequencing run in the thread pool, a sheet per
+    step, pulling each sheet from the database session on the event loop.
+    """
+    sheet_plans = _from_event_loop(stored_sheet_plans(plan.id, sheet))
+    if format == "dxf":
+        return iterate_in_threadpool(stream_dxf(sheet_plans))
+    if format == "saw":
+        return iterate_in_threadpool(stream_saw_program(with_saw_cuts(sheet_plans, plan.kerf_width), plan.kerf_width,
+                                                        sheet or 1))
+    return iterate_in_threadpool(stream_cut_list(sheet_plans, sheet or 1))
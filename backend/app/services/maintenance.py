@@ -0,0 +1,103 @@
+"""Database maintenance: plan retention, statistics and space reclamation."""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models.cutting_plan import CuttingPlan
+from app.models.plan_assignment import PlanAssignment
+from app.models.remnant import Remnant
+
+logger = logging.getLogger(__name__)
+
+
+def prune_plans(db: Session, max_age_days: int, max_plans: int) -> int:
+    """
+    Delete old cutting plans together with their assignments and the
+    remnants they consumed.
+
+    A plan is pruned when it is older than ``max_age_days`` or not among the
+    newest ``max_plans`` plans of its project; a limit of 0 disables that
+    rule.
+
+    Args:
+        db: Database session
+        max_age_days: Maximum plan age in days
+        max_plans: Number of most recent plans to keep per project
+
+    Returns:
+        Number of deleted plans
+    """
+    doomed = []
+    if max_age_days > 0:
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=max_age_days)
+        doomed.append(db.query(CuttingPlan.id).filter(CuttingPlan.created_at < cutoff))
+    if max_plans > 0:
+        ranked = db.query(
+            CuttingPlan.id,
+            func.row_number().over(
+                partition_by=CuttingPlan.project_id,
+                order_by=(CuttingPlan.created_at.desc(), CuttingPlan.id.desc())
+            ).label("rank")
+        ).subquery()
+        doomed.append(db.query(ranked.c.id).filter(ranked.c.rank > max_plans))
+    if not doomed:
+        return 0
+
+    plan_ids = [row.id for query in doomed for row in query]
+    deleted = 0
+    # Delete in chunks to stay under SQLite's bound-parameter limit
+    for start in range(0, len(plan_ids), 500):
+        chunk = plan_ids[start:start + 500]
+        db.query(PlanAssignment).filter(PlanAssignment.plan_id.in_(chunk)).delete(synchronize_session=False)
+        db.query(Remnant).filter(Remnant.consumed_plan_id.in_(chunk)).delete(synchronize_session=False)
+        deleted += db.query(CuttingPlan).filter(CuttingPlan.id.in_(chunk)).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def optimize_storage() -> None:
+    """
+    Refresh query planner statistics and reclaim free pages.
+
+    Runs ``PRAGMA optimize`` (ANALYZE where statistics are stale), and a
+    full VACUUM only when free pages exceed ``vacuum_free_ratio`` of the
+    file, since VACUUM rewrites the whole database.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    # VACUUM cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("PRAGMA optimize"))
+        page_count = conn.execute(text("PRAGMA page_count")).scalar() or 0
+        free_pages = conn.execute(text("PRAGMA freelist_count")).scalar() or 0
+        if page_count and free_pages / page_count > settings.vacuum_free_ratio:
+            logger.info(f"Vacuuming database: {free_pages}/{page_count} pages free")
+            conn.execute(text("VACUUM"))
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+
+
+def run_maintenance() -> None:
+    """Apply plan retention, then optimize storage."""
+    db = SessionLocal()
+    try:
+        pruned = prune_plans(db, settings.plan_retention_days, settings.plan_retention_max_plans)
+    finally:
+        db.close()
+    if pruned:
+        logger.info(f"Pruned {pruned} cutting plans")
+    optimize_storage()
+
+
+async def maintenance_loop() -> None:
+    """Run maintenance every ``maintenance_interval_hours`` until cancelled."""
+    interval = settings.maintenance_interval_hours * 3600
+    while True:
+        try:
+            await run_in_threadpool(run_maintenance)
+        except Exception as e:
+            logger.error(f"Database maintenance failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(interval)
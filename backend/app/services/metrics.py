@@ -0,0 +1,267 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+A deliberately small registry: counters, gauges and histograms with
+labels, updated from the event loop and rendered by ``GET /metrics``.
+Values are per API process; with several uvicorn workers each one is
+scraped (or aggregated) separately. Gauges whose value lives elsewhere,
+such as admission queue depth, are read through callbacks at scrape time
+so the hot paths pay nothing for them.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional, TypeVar, Union
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services.optimizer import PackStats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans quick CRUD reads up to multi-second solves
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+LabelValues = tuple[str, ...]
+# What a gauge callback returns: {label values: value}, or one value when unlabelled
+GaugeValues = Union[dict[LabelValues, float], float]
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class: a named metric family with fixed label names."""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down.
+
+    With a callback the gauge is computed at scrape time; the callback
+    returns {label values: value}, or a bare number for an unlabelled gauge.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 callback: Optional[Callable[[], GaugeValues]] = None) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterable[str]:
+        values = self._values
+        if self._callback is not None:
+            computed = self._callback()
+            values = computed if isinstance(computed, dict) else {(): computed}
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class CallbackCounter(Gauge):
+    """Counter whose running total is kept elsewhere and read at scrape time."""
+    kind = "counter"
+
+
+class Histogram(Metric):
+    """Cumulative histogram with fixed bucket upper bounds."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}"
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "woodcutter_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route")))
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "woodcutter_http_requests_total", "HTTP requests by route template and status",
+    ("method", "route", "status")))
+
+OPTIMIZER_PHASE_SECONDS = REGISTRY.register(Histogram(
+    "woodcutter_optimizer_phase_seconds",
+    "Optimizer phase durations; pack_sheet is observed once per packed sheet",
+    ("phase",)))
+OPTIMIZER_PIECES = REGISTRY.register(Counter(
+    "woodcutter_optimizer_pieces_total", "Pieces (cut quantities expanded) handed to the packer"))
+OPTIMIZER_SOLVE_SECONDS = REGISTRY.register(Counter(
+    "woodcutter_optimizer_solve_seconds_total",
+    "Time spent packing and sequencing; rate(pieces) / rate(this) is pieces per second"))
+OPTIMIZER_PIECES_PER_SECOND = REGISTRY.register(Gauge(
+    "woodcutter_optimizer_pieces_per_second", "Packing throughput of the most recent solve"))
+OPTIMIZER_FREE_RECTANGLES = REGISTRY.register(Histogram(
+    "woodcutter_optimizer_free_rectangles", "Peak free-rectangle count per packed sheet",
+    buckets=COUNT_BUCKETS))
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "woodcutter_cache_requests_total",
+    "Cache lookups by result; cache is a table name for list ETags, or plans for coalesced solves",
+    ("cache", "result")))
+
+
+def observe_solve(stats: PackStats, sequence_seconds: float) -> None:
+    """
+    Record the packer statistics of one solve.
+
+    Args:
+        stats: PackStats gathered by GuillotineBinPacker.optimize
+        sequence_seconds: Time spent deriving saw sequences
+    """
+    OPTIMIZER_PHASE_SECONDS.observe(stats.expand_seconds, phase="expand")
+    OPTIMIZER_PHASE_SECONDS.observe(stats.sort_seconds, phase="sort")
+    for seconds in stats.sheet_seconds:
+        OPTIMIZER_PHASE_SECONDS.observe(seconds, phase="pack_sheet")
+    OPTIMIZER_PHASE_SECONDS.observe(sequence_seconds, phase="sequence")
+    for count in stats.free_rects:
+        OPTIMIZER_FREE_RECTANGLES.observe(count)
+
+    seconds = stats.expand_seconds + stats.sort_seconds + sum(stats.sheet_seconds) + sequence_seconds
+    OPTIMIZER_PIECES.inc(stats.pieces)
+    OPTIMIZER_SOLVE_SECONDS.inc(seconds)
+    if seconds > 0:
+        OPTIMIZER_PIECES_PER_SECOND.set(stats.pieces / seconds)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request.
+
+    Requests are labelled by route template (``/api/stock/{sheet_id}``),
+    not raw path, so ids don't explode the series count. Mounted apps use
+    their mount path and anything unrouted is ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._routes: dict[object, str] = {}
+
+    def _route(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is not None:
+            path = self._routes.get(endpoint)
+            if path is None:
+                for route in scope["app"].router.routes:
+                    self._routes.setdefault(getattr(route, "endpoint", None), getattr(route, "path", ""))
+                path = self._routes.get(endpoint, "unmatched")
+            return path
+        return scope.get("root_path") or "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self._route(scope)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status))
@@ -1,6 +1,13 @@
 """Core cutting optimization algorithm using Guillotine bin packing."""
-from dataclasses import dataclass
-from typing import Optional
+import heapq
+import time
+from bisect import bisect_right
+from copy import copy
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.services.cut_sequence import SawProfile
 
 
 @dataclass
@@ -64,12 +71,93 @@ class UnplacedCut:
     reason: str
 
 
+@dataclass
+class PackStats:
+    """Timings and counters of one optimize() call, for metrics."""
+    expand_seconds: float = 0.0
+    sort_seconds: float = 0.0
+    # One entry per sheet that had matching cuts to pack
+    sheet_seconds: list[float] = field(default_factory=list)
+    free_rects: list[int] = field(default_factory=list)  # peak free rectangles per sheet
+    pieces: int = 0
+
+
+# Alternative cut orders tried per sheet when saw time is a secondary objective.
+# Grouping pieces by length or width tends to produce shared strip widths,
+# which means fewer fence moves on the panel saw.
+SAW_TIME_ORDERINGS = [
+    lambda c: (-(c.width * c.length),),
+    lambda c: (-max(c.width, c.length), -min(c.width, c.length)),
+    lambda c: (-min(c.width, c.length), -max(c.width, c.length)),
+]
+
+
+class PieceIndex:
+    """
+    Pending pieces of one thickness, grouped by shape for fit queries.
+
+    A piece fits a free rectangle exactly when its sorted sides fit the
+    rectangle's sorted sides, so pieces of one shape are interchangeable
+    for fitting. Shapes are kept sorted by short side: the shapes that can
+    fit a W×L sheet at all are a bisect away, and the rest are never tried.
+
+    First-fit takes a shape's pieces in packing order until one no longer
+    fits; the rest of that shape won't fit that sheet either, since free
+    rectangles only shrink. So the pending pieces of a shape are always a
+    suffix of its positions, tracked by one counter per shape.
+    """
+
+    def __init__(self, pieces: Iterable[Cut]) -> None:
+        """Index quantity-1 pieces; a piece's position is its place in packing order."""
+        self.pieces = list(pieces)
+        by_shape: dict[tuple[float, float], list[int]] = {}
+        for position, piece in enumerate(self.pieces):
+            shape = (min(piece.width, piece.length), max(piece.width, piece.length))
+            by_shape.setdefault(shape, []).append(position)
+        self.shapes = sorted(by_shape)
+        self.positions = [by_shape[shape] for shape in self.shapes]
+        self.next = [0] * len(self.shapes)  # first pending position of each shape
+        self.pending = len(self.pieces)
+
+    def fitting(self, width: float, length: float, kerf: float) -> list[int]:
+        """Shapes with pending pieces that fit a width × length sheet."""
+        short, long = min(width, length), max(width, length)
+        end = bisect_right(self.shapes, short, key=lambda shape: shape[0] + kerf)
+        return [k for k in range(end)
+                if self.shapes[k][1] + kerf <= long and self.next[k] < len(self.positions[k])]
+
+    def take(self, shape: int) -> Optional[int]:
+        """Mark the shape's first pending piece placed; returns the next one's position."""
+        self.next[shape] += 1
+        self.pending -= 1
+        positions = self.positions[shape]
+        return positions[self.next[shape]] if self.next[shape] < len(positions) else None
+
+    def remaining(self) -> list[Cut]:
+        """Pending pieces in packing order."""
+        positions = sorted(p for k, shape in enumerate(self.positions) for p in shape[self.next[k]:])
+        return [self.pieces[p] for p in positions]
+
+
+class _SheetLimitReached(Exception):
+    """A limited packing used the best packing's sheet count with pieces left."""
+
+
 class GuillotineBinPacker:
     """Guillotine bin packing algorithm for 2D cutting optimization."""
     
-    def __init__(self, kerf: float = 3.0):
-        """Initialize packer with blade kerf width."""
+    def __init__(self, kerf: float = 3.0, saw_profile: Optional["SawProfile"] = None):
+        """
+        Initialize packer with blade kerf width.
+
+        When a saw profile is given, saw time becomes a secondary objective:
+        each sheet is packed with several cut orders and, among the packings
+        that place the most area, the one with the lowest saw time wins.
+        """
         self.kerf = kerf
+        self.saw_profile = saw_profile
+        self.stats = PackStats()
+        self._peak_free_rects = 0
         
     def can_fit(self, cut_w: float, cut_l: float, rect: Rectangle) -> tuple[bool, bool]:
         """
@@ -123,127 +211,288 @@ class GuillotineBinPacker:
         Pack cuts onto a single sheet.
         Returns (placements, remaining_cuts).
         """
-        from copy import deepcopy
-        
-        # Start with full sheet as free rectangle
+        # Copy cuts of several pieces to avoid modifying the original quantities
+        remaining = [copy(cut) if cut.quantity > 1 else cut for cut in cuts]
+        index = PieceIndex(cut for cut in remaining for _ in range(cut.quantity))
+        placements = self.fill_sheet(index, sheet)
+
+        left: dict[int, int] = {}
+        for cut in index.remaining():
+            left[id(cut)] = left.get(id(cut), 0) + 1
+        for cut in remaining:
+            if cut.quantity > 1:
+                cut.quantity = left.get(id(cut), 1)
+        return placements, [cut for cut in remaining if id(cut) in left]
+
+    def fill_sheet(self, index: PieceIndex, sheet: Sheet) -> list[Placement]:
+        """
+        First-fit the index's pending pieces, in packing order, onto a sheet.
+
+        Each piece goes into the first free rectangle it fits. Only shapes
+        that fit the sheet are queued, and a shape leaves the queue as soon
+        as one of its pieces doesn't fit, so every pending piece is not
+        tried against every free rectangle. Placed pieces are taken from
+        the index.
+        """
         free_rects = [Rectangle(x=0, y=0, width=sheet.width, length=sheet.length)]
         placements = []
-        # Deep copy to avoid modifying original cuts
-        remaining = deepcopy(cuts)
-        
-        # Try to place each cut
-        i = 0
-        while i < len(remaining) and len(remaining) > 0:
-            cut = remaining[i]
-            placed = False
-            
-            # Try each free rectangle
+        # (position of the shape's first pending piece, shape), smallest position first
+        queue = [(index.positions[k][index.next[k]], k) for k in index.fitting(sheet.width, sheet.length, self.kerf)]
+        heapq.heapify(queue)
+        while queue:
+            position, shape = queue[0]
+            cut = index.pieces[position]
             for j, rect in enumerate(free_rects):
                 fits, rotated = self.can_fit(cut.width, cut.length, rect)
-                
                 if fits:
-                    # Place the cut
-                    placement = Placement(
-                        cut=cut,
-                        sheet=sheet,
-                        x=rect.x,
-                        y=rect.y,
-                        rotated=rotated
-                    )
-                    placements.append(placement)
-                    
-                    # Split the rectangle
+                    placements.append(Placement(cut=cut, sheet=sheet, x=rect.x, y=rect.y, rotated=rotated))
                     new_rects = self.split_rectangle(rect, cut.width, cut.length, rotated)
-                    
-                    # Update free rectangles
                     free_rects = free_rects[:j] + free_rects[j+1:] + new_rects
-                    
-                    # Handle quantity
-                    if cut.quantity > 1:
-                        cut.quantity -= 1
-                    else:
-                        remaining.pop(i)
-                        # Don't decrement i below 0
-                        if i > 0:
-                            i -= 1
-                    
-                    placed = True
+                    if len(free_rects) > self._peak_free_rects:
+                        self._peak_free_rects = len(free_rects)
                     break
-            
-            if not placed:
-                i += 1
-        
-        return placements, remaining
+            else:
+                # Nothing of this shape fits the rest of the sheet
+                heapq.heappop(queue)
+                continue
+
+            following = index.take(shape)
+            if following is None:
+                heapq.heappop(queue)
+            else:
+                heapq.heapreplace(queue, (following, shape))
+
+        return placements
+
+    def pack_sheet_for_saw_time(self, pieces: list[Cut], sheet: Sheet) -> tuple[list[Placement], list[Cut]]:
+        """
+        Pack a sheet with the pieces in the given order and with each of
+        SAW_TIME_ORDERINGS, and keep the best.
+
+        The given order is tried first and so wins ties, which keeps the
+        order a search chose when it is as good.
+
+        Args:
+            pieces: Quantity-1 cuts, in the caller's packing order
+            sheet: Sheet to fill
+
+        Returns:
+            (placements, remaining pieces in the given order)
+        """
+        from app.services.cut_sequence import sequence_sheet
+
+        orders = [pieces]
+        for ordering in SAW_TIME_ORDERINGS:
+            order = sorted(pieces, key=ordering)
+            if order not in orders:
+                orders.append(order)
+
+        candidates = []
+        for order in orders:
+            placements, remaining = self.pack_sheet(order, sheet)
+            placed_area = sum(p.cut.width * p.cut.length for p in placements)
+            saw_time = sequence_sheet(
+                sheet.width, sheet.length,
+                [(p.x, p.y, p.width, p.length) for p in placements],
+                self.kerf, self.saw_profile
+            ).saw_time
+            candidates.append(((-placed_area, saw_time), placements, remaining))
+
+        # First order wins ties
+        _, placements, remaining = min(candidates, key=lambda candidate: candidate[0])
+        # The next sheets get the pieces in the given order again
+        left = {id(piece) for piece in remaining}
+        return placements, [piece for piece in pieces if id(piece) in left]
     
     def optimize(self, cuts: list[Cut], sheets: list[Sheet]) -> tuple[list[Placement], list[UnplacedCut]]:
         """
         Optimize cutting plan using First-Fit Decreasing heuristic.
         Returns (placements, unplaced_cuts) — best effort when not all cuts fit.
+        Phase timings and counters of the call are left in self.stats.
         """
-        # Expand cuts by quantity (each becomes qty=1)
-        cuts_to_place = []
-        for cut in cuts:
-            for _ in range(cut.quantity):
-                cuts_to_place.append(Cut(
-                    id=cut.id,
-                    width=cut.width,
-                    length=cut.length,
-                    thickness=cut.thickness,
-                    label=cut.label,
-                    quantity=1
-                ))
-        
+        stats = self.stats = PackStats()
+        started = time.perf_counter()
+        cuts_to_place = expand_cuts(cuts)
+        stats.pieces = len(cuts_to_place)
+        stats.expand_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
         cuts_to_place.sort(key=lambda c: c.width * c.length, reverse=True)
+        stats.sort_seconds = time.perf_counter() - started
         
-        # Expand sheets by quantity — each instance gets a unique ID for tracking
-        expanded_sheets = []
-        for sheet in sheets:
-            qty = getattr(sheet, 'quantity', 1) or 1
-            for i in range(qty):
-                instance_id = sheet.id if qty == 1 else f"{sheet.id}__inst{i}"
-                expanded_sheets.append(Sheet(
-                    id=instance_id,
-                    width=sheet.width,
-                    length=sheet.length,
-                    thickness=sheet.thickness,
-                    label=f"{sheet.label}" if qty == 1 else f"{sheet.label} #{i+1}",
-                    priority=sheet.priority,
-                    quantity=1
-                ))
+        started = time.perf_counter()
+        expanded_sheets = expand_sheets(sheets)
+        stats.expand_seconds += time.perf_counter() - started
         
-        # Sort sheets by priority then area
-        priority_order = {"high": 0, "normal": 1, "low": 2}
-        sheets_sorted = sorted(expanded_sheets, 
-                              key=lambda s: (priority_order.get(s.priority, 1), 
-                                           -(s.width * s.length)))
+        started = time.perf_counter()
+        sheets_sorted = sort_sheets(expanded_sheets)
+        stats.sort_seconds += time.perf_counter() - started
         
+        return self.pack(cuts_to_place, sheets_sorted)
+
+    def pack(self, pieces: list[Cut], sheets: list[Sheet]) -> tuple[list[Placement], list[UnplacedCut]]:
+        """
+        First-fit the pieces, in the given order, onto the sheets in order.
+
+        Pieces are indexed once per thickness (see PieceIndex) instead of
+        being refiltered and copied for every sheet; the pieces themselves
+        are not modified, so one list can be packed many times.
+
+        Args:
+            pieces: Quantity-1 cuts (see expand_cuts), in placement order
+            sheets: Quantity-1 sheet instances (see expand_sheets), in fill order
+
+        Returns:
+            (placements, unplaced_cuts); per-sheet timings are added to self.stats
+        """
+        return self._pack(pieces, sheets, None)
+
+    def pack_limited(self, pieces: list[Cut], sheets: list[Sheet],
+                     sheet_limit: Callable[[], float]) -> Optional[tuple[list[Placement], list[UnplacedCut]]]:
+        """
+        pack() that gives up once it can't beat the best packing so far.
+
+        Args:
+            pieces: Quantity-1 cuts, in placement order
+            sheets: Quantity-1 sheet instances, in fill order
+            sheet_limit: Sheet count of the best packing placing every
+                piece, read after each sheet; packing stops once it has
+                used that many sheets with pieces left, as the result
+                could only be worse
+
+        Returns:
+            (placements, unplaced_cuts), or None when sheet_limit stopped
+            the packing
+        """
+        try:
+            return self._pack(pieces, sheets, sheet_limit)
+        except _SheetLimitReached:
+            return None
+
+    def _pack(self, pieces: list[Cut], sheets: list[Sheet],
+              sheet_limit: Optional[Callable[[], float]]) -> tuple[list[Placement], list[UnplacedCut]]:
+        """
+        pack() and pack_limited().
+
+        Raises:
+            _SheetLimitReached: When sheet_limit stopped the packing
+        """
+        if self.saw_profile is not None:
+            return self._pack_for_saw_time(pieces, sheets, sheet_limit)
+
+        stats = self.stats
+        by_thickness: dict[float, list[Cut]] = {}
+        for piece in pieces:
+            by_thickness.setdefault(piece.thickness, []).append(piece)
+        indexes = {thickness: PieceIndex(group) for thickness, group in by_thickness.items()}
+
         all_placements = []
-        remaining_cuts = cuts_to_place
-        
-        # Track which thicknesses are available
-        available_thicknesses = set(s.thickness for s in sheets_sorted)
-        
-        # Try to pack on available sheets
-        for sheet in sheets_sorted:
+        pending = len(pieces)
+        used = 0
+        packed_thicknesses: list[float] = []  # most recently packed first
+        for sheet in sheets:
+            if not pending:
+                break
+            index = indexes.get(sheet.thickness)
+            if index is None or not index.pending:
+                continue
+            started = time.perf_counter()
+            self._peak_free_rects = 1
+            placements = self.fill_sheet(index, sheet)
+            stats.sheet_seconds.append(time.perf_counter() - started)
+            stats.free_rects.append(self._peak_free_rects)
+            all_placements.extend(placements)
+            pending -= len(placements)
+            if sheet.thickness in packed_thicknesses:
+                packed_thicknesses.remove(sheet.thickness)
+            packed_thicknesses.insert(0, sheet.thickness)
+            used += bool(placements)
+            if pending and sheet_limit is not None and used >= sheet_limit():
+                raise _SheetLimitReached
+
+        # Unplaced pieces by most recently packed thickness, then the
+        # thicknesses no sheet took, in the given order
+        remaining_cuts = [piece for thickness in packed_thicknesses for piece in indexes[thickness].remaining()]
+        remaining_cuts += [piece for piece in pieces if piece.thickness not in packed_thicknesses]
+        return all_placements, unplaced_cuts(remaining_cuts, sheets)
+
+    def _pack_for_saw_time(self, pieces: list[Cut], sheets: list[Sheet],
+                           sheet_limit: Optional[Callable[[], float]]) -> tuple[list[Placement], list[UnplacedCut]]:
+        """_pack() when saw time is a secondary objective: every sheet may reorder its pieces."""
+        stats = self.stats
+        all_placements = []
+        remaining_cuts = pieces
+        used = 0
+
+        for sheet in sheets:
             if not remaining_cuts:
                 break
-            
+
             # Filter cuts by matching thickness
             matching_cuts = [c for c in remaining_cuts if c.thickness == sheet.thickness]
             other_cuts = [c for c in remaining_cuts if c.thickness != sheet.thickness]
-            
+
             if matching_cuts:
-                placements, still_remaining = self.pack_sheet(matching_cuts, sheet)
+                started = time.perf_counter()
+                self._peak_free_rects = 1
+                placements, still_remaining = self.pack_sheet_for_saw_time(matching_cuts, sheet)
+                stats.sheet_seconds.append(time.perf_counter() - started)
+                stats.free_rects.append(self._peak_free_rects)
                 all_placements.extend(placements)
                 remaining_cuts = still_remaining + other_cuts
-        
-        # Build unplaced cuts list with reasons
-        unplaced = []
-        for cut in remaining_cuts:
-            if cut.thickness not in available_thicknesses:
-                reason = f"No stock sheet with {cut.thickness}mm thickness"
-            else:
-                reason = f"Insufficient space on available {cut.thickness}mm sheets"
-            unplaced.append(UnplacedCut(cut=cut, reason=reason))
-        
-        return all_placements, unplaced
+                used += bool(placements)
+                if remaining_cuts and sheet_limit is not None and used >= sheet_limit():
+                    raise _SheetLimitReached
+
+        return all_placements, unplaced_cuts(remaining_cuts, sheets)
+
+
+# Fill order of sheet priorities; remnants go before any stock
+SHEET_PRIORITY = {"remnant": -1, "high": 0, "normal": 1, "low": 2}
+
+
+def expand_cuts(cuts: list[Cut]) -> list[Cut]:
+    """Expand cuts by quantity: one quantity-1 copy per piece."""
+    return [
+        Cut(id=cut.id, width=cut.width, length=cut.length, thickness=cut.thickness,
+            label=cut.label, quantity=1)
+        for cut in cuts
+        for _ in range(cut.quantity)
+    ]
+
+
+def expand_sheets(sheets: list[Sheet]) -> list[Sheet]:
+    """Expand sheets by quantity — each instance gets a unique ID for tracking."""
+    expanded_sheets = []
+    for sheet in sheets:
+        qty = getattr(sheet, 'quantity', 1) or 1
+        for i in range(qty):
+            instance_id = sheet.id if qty == 1 else f"{sheet.id}__inst{i}"
+            expanded_sheets.append(Sheet(
+                id=instance_id,
+                width=sheet.width,
+                length=sheet.length,
+                thickness=sheet.thickness,
+                label=f"{sheet.label}" if qty == 1 else f"{sheet.label} #{i+1}",
+                priority=sheet.priority,
+                quantity=1
+            ))
+    return expanded_sheets
+
+
+def sort_sheets(sheets: list[Sheet]) -> list[Sheet]:
+    """Sheets in fill order: by priority, then largest first."""
+    return sorted(sheets, key=lambda s: (SHEET_PRIORITY.get(s.priority, 1), -(s.width * s.length)))
+
+
+def unplaced_cuts(remaining: list[Cut], sheets: list[Sheet]) -> list[UnplacedCut]:
+    """Build unplaced cuts list with reasons."""
+    available_thicknesses = set(s.thickness for s in sheets)
+    unplaced = []
+    for cut in remaining:
+        if cut.thickness not in available_thicknesses:
+            reason = f"No stock sheet with {cut.thickness}mm thickness"
+        else:
+            reason = f"Insufficient space on available {cut.thickness}mm sheets"
+        unplaced.append(UnplacedCut(cut=cut, reason=reason))
+    return unplaced
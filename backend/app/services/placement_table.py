@@ -0,0 +1,82 @@
+"""Compact, columnar storage of a solved plan's placements.
+
+Each Placement the packer returns references a Cut and a Sheet object;
+keeping one per piece, plus the ORM rows and response dicts built from
+them, costs several object graphs per piece on big plans. A
+PlacementTable stores the same data once as typed arrays:
+
+    cut[i], sheet[i], x[i], y[i], rotated[i]
+
+where cut and sheet index the shared lookup tables ``cuts`` (one entry
+per cut definition) and ``sheets`` (one entry per used sheet instance).
+That is 29 bytes per piece. Persistence and the response bodies read
+the columns directly; Placement objects are only built on request.
+
+Only the stored form is smaller: the engines still pack into expanded
+Cut copies and a Placement per piece, and solve_plan builds the table
+from those, so the peak memory of a solve is unchanged. What shrinks is
+everything after it: the SolvedPlan kept while the plan is persisted
+and rendered, and the result a solver process pickles back to the API.
+"""
+from array import array
+from typing import Iterator, Optional
+from app.services.optimizer import Cut, Placement, Sheet
+
+
+class PlacementTable:
+    """Placements as parallel arrays over shared cut and sheet lookup tables."""
+    __slots__ = ("cuts", "sheets", "cut", "sheet", "x", "y", "rotated")
+
+    def __init__(self, cuts: Optional[list[Cut]] = None, sheets: Optional[list[Sheet]] = None) -> None:
+        self.cuts: list[Cut] = cuts if cuts is not None else []
+        self.sheets: list[Sheet] = sheets if sheets is not None else []
+        self.cut: array[int] = array("I")
+        self.sheet: array[int] = array("I")
+        self.x: array[float] = array("d")
+        self.y: array[float] = array("d")
+        self.rotated: array[int] = array("b")
+
+    def __len__(self) -> int:
+        return len(self.cut)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PlacementTable):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def append(self, cut: int, sheet: int, x: float, y: float, rotated: bool) -> None:
+        """Add a placement of cuts[cut] on sheets[sheet]."""
+        self.cut.append(cut)
+        self.sheet.append(sheet)
+        self.x.append(x)
+        self.y.append(y)
+        self.rotated.append(rotated)
+
+    def size(self, row: int) -> tuple[float, float]:
+        """(width, length) the piece of a row occupies on its sheet."""
+        cut = self.cuts[self.cut[row]]
+        return (cut.length, cut.width) if self.rotated[row] else (cut.width, cut.length)
+
+    def placement(self, row: int) -> Placement:
+        """The row as a Placement object."""
+        return Placement(self.cuts[self.cut[row]], self.sheets[self.sheet[row]],
+                         self.x[row], self.y[row], bool(self.rotated[row]))
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[tuple[Cut, float, float, bool]]:
+        """(cut, x, y, rotated) of rows start to stop, without building Placements."""
+        cuts, cut, x, y, rotated = self.cuts, self.cut, self.x, self.y, self.rotated
+        for row in range(start, len(cut) if stop is None else stop):
+            yield cuts[cut[row]], x[row], y[row], bool(rotated[row])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns (the lookup tables are shared)."""
+        columns: tuple[array, ...] = (self.cut, self.sheet, self.x, self.y, self.rotated)
+        return sum(len(column) * column.itemsize for column in columns)
@@ -0,0 +1,180 @@
+"""File exports of cutting plans for use outside the web UI.
+
+Everything here works on the ``sheet_plans`` entries of a plan body, so
+the exports serve API responses, batch CLI plans and stored plans (see
+export_service) alike. The machine formats are generators yielding one
+sheet at a time, so a thousand-sheet plan never sits in memory as a
+whole file.
+"""
+import csv
+import io
+from typing import Any, Iterable, Iterator
+from xml.sax.saxutils import escape
+
+# Matches the palette of the frontend diagrams
+COLORS = ["#3b82f6", "#10b981", "#f59e0b", "#ef4444", "#8b5cf6", "#ec4899", "#14b8a6", "#f97316"]
+
+CUT_LIST_COLUMNS = ["sheet", "sheet_label", "sheet_width", "sheet_length", "thickness", "sequence",
+                    "label", "width", "length", "x", "y", "rotation"]
+# Space between sheets drawn side by side in one DXF, in millimeters
+DXF_SHEET_GAP = 100.0
+
+
+def sheet_svg(sheet_plan: dict[str, Any]) -> str:
+    """
+    Render one sheet of a plan body as a standalone SVG document.
+
+    Coordinates are millimeters (the viewBox is the sheet), so the drawing
+    scales to any size. Pieces are numbered in cutting order and labelled
+    with their name and dimensions.
+
+    Args:
+        sheet_plan: One entry of a plan body's ``sheet_plans``
+
+    Returns:
+        SVG document as a string
+    """
+    width = sheet_plan["sheet_width"]
+    length = sheet_plan["sheet_length"]
+    font = max(12.0, min(width, length) / 60)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width:g} {length:g}" '
+        f'width="{width:g}mm" height="{length:g}mm" font-family="sans-serif">',
+        f'<title>{escape(sheet_plan["sheet_label"])}</title>',
+        f'<rect x="0" y="0" width="{width:g}" height="{length:g}" fill="#f3f4f6" stroke="#374151" '
+        f'stroke-width="{font / 6:g}"/>',
+    ]
+    colors: dict[str, str] = {}
+    for a in sheet_plan["assignments"]:
+        color = colors.setdefault(a["cut_id"], COLORS[len(colors) % len(COLORS)])
+        w, l = (a["length"], a["width"]) if a["rotation"] else (a["width"], a["length"])
+        x, y = a["x_position"], a["y_position"]
+        size = min(font, w / 6, l / 3)
+        parts.append(
+            f'<g><rect x="{x:g}" y="{y:g}" width="{w:g}" height="{l:g}" fill="{color}" fill-opacity="0.35" '
+            f'stroke="{color}" stroke-width="{font / 8:g}"/>'
+            f'<text x="{x + w / 2:g}" y="{y + l / 2:g}" font-size="{size:g}" text-anchor="middle" '
+            f'dominant-baseline="middle">{a["sequence_number"]}. {escape(a["cut_label"])} '
+            f'{a["width"]:g}×{a["length"]:g}</text></g>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def _mm(value: float) -> str:
+    """Millimeters with at most three decimals and no exponent."""
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+def _placed_size(a: dict[str, Any]) -> tuple[float, float]:
+    return (a["length"], a["width"]) if a["rotation"] else (a["width"], a["length"])
+
+
+def stream_cut_list(sheet_plans: Iterable[dict[str, Any]], first_sheet: int = 1) -> Iterator[str]:
+    """
+    Stream a plan as a CSV cut list, one row per piece in cutting order.
+
+    Sheets are numbered from first_sheet in plan order; ``x``, ``y`` and
+    the sizes are millimeters and ``rotation`` is 0 or 90.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CUT_LIST_COLUMNS)
+    for number, sheet_plan in enumerate(sheet_plans, start=first_sheet):
+        for a in sheet_plan["assignments"]:
+            writer.writerow([
+                number, sheet_plan["sheet_label"], _mm(sheet_plan["sheet_width"]), _mm(sheet_plan["sheet_length"]),
+                _mm(a["thickness"]), a["sequence_number"], a["cut_label"], _mm(a["width"]), _mm(a["length"]),
+                _mm(a["x_position"]), _mm(a["y_position"]), a["rotation"],
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _dxf(*pairs: Any) -> str:
+    """DXF group code/value pairs, one per line."""
+    return "".join(f"{code}\n{value}\n" for code, value in zip(pairs[::2], pairs[1::2]))
+
+
+def _dxf_rectangle(layer: str, x: float, y: float, w: float, l: float) -> str:
+    corners = [(x, y), (x + w, y), (x + w, y + l), (x, y + l)]
+    return (
+        _dxf(0, "POLYLINE", 8, layer, 66, 1, 10, 0, 20, 0, 30, 0, 70, 1)
+        + "".join(_dxf(0, "VERTEX", 8, layer, 10, _mm(cx), 20, _mm(cy), 30, 0) for cx, cy in corners)
+        + _dxf(0, "SEQEND", 8, layer)
+    )
+
+
+def stream_dxf(sheet_plans: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """
+    Stream a plan as an AutoCAD R12 DXF drawing, one sheet at a time.
+
+    Sheets are drawn side by side along x, DXF_SHEET_GAP apart: each
+    sheet outline is a closed polyline on layer SHEETS, each piece one on
+    layer PARTS, and LABELS holds the sheet names and the pieces' cutting
+    order and names. Units are millimeters and every sheet keeps the
+    plan's coordinates relative to its own corner.
+    """
+    yield (
+        _dxf(0, "SECTION", 2, "HEADER", 9, "$ACADVER", 1, "AC1009", 9, "$INSUNITS", 70, 4, 0, "ENDSEC")
+        + _dxf(0, "SECTION", 2, "ENTITIES")
+    )
+    offset = 0.0
+    for sheet_plan in sheet_plans:
+        width, length = sheet_plan["sheet_width"], sheet_plan["sheet_length"]
+        font = max(12.0, min(width, length) / 60)
+        parts = [
+            _dxf_rectangle("SHEETS", offset, 0, width, length),
+            _dxf(0, "TEXT", 8, "LABELS", 10, _mm(offset), 20, _mm(length + font), 30, 0, 40, _mm(font),
+                 1, sheet_plan["sheet_label"]),
+        ]
+        for a in sheet_plan["assignments"]:
+            w, l = _placed_size(a)
+            x, y = offset + a["x_position"], a["y_position"]
+            size = min(font, w / 6, l / 3)
+            parts.append(_dxf_rectangle("PARTS", x, y, w, l))
+            parts.append(_dxf(0, "TEXT", 8, "LABELS", 10, _mm(x + size / 2), 20, _mm(y + l / 2), 30, 0,
+                              40, _mm(size), 1, f'{a["sequence_number"]}. {a["cut_label"]}'))
+        offset += width + DXF_SHEET_GAP
+        yield "".join(parts)
+    yield _dxf(0, "ENDSEC", 0, "EOF")
+
+
+def stream_saw_program(sheet_plans: Iterable[dict[str, Any]], kerf_width: float,
+                       first_sheet: int = 1) -> Iterator[str]:
+    """
+    Stream a plan's guillotine cut sequences as a plain-text panel saw program.
+
+    Each sheet is a ``SHEET`` block listing its cuts in execution order::
+
+        SHEET 1 "Plywood" 1220 x 2440 x 18
+        FENCE 563
+        RIP 1 STAGE 1 FROM 0 LENGTH 2440
+        ROTATE
+        ...
+        END SHEET 1
+
+    ``ROTATE`` turns the panel (or stack) through 90° before the next cut
+    and ``FENCE`` sets the fence distance from the panel's reference edge.
+    ``FROM`` is the step of the cut that freed the panel being cut (0 for
+    the sheet itself). Lines starting with ``;`` are comments. Sheets are
+    numbered from first_sheet in plan order.
+    """
+    yield f"; Panel saw program, kerf {_mm(kerf_width)} mm, units mm\n"
+    for number, sheet_plan in enumerate(sheet_plans, start=first_sheet):
+        thickness = sheet_plan["assignments"][0]["thickness"] if sheet_plan["assignments"] else 0
+        label = sheet_plan["sheet_label"].replace('"', "'")
+        lines = [f'SHEET {number} "{label}" {_mm(sheet_plan["sheet_width"])} x '
+                 f'{_mm(sheet_plan["sheet_length"])} x {_mm(thickness)}']
+        for c in sheet_plan["cut_sequence"]:
+            if c["rotate_before"]:
+                lines.append("ROTATE")
+            if c["move_fence"]:
+                lines.append(f"FENCE {_mm(c['fence'])}")
+            length = abs(c["x2"] - c["x1"]) + abs(c["y2"] - c["y1"])
+            lines.append(f'{c["kind"].upper()} {c["step"]} STAGE {c["stage"]} FROM {c["parent"] or 0} '
+                         f'LENGTH {_mm(length)}')
+        lines.append(f"END SHEET {number}")
+        yield "\n".join(lines) + "\n"
@@ -0,0 +1,173 @@
+"""Cutting plan response bodies and their columnar encoding.
+
+plan_body builds the CuttingPlanResponse-shaped body of a solved plan
+without touching the database, for the API and the batch CLI alike.
+
+Big plans repeat the same keys, cut labels and sheet labels in every
+assignment. The columnar form lists each cut once in a top-level table
+and stores every sheet's assignments and saw cuts as parallel arrays, so
+the body is a fraction of the size and parses into a handful of arrays
+instead of tens of thousands of objects:
+
+- ``cuts``: distinct cuts as columns (``id``, ``label``, ``width``,
+  ``length``, ``thickness``).
+- ``sheet_plans[].assignments``: ``cut`` (index into ``cuts``),
+  ``x_position``, ``y_position`` and ``rotation`` in cutting order; the
+  sequence number is the position plus one and the sheet is the
+  enclosing sheet plan.
+- ``sheet_plans[].cut_sequence``: one column per saw cut field; the
+  step is the position plus one.
+
+Plan totals, unplaced cuts and unused sheets are the same in both forms.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Iterable, Optional
+from app.services.planner import SolvedPlan
+
+COLUMNAR = "columnar"
+
+CUT_COLUMNS = ["id", "label", "width", "length", "thickness"]
+SAW_CUT_COLUMNS = ["kind", "stage", "parent", "x1", "y1", "x2", "y2", "fence", "rotate_before", "move_fence"]
+
+
+def plan_body(solved: SolvedPlan, stock_sheets: Iterable[Any], plan_id: str,
+              created_at: Optional[datetime | str] = None, columnar: bool = False) -> dict[str, Any]:
+    """
+    Build the CuttingPlanResponse body of a solved plan as plain dicts.
+
+    Assignments are read straight from the plan's PlacementTable. With
+    columnar, the body is built in the columnar format (see the module
+    docstring) without creating a dict per assignment or saw cut on the
+    way.
+
+    Args:
+        solved: Result of solve_plan
+        stock_sheets: Sheets (rows or optimizer Sheets) whose unused
+            quantity is listed under unused_sheets
+        plan_id: Id reported for the plan
+        created_at: Creation time reported for the plan
+        columnar: Build the columnar format
+
+    Returns:
+        Response body matching CuttingPlanResponse
+    """
+    table = solved.table
+    cuts, cut_column, x_column, y_column, rotated_column = table.cuts, table.cut, table.x, table.y, table.rotated
+    # Columnar cut table: cuts in order of first appearance
+    cut_index: dict[int, int] = {}
+
+    sheet_plans = []
+    for layout in solved.layouts:
+        sheet_id = layout.source_id
+        sheet_label = layout.sheet.label
+        rows = range(layout.start, layout.stop)
+        assignments: dict[str, list[Any]] | list[dict[str, Any]]
+        cut_sequence: dict[str, list[Any]] | list[dict[str, Any]]
+        if columnar:
+            assignments = {
+                "cut": [cut_index.setdefault(cut_column[r], len(cut_index)) for r in rows],
+                "x_position": x_column[layout.start:layout.stop].tolist(),
+                "y_position": y_column[layout.start:layout.stop].tolist(),
+                "rotation": [90 if rotated_column[r] else 0 for r in rows],
+            }
+            saw_cuts = layout.sequence.cuts
+            cut_sequence = {column: [getattr(c, column) for c in saw_cuts] for column in SAW_CUT_COLUMNS}
+            for column in ("x1", "y1", "x2", "y2", "fence"):
+                cut_sequence[column] = [float(v) for v in cut_sequence[column]]
+        else:
+            assignments = [
+                {
+                    "cut_id": cut.id,
+                    "cut_label": cut.label,
+                    "sheet_id": sheet_id,
+                    "sheet_label": sheet_label,
+                    "x_position": x_column[r],
+                    "y_position": y_column[r],
+                    "rotation": 90 if rotated_column[r] else 0,
+                    "sequence_number": i + 1,
+                    "width": cut.width,
+                    "length": cut.length,
+                    "thickness": cut.thickness
+                }
+                for i, (r, cut) in enumerate(zip(rows, (cuts[cut_column[r]] for r in rows)))
+            ]
+            cut_sequence = [
+                {
+                    "step": c.step,
+                    "kind": c.kind,
+                    "stage": c.stage,
+                    "parent": c.parent,
+                    "x1": float(c.x1),
+                    "y1": float(c.y1),
+                    "x2": float(c.x2),
+                    "y2": float(c.y2),
+                    "fence": float(c.fence),
+                    "rotate_before": c.rotate_before,
+                    "move_fence": c.move_fence
+                }
+                for c in layout.sequence.cuts
+            ]
+
+        sheet_plans.append({
+            "sheet_id": sheet_id,
+            "sheet_label": sheet_label,
+            "sheet_width": layout.sheet.width,
+            "sheet_length": layout.sheet.length,
+            "assignments": assignments,
+            "waste_area": layout.waste_area,
+            "cut_sequence": cut_sequence,
+            "saw_time": layout.sequence.saw_time
+        })
+
+    # Build unplaced cuts response
+    unplaced_response = [
+        {
+            "cut_id": u.cut.id,
+            "cut_label": u.cut.label,
+            "width": u.cut.width,
+            "length": u.cut.length,
+            "thickness": u.cut.thickness,
+            "reason": u.reason
+        }
+        for u in solved.unplaced
+    ]
+
+    # Calculate unused sheets (original qty minus instances used)
+    used_instances: defaultdict[str, int] = defaultdict(int)
+    for layout in solved.layouts:
+        used_instances[layout.source_id] += 1
+
+    unused_sheets_response = []
+    for s in stock_sheets:
+        original_qty = getattr(s, 'quantity', 1) or 1
+        used_qty = used_instances.get(s.id, 0)
+        remaining = original_qty - used_qty
+        if remaining > 0:
+            unused_sheets_response.append({
+                "sheet_id": s.id,
+                "label": s.label,
+                "width": s.width,
+                "length": s.length,
+                "thickness": s.thickness,
+                "quantity": remaining,
+                "priority": getattr(s.priority, "value", s.priority)
+            })
+
+    body: dict[str, Any] = {
+        "id": plan_id,
+        "created_at": created_at,
+        "total_waste": solved.total_waste,
+        "kerf_width": solved.kerf_width,
+        "sheets_used": len(solved.layouts),
+        "estimated_saw_time": solved.saw_time,
+        "sheet_plans": sheet_plans,
+        "unplaced_cuts": unplaced_response,
+        "unused_sheets": unused_sheets_response
+    }
+    if columnar:
+        placed = sorted(cut_index, key=cut_index.__getitem__)
+        body["format"] = COLUMNAR
+        body["cuts"] = {column: [getattr(cuts[i], column) for i in placed] for column in CUT_COLUMNS}
+    return body
+
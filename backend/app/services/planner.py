@@ -0,0 +1,225 @@
+"""Database-free planning pipeline: pack cuts, then sequence every sheet.
+
+Everything here works on plain dataclasses so it can run in a worker
+process (see solver_pool) or outside the web app altogether.
+"""
+import hashlib
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from typing import Iterable, Optional
+from app.services.cut_sequence import CutSequence, SawProfile, sequence_sheet
+from app.services.engines import DEFAULT_ENGINE, Seed, get_engine, warm_start
+from app.services.optimizer import Cut, PackStats, Sheet, Placement, UnplacedCut
+from app.services.placement_table import PlacementTable
+
+INSTANCE_SEPARATOR = "__inst"
+
+
+def split_instance_id(sheet_id: str) -> tuple[str, int]:
+    """Split an expanded sheet instance id into (original sheet id, instance number)."""
+    original, _, instance = str(sheet_id).partition(INSTANCE_SEPARATOR)
+    return original, int(instance) if instance else 0
+
+
+def plan_input_key(cuts: list[Cut], sheets: list[Sheet], kerf_width: float,
+                   minimize_saw_time: bool = False, algorithm: str = DEFAULT_ENGINE,
+                   time_limit: Optional[float] = None, warm_start_plan_id: Optional[str] = None,
+                   random_seed: Optional[int] = None, restarts: Optional[int] = None) -> str:
+    """
+    Canonical hash of a solve's inputs.
+
+    Independent of the order cuts and sheets were loaded in, so identical
+    project states always produce the same key.
+    """
+    canonical = {
+        "cuts": sorted(
+            [c.id, c.label, float(c.width), float(c.length), float(c.thickness), c.quantity]
+            for c in cuts
+        ),
+        "sheets": sorted(
+            [s.id, s.label, float(s.width), float(s.length), float(s.thickness), s.quantity, s.priority]
+            for s in sheets
+        ),
+        "kerf_width": float(kerf_width),
+        "minimize_saw_time": minimize_saw_time,
+        "algorithm": algorithm,
+        "time_limit": time_limit,
+        "warm_start": warm_start_plan_id,
+        "random_seed": random_seed,
+        "restarts": restarts,
+    }
+    raw = json.dumps(canonical, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+@dataclass
+class SheetLayout:
+    """
+    Packed sheet instance: rows start to stop of the plan's placement
+    table, in the order the saw frees the pieces.
+    """
+    table: PlacementTable = field(repr=False, compare=False)
+    index: int  # the instance in table.sheets
+    start: int
+    stop: int
+    sequence: CutSequence
+
+    @property
+    def sheet(self) -> Sheet:
+        return self.table.sheets[self.index]
+
+    @property
+    def placements(self) -> list[Placement]:
+        """The sheet's pieces as Placement objects (built on each access)."""
+        return [self.table.placement(row) for row in range(self.start, self.stop)]
+
+    @property
+    def source_id(self) -> str:
+        return split_instance_id(self.sheet.id)[0]
+
+    @property
+    def instance(self) -> int:
+        return split_instance_id(self.sheet.id)[1]
+
+    @property
+    def waste_area(self) -> float:
+        used_area = sum(cut.width * cut.length for cut, *_ in self.table.rows(self.start, self.stop))
+        return self.sheet.width * self.sheet.length - used_area
+
+
+@dataclass
+class SolvedPlan:
+    """Result of solve_plan, ready to be persisted or rendered."""
+    kerf_width: float
+    layouts: list[SheetLayout] = field(default_factory=list)
+    unplaced: list[UnplacedCut] = field(default_factory=list)
+    # Every placement of the plan; layouts are row ranges of it
+    table: PlacementTable = field(default_factory=PlacementTable, repr=False)
+    # Where the solve spent its time (see metrics.observe_solve); not part of the plan
+    pack_stats: PackStats = field(default_factory=PackStats, compare=False, repr=False)
+    sequence_seconds: float = field(default=0.0, compare=False, repr=False)
+
+    @property
+    def total_waste(self) -> float:
+        return sum(layout.waste_area for layout in self.layouts)
+
+    @property
+    def saw_time(self) -> float:
+        return sum(layout.sequence.saw_time for layout in self.layouts)
+
+    def add_layout(self, sheet: Sheet, rows: Iterable[tuple[int, float, float, bool]],
+                   sequence: CutSequence) -> SheetLayout:
+        """Append a sheet instance and its (cut index, x, y, rotated) rows in cutting order."""
+        table = self.table
+        index = len(table.sheets)
+        table.sheets.append(sheet)
+        start = len(table)
+        for cut, x, y, rotated in rows:
+            table.append(cut, index, x, y, rotated)
+        layout = SheetLayout(table, index, start, len(table), sequence)
+        self.layouts.append(layout)
+        return layout
+
+
+def solve_plan(cuts: list[Cut], sheets: list[Sheet], kerf_width: float = 3.0,
+               minimize_saw_time: bool = False,
+               saw_profile: Optional[SawProfile] = None, algorithm: str = DEFAULT_ENGINE,
+               time_limit: Optional[float] = None, seed: Optional[Seed] = None,
+               random_seed: Optional[int] = None, restarts: Optional[int] = None,
+               workers: int = 1) -> SolvedPlan:
+    """
+    Pack cuts onto sheets and derive the saw sequence of each used sheet.
+
+    The engine's Placement objects are copied into the plan's
+    PlacementTable and dropped on return; they still exist, one per
+    piece, while the plan is built.
+
+    Args:
+        cuts: Required cuts (quantities are expanded by the packer)
+        sheets: Available sheets (quantities are expanded by the packer)
+        kerf_width: Blade kerf width in millimeters
+        minimize_saw_time: Use estimated saw time as a secondary objective
+        saw_profile: Saw timing model, defaults to SawProfile()
+        algorithm: Registered engine to pack with (see engines)
+        time_limit: Seconds a time-bounded engine may search
+        seed: Layouts of a previous plan to warm-start from
+        random_seed: Seed of a seeded engine's random choices
+        restarts: Restarts a seeded engine runs instead of searching for
+            time_limit; makes the plan reproducible from random_seed
+        workers: Processes a seeded engine may restart in
+
+    Returns:
+        SolvedPlan with one layout per used sheet instance
+    """
+    saw_profile = saw_profile or SawProfile()
+    engine = get_engine(algorithm)
+    pack_profile = saw_profile if minimize_saw_time else None
+    incumbent = warm_start(engine, seed, cuts, sheets, kerf_width, pack_profile) if seed else None
+    placements, unplaced, pack_stats = engine.optimize(
+        cuts, sheets, kerf_width,
+        saw_profile=pack_profile,
+        time_limit=time_limit,
+        incumbent=incumbent,
+        random_seed=random_seed,
+        restarts=restarts,
+        workers=workers,
+    )
+
+    # Group placements by sheet instance
+    placements_by_sheet = defaultdict(list)
+    for placement in placements:
+        placements_by_sheet[placement.sheet.id].append(placement)
+
+    cut_index = {c.id: i for i, c in enumerate(cuts)}
+    solved = SolvedPlan(kerf_width=kerf_width, unplaced=unplaced, pack_stats=pack_stats,
+                        table=PlacementTable([replace(c, quantity=1) for c in cuts]))
+    started = time.perf_counter()
+    for sheet_placements in placements_by_sheet.values():
+        instance = sheet_placements[0].sheet
+        sequence = sequence_sheet(
+            instance.width, instance.length,
+            [(p.x, p.y, p.width, p.length) for p in sheet_placements],
+            kerf_width, saw_profile
+        )
+        solved.add_layout(instance, (
+            (cut_index[p.cut.id], p.x, p.y, p.rotated)
+            for p in (sheet_placements[i] for i in sequence.piece_order)
+        ), sequence)
+    solved.sequence_seconds = time.perf_counter() - started
+    return solved
+
+
+def solve_preview(cuts: list[Cut], sheets: list[Sheet], kerf_width: float = 3.0) -> SolvedPlan:
+    """
+    Quick plan to show while the full solve runs.
+
+    First-fit decreasing only, whatever engine the full solve uses, and no
+    saw sequencing: sheets list their pieces in packing order with an
+    empty CutSequence. Sequencing costs several times the packing itself.
+    """
+    placements, unplaced, pack_stats = get_engine(DEFAULT_ENGINE).optimize(cuts, sheets, kerf_width)
+
+    placements_by_sheet = defaultdict(list)
+    for placement in placements:
+        placements_by_sheet[placement.sheet.id].append(placement)
+
+    cut_index = {c.id: i for i, c in enumerate(cuts)}
+    solved = SolvedPlan(kerf_width=kerf_width, unplaced=unplaced, pack_stats=pack_stats,
+                        table=PlacementTable([replace(c, quantity=1) for c in cuts]))
+    for sheet_placements in placements_by_sheet.values():
+        solved.add_layout(sheet_placements[0].sheet, (
+            (cut_index[p.cut.id], p.x, p.y, p.rotated) for p in sheet_placements
+        ), CutSequence(piece_order=list(range(len(sheet_placements)))))
+    return solved
+
+
+def unchanged_sheets(solved: SolvedPlan, seed: Seed) -> int:
+    """Number of sheets laid out exactly as in the plan the seed came from."""
+    previous = {(sheet_id, number): sorted(rows) for sheet_id, number, rows in seed}
+    return sum(
+        1 for layout in solved.layouts
+        if previous.get((layout.source_id, layout.instance))
+        == sorted((cut.id, x, y, rotated) for cut, x, y, rotated in layout.table.rows(layout.start, layout.stop))
+    )
@@ -2,6 +2,42 @@
 from typing import List, Dict, Any
 
 
+def print_plan_data(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten a plan response body into the input of generate_print_html.
+
+    Args:
+        plan: Body in the CuttingPlanResponse shape (see plan_format.plan_body)
+
+    Returns:
+        Dictionary with one entry per placed cut and the kerf width
+    """
+    return {
+        "assignments": [
+            {
+                "cut": {
+                    "label": assignment["cut_label"],
+                    "width": assignment["width"],
+                    "length": assignment["length"],
+                    "thickness": assignment["thickness"]
+                },
+                "sheet": {
+                    "label": sheet_plan["sheet_label"],
+                    "width": sheet_plan["sheet_width"],
+                    "length": sheet_plan["sheet_length"]
+                },
+                "x_position": assignment["x_position"],
+                "y_position": assignment["y_position"],
+                "rotation": assignment["rotation"],
+                "sequence_number": assignment["sequence_number"]
+            }
+            for sheet_plan in plan["sheet_plans"]
+            for assignment in sheet_plan["assignments"]
+        ],
+        "kerf_width": plan["kerf_width"]
+    }
+
+
 def generate_print_html(plan_data: Dict[str, Any]) -> str:
     """
     Generate HTML for print-ready cutting instructions.
@@ -0,0 +1,160 @@
+"""Profiles and replayable input fixtures of individual optimizations.
+
+A request with ``profile: true`` solves under cProfile; the stats are
+saved as ``<id>.prof`` (open with pstats or snakeviz) and summarised as
+the top hotspots in the response. ``dump_fixture: true`` saves the
+solve's exact inputs as ``<id>.json``, which can be replayed offline:
+
+    python -m app.services.profiling data/profiles/<id>.json [--profile]
+
+Both are disabled unless PROFILING_ENABLED is set.
+"""
+import argparse
+import json
+import pstats
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+from uuid import uuid4
+from app.config import settings
+from app.services.engines import DEFAULT_ENGINE, Seed
+from app.services.solver_worker import Job, profile_job, solve_job
+
+FIXTURE_VERSION = 1
+PROFILE = "profile"
+FIXTURE = "fixture"
+_SUFFIXES = {PROFILE: ".prof", FIXTURE: ".json"}
+_ARTIFACT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# pstats' raw table: (file, line, function) -> (primitive calls, calls, own, cumulative, callers)
+RawStats = dict[tuple[str, int, str], tuple[int, int, float, float, dict[Any, Any]]]
+
+
+def new_artifact_id() -> str:
+    return uuid4().hex
+
+
+def artifact_path(artifact_id: str, kind: str) -> Optional[Path]:
+    """Path of a profile or fixture file, or None for an id that can't be one."""
+    if not _ARTIFACT_ID.match(artifact_id) or kind not in _SUFFIXES:
+        return None
+    return Path(settings.profile_dir) / f"{artifact_id}{_SUFFIXES[kind]}"
+
+
+def _write(artifact_id: str, kind: str, data: bytes) -> Path:
+    path = artifact_path(artifact_id, kind)
+    if path is None:
+        raise ValueError(f"Invalid {kind} id: {artifact_id}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def save_profile(artifact_id: str, raw_stats: bytes) -> Path:
+    """Write marshalled cProfile stats (from profile_job) as a .prof file."""
+    return _write(artifact_id, PROFILE, raw_stats)
+
+
+def hotspots(path: Path, limit: int) -> list[dict[str, Any]]:
+    """
+    Summarise a .prof file as its most expensive functions.
+
+    Args:
+        path: Profile written by save_profile
+        limit: Number of functions to return
+
+    Returns:
+        Functions ordered by own time (excluding callees), each with its
+        call count and own and cumulative seconds
+    """
+    stats: RawStats = getattr(pstats.Stats(str(path)), "stats")  # undeclared in the stubs
+    ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    return [
+        {
+            "function": name,
+            "file": filename,
+            "line": line,
+            "calls": calls,
+            "own_seconds": round(own, 6),
+            "cumulative_seconds": round(cumulative, 6),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in ranked
+    ]
+
+
+def save_fixture(artifact_id: str, job: Job) -> Path:
+    """Write an encoded job as a self-describing JSON fixture."""
+    (cut_rows, sheet_rows, kerf_width, minimize_saw_time, algorithm, time_limit, seed,
+     random_seed, restarts, workers) = job
+    fixture = {
+        "version": FIXTURE_VERSION,
+        "kerf_width": kerf_width,
+        "minimize_saw_time": minimize_saw_time,
+        "algorithm": algorithm,
+        "time_limit": time_limit,
+        "seed": seed,
+        "random_seed": random_seed,
+        "restarts": restarts,
+        "workers": workers,
+        "cuts": [dict(zip(("id", "width", "length", "thickness", "label", "quantity"), row))
+                 for row in cut_rows],
+        "sheets": [dict(zip(("id", "width", "length", "thickness", "label", "priority", "quantity"), row))
+                   for row in sheet_rows],
+    }
+    return _write(artifact_id, FIXTURE, json.dumps(fixture, indent=1).encode())
+
+
+def _seed(rows: Optional[list]) -> Optional[Seed]:
+    # JSON turns the seed's tuples into lists
+    if rows is None:
+        return None
+    return [(sheet_id, number, [tuple(p) for p in placements]) for sheet_id, number, placements in rows]
+
+
+def load_fixture(path: Path) -> Job:
+    """Read a fixture written by save_fixture back into a job for solve_job."""
+    fixture = json.loads(Path(path).read_text())
+    if fixture.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"Unsupported fixture version: {fixture.get('version')}")
+    cuts = [(c["id"], c["width"], c["length"], c["thickness"], c["label"], c["quantity"])
+            for c in fixture["cuts"]]
+    sheets = [(s["id"], s["width"], s["length"], s["thickness"], s["label"], s["priority"], s["quantity"])
+              for s in fixture["sheets"]]
+    return (cuts, sheets, fixture["kerf_width"], fixture["minimize_saw_time"],
+            fixture.get("algorithm", DEFAULT_ENGINE), fixture.get("time_limit"),
+            _seed(fixture.get("seed")), fixture.get("random_seed"), fixture.get("restarts"),
+            fixture.get("workers", 1))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Replay a fixture and report its solve time (optionally its hotspots)."""
+    parser = argparse.ArgumentParser(description="Replay an optimization fixture")
+    parser.add_argument("fixture", type=Path)
+    parser.add_argument("--repeat", type=int, default=1, help="solves to run (best time is reported)")
+    parser.add_argument("--profile", action="store_true", help="print the top hotspots of one solve")
+    parser.add_argument("--top", type=int, default=settings.profile_top_n)
+    args = parser.parse_args(argv)
+
+    job = load_fixture(args.fixture)
+    best = float("inf")
+    for _ in range(max(1, args.repeat)):
+        started = time.perf_counter()
+        layouts, unplaced, _ = solve_job(job)
+        best = min(best, time.perf_counter() - started)
+    pieces = sum(row[5] for row in job[0])
+    print(f"{pieces} pieces, {len(layouts)} sheets, {len(unplaced)} unplaced, best {best:.3f} s")
+
+    if args.profile:
+        _, raw_stats = profile_job(job)
+        path = save_profile(new_artifact_id(), raw_stats)
+        for spot in hotspots(path, args.top):
+            print(f"{spot['own_seconds']:10.4f} {spot['cumulative_seconds']:10.4f} {spot['calls']:>9} "
+                  f"{spot['function']} ({spot['file']}:{spot['line']})")
+        print(f"profile: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""Stock purchase planning: the cheapest mix of sheet sizes for a cut list.
+
+Candidate sheet types come with a unit price and unlimited quantity. A
+sheet only serves cuts of its own thickness, so every thickness is
+planned on its own. For each one the search evaluates
+
+1. every type on its own, and
+2. every ordered pair of types: k sheets of the first, packed first,
+   topped up with as many of the second as needed, for k = 1, 2, ...
+
+Each candidate is packed by the regular packer (solver_worker.pack_job)
+and only the sheets it actually uses are bought. Candidates whose area
+lower bound can't beat the cheapest purchase found so far are pruned
+without packing; the rest are packed in parallel batches.
+
+Like the packer, this module has no web or database code: the caller
+passes the coroutine that packs a job (the solver pool in the API).
+"""
+import asyncio
+import math
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+from app.services.optimizer import Cut, Sheet
+from app.services.solver_worker import Job, encode_job
+
+# Fill order: (sheet type index, number of sheets) entries, packed first to last
+Mix = tuple[tuple[int, int], ...]
+Evaluate = Callable[[Job], Awaitable[tuple[dict[str, int], int]]]
+
+
+@dataclass(frozen=True)
+class SheetType:
+    """A sheet size that can be bought in any quantity."""
+    label: str
+    width: float
+    length: float
+    thickness: float
+    unit_price: float
+
+    @property
+    def area(self) -> float:
+        return self.width * self.length
+
+
+@dataclass
+class PurchasePlan:
+    """Cheapest purchase found, as one mix per thickness."""
+    types: list[SheetType]
+    mixes: list[Mix] = field(default_factory=list)
+    evaluated: int = 0
+    pruned: int = 0
+    # False when max_evaluations cut the search short
+    complete: bool = True
+
+    @property
+    def quantities(self) -> list[int]:
+        """Sheets to buy per type, in the order the types were given."""
+        quantities = [0] * len(self.types)
+        for mix in self.mixes:
+            for index, count in mix:
+                quantities[index] += count
+        return quantities
+
+    @property
+    def cost(self) -> float:
+        return sum(q * t.unit_price for q, t in zip(self.quantities, self.types))
+
+    def sheets(self) -> list[Sheet]:
+        """The purchase as sheets, filling in the order the search packed them."""
+        return [sheet for mix in self.mixes for sheet in mix_sheets(self.types, mix)]
+
+
+def type_id(index: int) -> str:
+    return f"type{index}"
+
+
+def mix_sheets(types: list[SheetType], mix: Mix) -> list[Sheet]:
+    """Sheets of a mix; the first entry gets high priority so it is packed first."""
+    return [
+        Sheet(id=type_id(index), width=types[index].width, length=types[index].length,
+              thickness=types[index].thickness, label=types[index].label,
+              priority="high" if position == 0 else "normal", quantity=count)
+        for position, (index, count) in enumerate(mix)
+    ]
+
+
+def _fits(cut: Cut, sheet_type: SheetType, kerf: float) -> bool:
+    return ((cut.width + kerf <= sheet_type.width and cut.length + kerf <= sheet_type.length)
+            or (cut.length + kerf <= sheet_type.width and cut.width + kerf <= sheet_type.length))
+
+
+class _ThicknessSearch:
+    """Search for the cheapest mix of the sheet types of one thickness."""
+
+    def __init__(self, cuts: list[Cut], types: list[SheetType], indices: list[int],
+                 kerf: float, evaluate: Evaluate) -> None:
+        self.cuts = cuts
+        self.types = types
+        self.indices = indices
+        self.kerf = kerf
+        self.evaluate = evaluate
+        self.pieces = sum(c.quantity for c in cuts)
+        self.area = sum(c.width * c.length * c.quantity for c in cuts)
+        self.best: Optional[Mix] = None
+        self.best_cost = (math.inf, math.inf)  # (cost, sheets)
+        self.evaluated = 0
+        self.pruned = 0
+
+    def lower_bound(self, mix: Mix) -> float:
+        """Cheapest any packing of the mix can be: the rest of the area on its last type."""
+        cost, area = 0.0, self.area
+        *fixed, (last, _) = mix
+        for index, count in fixed:
+            cost += count * self.types[index].unit_price
+            area -= count * self.types[index].area
+        return cost + math.ceil(max(0.0, area) / self.types[last].area) * self.types[last].unit_price
+
+    async def _pack(self, mix: Mix) -> Optional[Mix]:
+        """Pack a candidate; returns the sheets it uses, or None if cuts are left over."""
+        sheets = mix_sheets(self.types, mix)
+        used, unplaced = await self.evaluate(encode_job(self.cuts, sheets, self.kerf))
+        self.evaluated += 1
+        if unplaced:
+            return None
+        return tuple((index, used[type_id(index)]) for index, _ in mix if used.get(type_id(index)))
+
+    def _consider(self, bought: Optional[Mix]) -> None:
+        if bought is None:
+            return
+        score = (sum(count * self.types[index].unit_price for index, count in bought),
+                 sum(count for _, count in bought))
+        if score < self.best_cost:
+            self.best, self.best_cost = bought, score
+
+    async def run(self, parallelism: int, max_evaluations: int) -> bool:
+        """
+        Search until every candidate is packed or pruned.
+
+        Returns:
+            False when max_evaluations stopped the search early
+        """
+        singles: list[Mix] = [((i, self.pieces),) for i in self.indices]
+        single_counts: dict[int, int] = {}
+        for mix, bought in zip(singles, await asyncio.gather(*(self._pack(mix) for mix in singles))):
+            self._consider(bought)
+            if bought:
+                single_counts[mix[0][0]] = bought[0][1]
+
+        # No mix beats the cheapest price per area on all of the cut area
+        floor = self.area * min(self.types[i].unit_price / self.types[i].area for i in self.indices)
+        next_k = {(i, j): 1 for i in self.indices for j in self.indices if i != j}
+        while next_k:
+            if self.best_cost[0] <= floor:
+                return True
+            if self.evaluated >= max_evaluations:
+                return False
+            batch = self._next_batch(next_k, min(parallelism, max_evaluations - self.evaluated),
+                                     single_counts)
+            results = await asyncio.gather(*(self._pack(mix) for mix in batch))
+            for mix, bought in zip(batch, results):
+                self._consider(bought)
+                first, k = mix[0]
+                used_first = dict(bought or ()).get(first, 0)
+                if bought is not None and used_first < k:
+                    # The packer no longer fills the extra sheets; larger k repeats this mix
+                    next_k.pop((first, mix[1][0]), None)
+        return True
+
+    def _next_batch(self, next_k: dict[tuple[int, int], int], size: int,
+                    single_counts: dict[int, int]) -> list[Mix]:
+        """Take the next unpruned k of each pair in turn until the batch is full."""
+        batch: list[Mix] = []
+        while next_k and len(batch) < size:
+            for pair in list(next_k):
+                i, j = pair
+                k = next_k[pair]
+                # k at or beyond the single-type count is the single type again
+                limit = single_counts.get(i, self.pieces + 1) - 1
+                while k <= limit:
+                    mix = ((i, k), (j, self.pieces))
+                    k += 1
+                    if self.lower_bound(mix) < self.best_cost[0]:
+                        batch.append(mix)
+                        break
+                    self.pruned += 1
+                if k > limit:
+                    del next_k[pair]
+                else:
+                    next_k[pair] = k
+                if len(batch) >= size:
+                    break
+        return batch
+
+
+async def plan_purchase(cuts: list[Cut], types: list[SheetType], kerf: float, evaluate: Evaluate,
+                        parallelism: int = 1, max_evaluations: int = 500) -> PurchasePlan:
+    """
+    Find the cheapest purchase of sheet types that fits every cut.
+
+    Args:
+        cuts: Required cuts
+        types: Candidate sheet types
+        kerf: Blade kerf width in millimeters
+        evaluate: Coroutine packing an encoded job, returning
+            solver_worker.pack_job's result
+        parallelism: Candidates packed concurrently per thickness
+        max_evaluations: Packs per thickness before the search stops with
+            the cheapest purchase found so far
+
+    Returns:
+        PurchasePlan with one mix per thickness of the cuts
+
+    Raises:
+        ValueError: When some cut fits no candidate sheet type
+    """
+    by_thickness: dict[float, list[Cut]] = {}
+    for cut in cuts:
+        by_thickness.setdefault(cut.thickness, []).append(cut)
+
+    searches = []
+    for thickness, group in by_thickness.items():
+        indices = [i for i, t in enumerate(types) if t.thickness == thickness]
+        if not indices:
+            raise ValueError(f"No candidate sheet type with {thickness:g}mm thickness")
+        for cut in group:
+            if not any(_fits(cut, types[i], kerf) for i in indices):
+                raise ValueError(f"Cut {cut.label} ({cut.width:g}×{cut.length:g}) fits none of "
+                                 f"the {thickness:g}mm sheet types")
+        searches.append(_ThicknessSearch(group, types, indices, kerf, evaluate))
+
+    finished = await asyncio.gather(*(s.run(max(1, parallelism), max_evaluations) for s in searches))
+    plan = PurchasePlan(types=types, complete=all(finished))
+    for search in searches:
+        if search.best is None:
+            raise ValueError(f"No mix of the {search.cuts[0].thickness:g}mm sheet types fits every cut")
+        plan.mixes.append(search.best)
+        plan.evaluated += search.evaluated
+        plan.pruned += search.pruned
+    return plan
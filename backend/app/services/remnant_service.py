@@ -0,0 +1,150 @@
+"""Service layer for the remnant (offcut) inventory."""
+from collections import defaultdict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.cutting_plan import CuttingPlan
+from app.models.plan_assignment import PlanAssignment
+from app.models.remnant import Remnant
+from app.models.required_cut import RequiredCut
+from app.models.stock_sheet import StockSheet
+from app.services.cut_sequence import sequence_sheet
+from app.services.optimizer import Cut, Sheet
+
+# Remnants are packed before any stock sheet, whatever its priority
+REMNANT_PRIORITY = "remnant"
+
+
+async def find_remnants(db: AsyncSession, thickness: float, min_width: float,
+                        min_length: float) -> list[Remnant]:
+    """
+    Find remnants of a thickness that can hold a min_width × min_length piece.
+
+    Served by the (thickness, width, length) index: an equality seek on
+    thickness followed by a range scan on width, smallest remnants first.
+    Remnants already cut up in a plan are not in the inventory.
+    """
+    result = await db.scalars(
+        select(Remnant)
+        .where(Remnant.thickness == thickness,
+               Remnant.width >= min_width,
+               Remnant.length >= min_length,
+               Remnant.consumed_plan_id.is_(None))
+        .order_by(Remnant.width, Remnant.length)
+    )
+    return list(result.all())
+
+
+async def remnant_sheets(db: AsyncSession, cuts: list[Cut]) -> list[Sheet]:
+    """
+    Convert the remnants that could hold at least one of the cuts into sheets.
+
+    Args:
+        db: Database session
+        cuts: Cuts to be placed
+
+    Returns:
+        Sheets with REMNANT_PRIORITY, one per matching remnant
+    """
+    # Smallest short and long side needed per thickness
+    smallest: dict[float, tuple[float, float]] = {}
+    for cut in cuts:
+        short, long = sorted((cut.width, cut.length))
+        if cut.thickness in smallest:
+            s, l = smallest[cut.thickness]
+            short, long = min(short, s), min(long, l)
+        smallest[cut.thickness] = (short, long)
+
+    sheets = []
+    for thickness, (min_width, min_length) in smallest.items():
+        for r in await find_remnants(db, thickness, min_width, min_length):
+            sheets.append(Sheet(
+                id=r.id,
+                width=r.width,
+                length=r.length,
+                thickness=r.thickness,
+                label=r.label,
+                priority=REMNANT_PRIORITY,
+                quantity=1
+            ))
+    return sheets
+
+
+async def harvest_plan_remnants(db: AsyncSession, plan: CuttingPlan, min_width: float,
+                                min_length: float) -> tuple[list[Remnant], int]:
+    """
+    Save the usable offcuts of a plan and take the remnants it consumed
+    out of the inventory.
+
+    Offcuts are the empty panels of each sheet's guillotine cut sequence,
+    i.e. the pieces of waste the saw actually produces. Consumed remnants
+    are marked with the plan rather than deleted, since the plan's
+    assignments still refer to them.
+
+    Args:
+        db: Database session
+        plan: Cutting plan whose sheets are being cut
+        min_width: Minimum short side of a remnant worth keeping
+        min_length: Minimum long side of a remnant worth keeping
+
+    Returns:
+        (created remnants, number of consumed remnants)
+
+    Raises:
+        ValueError: When the plan was already harvested or refers to cuts
+            or sheets that no longer exist
+    """
+    if plan.remnants_harvested:
+        raise ValueError("Offcuts of this plan have already been saved")
+
+    rows = (await db.execute(
+        select(PlanAssignment, RequiredCut)
+        .outerjoin(RequiredCut, PlanAssignment.cut_id == RequiredCut.id)
+        .where(PlanAssignment.plan_id == plan.id)
+    )).all()
+    if any(cut is None for _, cut in rows):
+        raise ValueError("Plan references required cuts that no longer exist")
+
+    sheet_ids = {a.sheet_id for a, _ in rows if a.sheet_id is not None}
+    remnant_ids = {a.remnant_id for a, _ in rows if a.remnant_id is not None}
+    sources: dict[str, StockSheet | Remnant] = {
+        s.id: s for s in await db.scalars(select(StockSheet).where(StockSheet.id.in_(sheet_ids)))
+    }
+    # Plans stored before remnant_id existed kept remnant ids in sheet_id
+    used = list((await db.scalars(select(Remnant).where(Remnant.id.in_(remnant_ids | sheet_ids)))).all())
+    sources.update({r.id: r for r in used})
+    # Another plan may have cut up the same remnant already
+    consumed = [r for r in used if r.consumed_plan_id is None]
+
+    pieces_by_instance = defaultdict(list)
+    for assignment, cut in rows:
+        w, l = (cut.length, cut.width) if assignment.rotation == 90 else (cut.width, cut.length)
+        key = (assignment.sheet_id or assignment.remnant_id, assignment.sheet_instance or 0)
+        pieces_by_instance[key].append((assignment.x_position, assignment.y_position, w, l))
+
+    created = []
+    for (sheet_id, _), pieces in pieces_by_instance.items():
+        source = sources.get(sheet_id)
+        if source is None:
+            raise ValueError("Plan references stock sheets that no longer exist")
+        sequence = sequence_sheet(source.width, source.length, pieces, plan.kerf_width)
+        for offcut in sequence.offcuts:
+            short, long = sorted((round(offcut.width, 1), round(offcut.length, 1)))
+            if short < min_width or long < min_length:
+                continue
+            remnant = Remnant(
+                width=short,
+                length=long,
+                thickness=source.thickness,
+                label=f"Offcut {short:g}×{long:g} from {source.label}"[:100],
+                source_plan_id=plan.id
+            )
+            db.add(remnant)
+            created.append(remnant)
+
+    for remnant in consumed:
+        remnant.consumed_plan_id = plan.id
+    plan.remnants_harvested = True
+    await db.commit()
+    for remnant in created:
+        await db.refresh(remnant)
+    return created, len(consumed)
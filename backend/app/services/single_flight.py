@@ -0,0 +1,52 @@
+"""Single-flight execution: concurrent calls with the same key share one run."""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent duplicate work.
+
+    The first caller for a key runs the work; callers arriving while it is
+    in flight wait for it and receive the same result (or exception). Once
+    the run finishes the key is forgotten, so later calls run again.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run work() for key, or join the run already in flight.
+
+        If the leading call is cancelled, its waiters retry and one of them
+        becomes the new leader.
+        """
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this waiter was cancelled, not the leader
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome retrieved so a run nobody joined logs no warning
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
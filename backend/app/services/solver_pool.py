@@ -0,0 +1,108 @@
+"""Dedicated, warm process pool for CPU-heavy optimizer runs.
+
+Solves run in separate processes so they neither hold the GIL nor occupy
+the thread pool that serves the quick CRUD routes. Workers are forked at
+startup from a forkserver that has already imported the optimizer stack,
+warm up with a tiny solve and are replaced after
+solver_max_tasks_per_child jobs to cap memory growth.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.services.solver_worker import ping, warm_up
+
+logger = logging.getLogger(__name__)
+
+# Imported once by the forkserver and inherited by every worker it forks
+WORKER_MODULE = "app.services.solver_worker"
+HEALTH_TIMEOUT = 5.0
+
+_executor: Optional[ProcessPoolExecutor] = None
+_workers = 0
+
+
+def start_solver_pool() -> None:
+    """Create the solver pool and fork its workers (no-op when disabled or running)."""
+    global _executor, _workers
+    if _executor is not None or settings.optimizer_workers <= 0:
+        return
+    # forkserver: workers never inherit the API's threads and open connections
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload([WORKER_MODULE])
+    # At least one process per solve admission control lets run, so a
+    # running large job never holds up an admitted small one
+    _workers = max(settings.optimizer_workers,
+                   settings.small_lane_concurrency + settings.large_lane_concurrency)
+    _executor = ProcessPoolExecutor(
+        max_workers=_workers,
+        mp_context=context,
+        initializer=warm_up,
+        max_tasks_per_child=settings.solver_max_tasks_per_child or None
+    )
+    # Workers are otherwise forked on demand; start them all now
+    for _ in range(_workers):
+        _executor.submit(ping)
+
+
+def shutdown_solver_pool() -> None:
+    """Stop the solver pool, cancelling queued solves."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _restart_solver_pool() -> None:
+    logger.error("Optimizer worker pool is broken, restarting it")
+    shutdown_solver_pool()
+    start_solver_pool()
+
+
+async def run_solver(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run fn(*args) in the solver pool and await its result.
+
+    fn and its arguments must be picklable. When optimizer_workers is 0 the
+    call runs in the API's thread pool instead. If a worker dies (e.g. it
+    is killed for running out of memory) the pool is replaced and the job
+    fails with RuntimeError.
+    """
+    if settings.optimizer_workers <= 0:
+        return await run_in_threadpool(fn, *args)
+    start_solver_pool()
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_executor, partial(fn, *args))
+    except BrokenProcessPool:
+        _restart_solver_pool()
+        raise RuntimeError("Optimizer worker process crashed")
+
+
+async def solver_pool_health() -> dict[str, Any]:
+    """
+    Check that the pool answers a ping.
+
+    "busy" means every worker is solving and the ping queued past
+    HEALTH_TIMEOUT; a broken pool is restarted and reported as "restarted".
+    """
+    if settings.optimizer_workers <= 0:
+        return {"status": "disabled"}
+    if _executor is None:
+        return {"status": "stopped"}
+    loop = asyncio.get_running_loop()
+    try:
+        await asyncio.wait_for(loop.run_in_executor(_executor, ping), HEALTH_TIMEOUT)
+    except BrokenProcessPool:
+        _restart_solver_pool()
+        return {"status": "restarted", "workers": _workers}
+    except asyncio.TimeoutError:
+        return {"status": "busy", "workers": _workers}
+    return {"status": "healthy", "workers": _workers}
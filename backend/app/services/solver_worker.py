@@ -0,0 +1,190 @@
+"""Code that runs inside optimizer worker processes.
+
+Jobs and results cross the process boundary as flat tuples of primitives
+rather than pickled dataclass graphs: cuts and sheets are sent once as
+rows, and results refer back to them by index. This keeps the payload
+small and cheap to (un)pickle; the API process rebuilds the SolvedPlan
+from the rows it already holds.
+
+This module imports only the optimizer stack, so the forkserver can
+preload it once and every worker starts with it already imported.
+"""
+import cProfile
+import marshal
+import os
+from dataclasses import replace
+from typing import Any, Optional
+from app.services.cut_sequence import CutSequence, SawCut
+from app.services.engines import DEFAULT_ENGINE, Seed, get_engine
+from app.services.optimizer import Cut, PackStats, Rectangle, Sheet, UnplacedCut
+from app.services.placement_table import PlacementTable
+from app.services.planner import SolvedPlan, solve_plan, split_instance_id
+
+# (cut rows, sheet rows, kerf width, minimize saw time, engine, time limit, warm-start seed,
+#  random seed, restarts, search workers)
+Job = tuple[list[tuple], list[tuple], float, bool, str, Optional[float], Optional[Seed],
+            Optional[int], Optional[int], int]
+# (layout rows, unplaced rows, stats row)
+Result = tuple[list[tuple], list[tuple], tuple]
+
+
+def encode_job(cuts: list[Cut], sheets: list[Sheet], kerf_width: float,
+               minimize_saw_time: bool = False, algorithm: str = DEFAULT_ENGINE,
+               time_limit: Optional[float] = None, seed: Optional[Seed] = None,
+               random_seed: Optional[int] = None, restarts: Optional[int] = None, workers: int = 1) -> Job:
+    """Flatten a solve's inputs for a worker process."""
+    return (
+        [(c.id, c.width, c.length, c.thickness, c.label, c.quantity) for c in cuts],
+        [(s.id, s.width, s.length, s.thickness, s.label, s.priority, s.quantity) for s in sheets],
+        kerf_width,
+        minimize_saw_time,
+        algorithm,
+        time_limit,
+        seed,
+        random_seed,
+        restarts,
+        workers,
+    )
+
+
+def decode_job(job: Job) -> tuple[list[Cut], list[Sheet], float, bool, str, Optional[float], Optional[Seed],
+                                  Optional[int], Optional[int], int]:
+    (cut_rows, sheet_rows, kerf_width, minimize_saw_time, algorithm, time_limit, seed,
+     random_seed, restarts, workers) = job
+    cuts = [Cut(*row) for row in cut_rows]
+    sheets = [Sheet(*row) for row in sheet_rows]
+    return (cuts, sheets, kerf_width, minimize_saw_time, algorithm, time_limit, seed,
+            random_seed, restarts, workers)
+
+
+def _encode_sequence(sequence: CutSequence) -> tuple:
+    return (
+        [(c.kind, c.stage, c.parent, c.x1, c.y1, c.x2, c.y2, c.fence, c.move_fence, c.rotate_before)
+         for c in sequence.cuts],
+        sequence.piece_order,
+        [(r.x, r.y, r.width, r.length) for r in sequence.offcuts],
+        sequence.rotations,
+        sequence.fence_moves,
+        sequence.saw_time,
+    )
+
+
+def _decode_sequence(row: tuple) -> CutSequence:
+    cut_rows, piece_order, offcut_rows, rotations, fence_moves, saw_time = row
+    return CutSequence(
+        cuts=[SawCut(step, *cut) for step, cut in enumerate(cut_rows, start=1)],
+        piece_order=list(piece_order),
+        offcuts=[Rectangle(*offcut) for offcut in offcut_rows],
+        rotations=rotations,
+        fence_moves=fence_moves,
+        saw_time=saw_time,
+    )
+
+
+def encode_result(solved: SolvedPlan, cuts: list[Cut]) -> Result:
+    """Flatten a SolvedPlan; placements refer to cuts by their index in the job."""
+    table = solved.table
+    layouts = [
+        (
+            layout.sheet.id,
+            layout.sheet.label,
+            list(zip(table.cut[layout.start:layout.stop], table.x[layout.start:layout.stop],
+                     table.y[layout.start:layout.stop], table.rotated[layout.start:layout.stop])),
+            _encode_sequence(layout.sequence),
+        )
+        for layout in solved.layouts
+    ]
+    index = {c.id: i for i, c in enumerate(cuts)}
+    unplaced = [(index[u.cut.id], u.reason) for u in solved.unplaced]
+    s = solved.pack_stats
+    stats = (s.expand_seconds, s.sort_seconds, s.sheet_seconds, s.free_rects, s.pieces,
+             solved.sequence_seconds)
+    return layouts, unplaced, stats
+
+
+def decode_result(result: Result, cuts: list[Cut], sheets: list[Sheet],
+                  kerf_width: float) -> SolvedPlan:
+    """
+    Rebuild the SolvedPlan of a job from its flattened result.
+
+    Placement rows go straight into the plan's PlacementTable; no
+    per-piece objects are created.
+
+    Args:
+        result: Output of solve_job
+        cuts: Cuts the job was encoded from
+        sheets: Sheets the job was encoded from
+        kerf_width: Kerf width the job was solved with
+
+    Returns:
+        SolvedPlan equal to what solve_plan returns in-process
+    """
+    layout_rows, unplaced_rows, stats_row = result
+    # One quantity-1 copy per cut, as the packer expands them
+    pieces = [replace(c, quantity=1) for c in cuts]
+    sources = {s.id: s for s in sheets}
+
+    *pack_stats, sequence_seconds = stats_row
+    solved = SolvedPlan(kerf_width=kerf_width, table=PlacementTable(pieces),
+                        pack_stats=PackStats(*pack_stats), sequence_seconds=sequence_seconds)
+    for instance_id, label, placement_rows, sequence_row in layout_rows:
+        source = sources[split_instance_id(instance_id)[0]]
+        sheet = replace(source, id=instance_id, label=label, quantity=1)
+        solved.add_layout(sheet, placement_rows, _decode_sequence(sequence_row))
+    solved.unplaced = [UnplacedCut(pieces[i], reason) for i, reason in unplaced_rows]
+    return solved
+
+
+def solve_job(job: Job) -> Result:
+    """Worker entry point: solve an encoded job and return the encoded result."""
+    (cuts, sheets, kerf_width, minimize_saw_time, algorithm, time_limit, seed,
+     random_seed, restarts, workers) = decode_job(job)
+    solved = solve_plan(cuts, sheets, kerf_width, minimize_saw_time,
+                        algorithm=algorithm, time_limit=time_limit, seed=seed,
+                        random_seed=random_seed, restarts=restarts, workers=workers)
+    return encode_result(solved, cuts)
+
+
+def pack_job(job: Job) -> tuple[dict[str, int], int]:
+    """
+    Worker entry point for packing without saw sequencing.
+
+    Returns:
+        (sheet instances used per sheet id of the job, pieces left unplaced)
+    """
+    cuts, sheets, kerf_width, _, algorithm, time_limit, _, random_seed, restarts, workers = decode_job(job)
+    placements, unplaced, _ = get_engine(algorithm).optimize(cuts, sheets, kerf_width, time_limit=time_limit,
+                                                             random_seed=random_seed, restarts=restarts,
+                                                             workers=workers)
+    used: dict[str, set[str]] = {}
+    for p in placements:
+        used.setdefault(split_instance_id(p.sheet.id)[0], set()).add(p.sheet.id)
+    return {sheet_id: len(instances) for sheet_id, instances in used.items()}, len(unplaced)
+
+
+def profile_job(job: Job) -> tuple[Result, bytes]:
+    """
+    Worker entry point for profiled solves.
+
+    Runs solve_job under cProfile and also returns the collected stats,
+    marshalled exactly as a ``.prof`` file (readable with pstats).
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(solve_job, job)
+    profiler.create_stats()
+    return result, marshal.dumps(profiler.stats)
+
+
+def warm_up() -> None:
+    """Worker initializer: run a tiny solve so first real jobs hit warm code paths."""
+    solve_job(encode_job(
+        [Cut("warm-up", 100, 200, 18, "warm-up", 2)],
+        [Sheet("warm-up", 1000, 1000, 18, "warm-up", "normal", 1)],
+        3.0,
+        True,
+    ))
+
+
+def ping() -> int:
+    """Health check: answered by any idle worker with its process id."""
+    return os.getpid()
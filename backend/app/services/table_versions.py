@@ -0,0 +1,47 @@
+"""Per-table version counters used for conditional (ETag) list responses."""
+from sqlalchemy import Delete, Insert, TableClause, Update, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, ORMExecuteState, UOWTransaction
+from app.models.table_version import TableVersion
+
+_BUMP = text(
+    "INSERT INTO table_versions (name, version) VALUES (:name, 1) "
+    "ON CONFLICT(name) DO UPDATE SET version = version + 1"
+)
+
+
+def _bump(session: Session, names: set[str]) -> None:
+    connection = session.connection()
+    for name in names - {TableVersion.__tablename__}:
+        connection.execute(_BUMP, {"name": name})
+
+
+def _after_flush(session: Session, flush_context: UOWTransaction) -> None:
+    """Bump the tables of every row added, changed or deleted in this flush."""
+    changed = list(session.new) + list(session.deleted)
+    changed += [o for o in session.dirty if session.is_modified(o)]
+    _bump(session, {type(o).__tablename__ for o in changed})
+
+
+def _do_orm_execute(state: ORMExecuteState) -> None:
+    """Bump the table of bulk INSERT/UPDATE/DELETE statements, which bypass the flush."""
+    statement = state.statement
+    if isinstance(statement, (Insert, Update, Delete)) and isinstance(statement.table, TableClause):
+        _bump(state.session, {statement.table.name})
+
+
+def track_table_versions(session_class: type[Session] = Session) -> None:
+    """
+    Keep table_versions up to date for every session of session_class.
+
+    The default covers both engines: AsyncSession runs a plain Session
+    underneath, so its flushes and bulk statements fire the same events.
+    """
+    event.listen(session_class, "after_flush", _after_flush)
+    event.listen(session_class, "do_orm_execute", _do_orm_execute)
+
+
+async def get_table_version(db: AsyncSession, name: str) -> int:
+    """Current version of a table (0 if it was never written)."""
+    row = await db.get(TableVersion, name)
+    return row.version if row else 0
@@ -0,0 +1 @@
+"""Optimizer benchmarks: seeded instances (instances) and the runner (run)."""
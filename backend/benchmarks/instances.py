@@ -0,0 +1,131 @@
+"""Seeded synthetic optimizer instances.
+
+Every family turns (pieces, seed) into the same cuts and sheets on every
+machine, so benchmark results are comparable across runs and commits.
+Pieces are counted after quantity expansion, i.e. what the packer places.
+"""
+import math
+import random
+from dataclasses import dataclass
+from typing import Callable
+from app.services.optimizer import Cut, Sheet
+
+SHEET_WIDTH = 1220
+SHEET_LENGTH = 2440
+# Stock provided per thickness, relative to the area of its cuts
+STOCK_FACTOR = 1.6
+
+
+@dataclass
+class Instance:
+    """One benchmark input."""
+    family: str
+    pieces: int
+    seed: int
+    cuts: list[Cut]
+    sheets: list[Sheet]
+
+
+# Carcass parts of a kitchen base/wall cabinet as (label, width, length,
+# thickness, count) for a cabinet of width w, height h and depth d
+def _cabinet_parts(w: int, h: int, d: int) -> list[tuple[str, int, int, int, int]]:
+    return [
+        ("Side", d, h, 18, 2),
+        ("Bottom", w - 36, d, 18, 1),
+        ("Rail", w - 36, 100, 18, 2),
+        ("Shelf", w - 38, d - 20, 18, 1),
+        ("Back", w - 4, h - 4, 6, 1),
+        ("Door", w // 2 - 3, h - 3, 18, 2) if w > 500 else ("Door", w - 3, h - 3, 18, 1),
+    ]
+
+
+def _cabinets(rng: random.Random, pieces: int) -> list[Cut]:
+    cuts: list[Cut] = []
+    placed = 0
+    while placed < pieces:
+        number = len(cuts) // 6 + 1
+        w = rng.choice([300, 400, 450, 500, 600, 800, 900, 1000])
+        h = rng.choice([720, 720, 720, 900, 2100])
+        d = rng.choice([300, 560, 560, 580])
+        for label, width, length, thickness, count in _cabinet_parts(w, h, d):
+            count = min(count, pieces - placed)
+            if count <= 0:
+                break
+            cuts.append(Cut(f"cab{number}-{label.lower()}", width, length, thickness,
+                            f"Cab {number} {label}", count))
+            placed += count
+    return cuts
+
+
+def _high_quantity(rng: random.Random, pieces: int) -> list[Cut]:
+    kinds = max(1, min(8, pieces // 10))
+    sizes = [(rng.randint(150, 600), rng.randint(200, 1200)) for _ in range(kinds)]
+    quantities = [pieces // kinds + (1 if i < pieces % kinds else 0) for i in range(kinds)]
+    return [Cut(f"run{i}", w, l, 18, f"Run {i}", q)
+            for i, ((w, l), q) in enumerate(zip(sizes, quantities)) if q > 0]
+
+
+def _thicknesses(rng: random.Random, pieces: int) -> list[Cut]:
+    thicknesses = [3, 4, 6, 9, 12, 15, 16, 18, 19, 22, 25, 30, 36, 40]
+    return [Cut(f"t{i}", rng.randint(80, 900), rng.randint(80, 1800), rng.choice(thicknesses), f"T {i}", 1)
+            for i in range(pieces)]
+
+
+def _slivers(rng: random.Random, pieces: int) -> list[Cut]:
+    cuts = []
+    for i in range(pieces):
+        kind = rng.random()
+        if kind < 0.4:  # long, barely wider than the kerf
+            size = (rng.randint(5, 30), rng.randint(1800, SHEET_LENGTH - 10))
+        elif kind < 0.7:  # tiny blocks
+            size = (rng.randint(10, 60), rng.randint(10, 60))
+        elif kind < 0.9:  # full-width strips
+            size = (SHEET_WIDTH - rng.randint(5, 20), rng.randint(20, 80))
+        else:  # near full sheet
+            size = (SHEET_WIDTH - rng.randint(5, 40), SHEET_LENGTH - rng.randint(5, 40))
+        cuts.append(Cut(f"s{i}", *size, 18, f"Sliver {i}", 1))
+    return cuts
+
+
+FAMILIES: dict[str, Callable[[random.Random, int], list[Cut]]] = {
+    "cabinets": _cabinets,
+    "high_quantity": _high_quantity,
+    "thicknesses": _thicknesses,
+    "slivers": _slivers,
+}
+
+
+def _stock_for(cuts: list[Cut]) -> list[Sheet]:
+    """Enough full sheets of every thickness used for all cuts to fit."""
+    area: dict[float, float] = {}
+    for c in cuts:
+        area[c.thickness] = area.get(c.thickness, 0.0) + c.width * c.length * c.quantity
+    return [
+        Sheet(f"stock-{thickness:g}", SHEET_WIDTH, SHEET_LENGTH, thickness, f"{thickness:g}mm board",
+              "normal", math.ceil(total * STOCK_FACTOR / (SHEET_WIDTH * SHEET_LENGTH)) + 1)
+        for thickness, total in sorted(area.items())
+    ]
+
+
+def generate(family: str, pieces: int, seed: int = 0) -> Instance:
+    """
+    Build a benchmark instance.
+
+    Args:
+        family: One of FAMILIES
+        pieces: Number of pieces after quantity expansion
+        seed: Random seed; the same arguments always give the same instance
+
+    Returns:
+        Instance with the cuts and enough stock sheets to place them all
+
+    Raises:
+        ValueError: For an unknown family or fewer than one piece
+    """
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown instance family: {family}")
+    if pieces < 1:
+        raise ValueError("Instances need at least one piece")
+    rng = random.Random(f"{family}:{pieces}:{seed}")
+    cuts = FAMILIES[family](rng, pieces)
+    return Instance(family, pieces, seed, cuts, _stock_for(cuts))
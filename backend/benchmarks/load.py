@@ -0,0 +1,319 @@
+"""End-to-end HTTP load test against a real uvicorn server.
+
+    python -m benchmarks.load --duration 60 --rate list=20 --rate optimize=2
+    python -m benchmarks.load --url http://localhost:8000 --duration 30
+
+Without --url the server is started here (``uvicorn app.main:app``) on a
+free port with a fresh SQLite file in a temp directory and stopped at the
+end. Traffic is open-loop: each operation fires at its own rate with
+seeded exponential inter-arrival times, whether or not earlier requests
+have finished, so a slow server shows up as latency and errors rather
+than as a quietly lower request rate.
+
+Operations (rates per second, see DEFAULT_RATES):
+
+- list: GET /api/stock/ or /api/cuts/
+- get, create, update, delete: single-row CRUD on /api/cuts/
+- optimize, print: POST /api/optimize/ and /api/optimize/print
+
+CRUD runs in one project and the optimize calls in another, seeded with
+--pieces pieces, so the solve size stays fixed while cuts churn. Each
+optimize call uses a different kerf so requests are not coalesced.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Optional
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_RATES = {"list": 20.0, "get": 10.0, "create": 5.0, "update": 5.0, "delete": 4.0,
+                 "optimize": 1.0, "print": 0.2}
+STARTUP_TIMEOUT = 30.0
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Latencies and outcomes per route."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, seconds: float, status: str) -> None:
+        self.latencies[route].append(seconds)
+        self.statuses[route][status] += 1
+
+    def summary(self, elapsed: float) -> dict[str, dict[str, Any]]:
+        """
+        Per-route report.
+
+        Errors are transport failures and 5xx; 429 (admission control) is
+        reported separately as rejected.
+        """
+        report = {}
+        for route in sorted(self.latencies):
+            values = sorted(self.latencies[route])
+            statuses = self.statuses[route]
+            errors = sum(n for s, n in statuses.items() if s == "error" or s.startswith("5"))
+            report[route] = {
+                "requests": len(values),
+                "throughput": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+                "error_rate": round(errors / len(values), 4),
+                "rejected": statuses.get("429", 0),
+                "statuses": dict(sorted(statuses.items())),
+            }
+        return report
+
+
+class LoadTest:
+    """Seeds two projects and drives the configured operation mix."""
+
+    def __init__(self, client: httpx.AsyncClient, rates: dict[str, float], pieces: int, seed: int,
+                 max_in_flight: int) -> None:
+        self.client = client
+        self.rates = rates
+        self.pieces = pieces
+        self.rng = random.Random(seed)
+        self.recorder = Recorder()
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.crud_headers: dict[str, str] = {}
+        self.plan_headers: dict[str, str] = {}
+        self.cut_ids: list[str] = []
+        self.counter = 0
+        self.dropped = 0
+
+    async def _project(self, name: str) -> dict[str, str]:
+        response = await self.client.post("/api/projects/", json={"name": f"{name} {time.time_ns()}"})
+        response.raise_for_status()
+        return {"X-Project-Id": response.json()["id"]}
+
+    async def seed(self) -> None:
+        """Create the CRUD and optimize projects and their starting rows."""
+        self.crud_headers = await self._project("load crud")
+        self.plan_headers = await self._project("load optimize")
+        for _ in range(20):
+            await self.create()
+
+        kinds = max(1, self.pieces // 20)
+        for i in range(kinds):
+            quantity = self.pieces // kinds + (1 if i < self.pieces % kinds else 0)
+            cut = {"label": f"Part {i}", "width": self.rng.randint(100, 600),
+                   "length": self.rng.randint(200, 1200), "thickness": 18, "quantity": quantity}
+            (await self.client.post("/api/cuts/", json=cut, headers=self.plan_headers)).raise_for_status()
+        sheets = self.pieces // 8 + 2
+        while sheets > 0:
+            stock = {"label": f"Ply {sheets}", "width": 1220, "length": 2440, "thickness": 18,
+                     "quantity": min(sheets, 100)}
+            (await self.client.post("/api/stock/", json=stock, headers=self.plan_headers)).raise_for_status()
+            sheets -= 100
+
+    async def _call(self, route: str, method: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(route, time.perf_counter() - started, "error")
+            return None
+        self.recorder.record(route, time.perf_counter() - started, str(response.status_code))
+        return response
+
+    def _cut(self) -> dict[str, Any]:
+        self.counter += 1
+        return {"label": f"Load cut {self.counter}", "width": self.rng.randint(50, 900),
+                "length": self.rng.randint(50, 1800), "thickness": 18, "quantity": self.rng.randint(1, 5)}
+
+    async def list(self) -> None:
+        resource = self.rng.choice(["stock", "cuts"])
+        await self._call(f"GET /api/{resource}/", "GET", f"/api/{resource}/", headers=self.crud_headers)
+
+    async def get(self) -> None:
+        if self.cut_ids:
+            cut_id = self.rng.choice(self.cut_ids)
+            await self._call("GET /api/cuts/{cut_id}", "GET", f"/api/cuts/{cut_id}", headers=self.crud_headers)
+
+    async def create(self) -> None:
+        response = await self._call("POST /api/cuts/", "POST", "/api/cuts/", json=self._cut(),
+                                    headers=self.crud_headers)
+        if response is not None and response.status_code == 201:
+            self.cut_ids.append(response.json()["id"])
+
+    async def update(self) -> None:
+        if self.cut_ids:
+            cut_id = self.rng.choice(self.cut_ids)
+            await self._call("PUT /api/cuts/{cut_id}", "PUT", f"/api/cuts/{cut_id}",
+                             json={"quantity": self.rng.randint(1, 5)}, headers=self.crud_headers)
+
+    async def delete(self) -> None:
+        if len(self.cut_ids) > 10:
+            cut_id = self.cut_ids.pop(self.rng.randrange(len(self.cut_ids)))
+            await self._call("DELETE /api/cuts/{cut_id}", "DELETE", f"/api/cuts/{cut_id}",
+                             headers=self.crud_headers)
+
+    def _optimization(self) -> dict[str, Any]:
+        return {"kerf_width": round(self.rng.uniform(2.0, 5.0), 2)}
+
+    async def optimize(self) -> None:
+        await self._call("POST /api/optimize/", "POST", "/api/optimize/", json=self._optimization(),
+                         headers=self.plan_headers)
+
+    async def print(self) -> None:
+        await self._call("POST /api/optimize/print", "POST", "/api/optimize/print",
+                         json=self._optimization(), headers=self.plan_headers)
+
+    async def _fire(self, operation: str) -> None:
+        try:
+            await getattr(self, operation)()
+        finally:
+            self.slots.release()
+
+    async def _drive(self, operation: str, rate: float, deadline: float, tasks: set) -> None:
+        rng = random.Random(f"{self.rng.random()}:{operation}")
+        next_at = time.perf_counter()
+        while True:
+            next_at += rng.expovariate(rate)
+            if next_at >= deadline:
+                return
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            if self.slots.locked():
+                self.dropped += 1  # client-side cap reached; the server is far behind
+                continue
+            await self.slots.acquire()
+            task = asyncio.create_task(self._fire(operation))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    async def run(self, duration: float) -> dict[str, Any]:
+        """Drive every operation for duration seconds, then wait for stragglers."""
+        self.recorder = Recorder()  # leave seeding out of the report
+        started = time.perf_counter()
+        tasks: set = set()
+        await asyncio.gather(*[
+            self._drive(operation, rate, started + duration, tasks)
+            for operation, rate in self.rates.items() if rate > 0
+        ])
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        return {"duration": round(elapsed, 2), "dropped": self.dropped,
+                "routes": self.recorder.summary(elapsed)}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port: int = s.getsockname()[1]
+        return port
+
+
+def start_server(port: int, workers: int, data_dir: Path) -> subprocess.Popen:
+    """Start uvicorn on a fresh SQLite database under data_dir."""
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{data_dir / 'load.db'}",
+        "MAINTENANCE_INTERVAL_HOURS": "0",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, server: Optional[subprocess.Popen]) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become healthy in time")
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(f"\n{'route':32} {'reqs':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>7} {'429':>5}")
+    for route, r in report["routes"].items():
+        print(f"{route:32} {r['requests']:6} {r['throughput']:7.2f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+              f"{r['p99_ms']:8.1f} {r['error_rate']:7.2%} {r['rejected']:5}")
+    print(f"\n{report['duration']} s, {report['dropped']} requests dropped at the client in-flight cap")
+
+
+def parse_rates(values: list[str]) -> dict[str, float]:
+    rates = dict(DEFAULT_RATES)
+    for value in values:
+        operation, _, rate = value.partition("=")
+        if operation not in DEFAULT_RATES or not rate:
+            raise argparse.ArgumentTypeError(f"Expected OPERATION=RATE with one of {', '.join(DEFAULT_RATES)}")
+        rates[operation] = float(rate)
+    return rates
+
+
+async def main_async(args: argparse.Namespace) -> dict[str, Any]:
+    server = None
+    with tempfile.TemporaryDirectory() as data_dir:
+        url = args.url
+        if url is None:
+            port = _free_port()
+            server = start_server(port, args.workers, Path(data_dir))
+            url = f"http://127.0.0.1:{port}"
+        limits = httpx.Limits(max_connections=args.max_in_flight)
+        try:
+            async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+                await wait_until_healthy(client, server)
+                test = LoadTest(client, parse_rates(args.rate), args.pieces, args.seed, args.max_in_flight)
+                await test.seed()
+                return await test.run(args.duration)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP load test for the woodcutter API")
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic")
+    parser.add_argument("--rate", action="append", default=[], metavar="OPERATION=RATE",
+                        help=f"requests per second, repeatable (defaults: {DEFAULT_RATES})")
+    parser.add_argument("--pieces", type=int, default=200, help="pieces in each optimization")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="client-side concurrency cap")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=1) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Run the optimizer benchmarks and compare them with a baseline.
+
+    python -m benchmarks.run                        # default sizes, compare to baseline.json
+    python -m benchmarks.run --sizes 10 100 1000 10000 100000 --budget 600
+    python -m benchmarks.run --update-baseline      # record the current results
+    python -m benchmarks.run --engines shelf --sizes 1000 10000 100000
+
+Each case (engine x family x size) reports its best runtime over
+--repeat solves, its peak traced memory, sheets used and yield (placed
+area over the area of the sheets used). Time-bounded engines search for
+TIME_LIMIT seconds per solve. A case regresses when it is
+slower than the baseline by more than --time-tolerance, uses more
+sheets, or yields less; any regression makes the run exit with status 1.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Optional
+from app.services import engines as registry
+from app.services.planner import SolvedPlan, solve_plan
+from benchmarks.instances import FAMILIES, Instance, generate
+
+BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = [10, 100, 1000]
+KERF_WIDTH = 3.0
+# Runtimes below this many seconds are too noisy to flag
+MIN_SECONDS = 0.05
+# Search time of time-bounded engines per solve
+TIME_LIMIT = 0.5
+
+Engine = Callable[[Instance], SolvedPlan]
+
+
+def _engine(algorithm: str, minimize_saw_time: bool = False) -> Engine:
+    return lambda i: solve_plan(i.cuts, i.sheets, KERF_WIDTH, minimize_saw_time,
+                                algorithm=algorithm, time_limit=TIME_LIMIT)
+
+
+# Every registered engine, plus the guillotine packer with saw time as secondary objective
+ENGINES: dict[str, Engine] = {
+    "guillotine": _engine("guillotine"),
+    "guillotine_saw_time": _engine("guillotine", minimize_saw_time=True),
+    **{name: _engine(name) for name in registry.ENGINES if name != "guillotine"},
+}
+
+
+def max_pieces(engine: str) -> Optional[int]:
+    """Largest instance the benchmark engine accepts, None for no limit."""
+    return registry.get_engine(engine.removesuffix("_saw_time")).info.max_pieces
+
+
+def case_key(engine: str, family: str, pieces: int) -> str:
+    return f"{engine}/{family}/{pieces}"
+
+
+def measure(engine: Engine, instance: Instance, repeat: int = 1, memory: bool = True) -> dict[str, Any]:
+    """
+    Benchmark one engine on one instance.
+
+    Returns:
+        seconds (best of repeat), peak_mb (None without memory), sheets,
+        unplaced and yield_pct
+    """
+    seconds = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        solved = engine(instance)
+        seconds = min(seconds, time.perf_counter() - started)
+
+    peak_mb = None
+    if memory:
+        # Separate run: tracing slows allocation-heavy code down a lot
+        tracemalloc.start()
+        engine(instance)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    sheet_area = sum(layout.sheet.width * layout.sheet.length for layout in solved.layouts)
+    used_area = sheet_area - solved.total_waste
+    return {
+        "seconds": round(seconds, 4),
+        "peak_mb": None if peak_mb is None else round(peak_mb, 2),
+        "sheets": len(solved.layouts),
+        "unplaced": len(solved.unplaced),
+        "yield_pct": round(100 * used_area / sheet_area, 2) if sheet_area else 0.0,
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], time_tolerance: float) -> list[str]:
+    """
+    List regressions of results against baseline.
+
+    Cases missing from either side are not compared.
+    """
+    problems = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None or result.get("skipped"):
+            continue
+        limit = max(base["seconds"] * (1 + time_tolerance), MIN_SECONDS)
+        if result["seconds"] > limit:
+            problems.append(f"{key}: {result['seconds']:.3f} s, baseline {base['seconds']:.3f} s")
+        if result["sheets"] > base["sheets"]:
+            problems.append(f"{key}: {result['sheets']} sheets, baseline {base['sheets']}")
+        if result["unplaced"] > base["unplaced"]:
+            problems.append(f"{key}: {result['unplaced']} unplaced, baseline {base['unplaced']}")
+        if result["yield_pct"] < base["yield_pct"] - 0.01:
+            problems.append(f"{key}: yield {result['yield_pct']}%, baseline {base['yield_pct']}%")
+    return problems
+
+
+def run(engines: list[str], families: list[str], sizes: list[int], seed: int, repeat: int,
+        memory: bool, budget: Optional[float]) -> dict[str, dict]:
+    """
+    Benchmark every engine x family x size, smallest sizes first.
+
+    Once a case takes longer than budget seconds, the larger sizes of that
+    engine and family are recorded as skipped instead of run, as are sizes
+    above the engine's max_pieces.
+    """
+    results: dict[str, dict] = {}
+    for engine in engines:
+        limit = max_pieces(engine)
+        for family in families:
+            over_budget = False
+            for pieces in sorted(sizes):
+                key = case_key(engine, family, pieces)
+                if over_budget or (limit is not None and pieces > limit):
+                    results[key] = {"skipped": True}
+                    print(f"{key:45} skipped ({'budget' if over_budget else 'size'})", flush=True)
+                    continue
+                result = measure(ENGINES[engine], generate(family, pieces, seed), repeat, memory)
+                results[key] = result
+                print(f"{key:45} {result['seconds']:9.3f} s {result['peak_mb'] or 0:8.1f} MB "
+                      f"{result['sheets']:6} sheets {result['yield_pct']:6.2f}% yield", flush=True)
+                over_budget = budget is not None and result["seconds"] > budget
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Optimizer benchmark suite")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--families", nargs="+", default=list(FAMILIES), choices=list(FAMILIES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="solves per case; the best time counts")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="seconds after which larger sizes of the same case are skipped")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--time-tolerance", type=float, default=0.5,
+                        help="allowed slowdown against the baseline (0.5 = 50%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--output", type=Path, help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.engines, args.families, args.sizes, args.seed, args.repeat,
+                  not args.no_memory, args.budget)
+    report = {"seed": args.seed, "results": results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=1) + "\n")
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() else {}
+        baseline.update({k: v for k, v in results.items() if not v.get("skipped")})
+        args.baseline.write_text(json.dumps({"seed": args.seed, "results": dict(sorted(baseline.items()))},
+                                            indent=1) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("seed") != args.seed:
+        print(f"Baseline was recorded with seed {baseline.get('seed')}; not comparing")
+        return 0
+    problems = compare(results, baseline["results"], args.time_tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    print(f"{len(problems)} regression(s) against {args.baseline}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
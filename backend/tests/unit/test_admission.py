@@ -0,0 +1,70 @@
+"""Unit tests for optimizer admission control."""
+import asyncio
+import pytest
+from app.services.admission import AdmissionController, AdmissionRejected, Lane, LARGE, SMALL
+
+
+async def _hold(lane: Lane, release: asyncio.Event) -> None:
+    async with lane.admit():
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_429() -> None:
+    """Once every slot runs and the queue is full, new jobs are turned away."""
+    lane = Lane(SMALL, concurrency=1, queue_size=1, timeout=5)
+    release = asyncio.Event()
+    jobs = [asyncio.create_task(_hold(lane, release)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    assert (lane.running, lane.waiting) == (1, 1)
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with lane.admit():
+            pass
+    assert rejected.value.status_code == 429
+    assert rejected.value.retry_after >= 1
+
+    release.set()
+    await asyncio.gather(*jobs)
+    assert (lane.running, lane.waiting) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_is_rejected_with_503() -> None:
+    """A queued job that never gets a slot gives up after the timeout."""
+    lane = Lane(LARGE, concurrency=1, queue_size=4, timeout=0.05)
+    release = asyncio.Event()
+    job = asyncio.create_task(_hold(lane, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with lane.admit():
+            pass
+    assert rejected.value.status_code == 503
+    assert lane.waiting == 0
+
+    release.set()
+    await job
+
+
+@pytest.mark.asyncio
+async def test_small_jobs_pass_a_full_large_lane() -> None:
+    """Jobs are routed by piece count, so large jobs never block small ones."""
+    controller = AdmissionController(
+        100, Lane(SMALL, 1, 0, timeout=1), Lane(LARGE, 1, 0, timeout=1)
+    )
+    assert controller.lane_for(100).name == SMALL
+    assert controller.lane_for(101).name == LARGE
+
+    release = asyncio.Event()
+    job = asyncio.create_task(_hold(controller.lane_for(5000), release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected):
+        async with controller.lane_for(5000).admit():
+            pass
+    async with controller.lane_for(10).admit():
+        assert controller.lanes[SMALL].running == 1
+
+    release.set()
+    await job
@@ -0,0 +1,48 @@
+"""Unit tests for the headless batch optimizer."""
+import json
+from pathlib import Path
+from app.services.batch import discover_jobs, load_job, main
+
+
+def _write_jobs(root: Path) -> None:
+    kitchen = root / "kitchen"
+    kitchen.mkdir()
+    (kitchen / "cuts.csv").write_text("Label,Width,Length,Thickness,Quantity\nSide,560,720,18,4\nBack,600,700,6,2\n")
+    (kitchen / "sheets.csv").write_text("label,width,length,thickness,quantity\nPly,1220,2440,18,3\n")
+    (kitchen / "options.json").write_text('{"kerf_width": 4}')
+    (root / "shelves.json").write_text(json.dumps({
+        "cuts": [{"label": "Shelf", "width": 300, "length": 800, "thickness": 18, "quantity": 5}],
+        "sheets": [{"label": "Ply", "width": 1220, "length": 2440, "thickness": 18}],
+        "minimize_saw_time": True,
+    }))
+    (root / "broken.json").write_text('{"cuts": [{"label": "x", "width": "wide"}], "sheets": []}')
+
+
+def test_load_job_reads_csv_directories(tmp_path: Path) -> None:
+    """CSV headers are case-insensitive and options come from options.json."""
+    _write_jobs(tmp_path)
+
+    cuts, sheets, kerf_width, minimize_saw_time, algorithm, time_limit = load_job(tmp_path / "kitchen")
+
+    assert [(c.label, c.quantity) for c in cuts] == [("Side", 4), ("Back", 2)]
+    assert sheets[0].quantity == 3 and sheets[0].priority == "normal"
+    assert (kerf_width, minimize_saw_time, algorithm, time_limit) == (4.0, False, "auto", None)
+    assert discover_jobs(tmp_path) == [tmp_path / "broken.json", tmp_path / "kitchen", tmp_path / "shelves.json"]
+
+
+def test_batch_writes_plans_and_reports_failures(tmp_path: Path) -> None:
+    """Every job gets a summary entry; a bad job fails the run but not the others."""
+    jobs, out = tmp_path / "jobs", tmp_path / "out"
+    jobs.mkdir()
+    _write_jobs(jobs)
+
+    status = main([str(jobs), "--out", str(out), "--svg", "--html", "--workers", "1"])
+
+    summary = {s["job"]: s for s in json.loads((out / "summary.json").read_text())}
+    assert status == 1
+    assert summary["broken"]["status"] == "failed" and "width" in summary["broken"]["error"]
+    assert summary["kitchen"]["unplaced"] == 2  # no 6mm stock for the backs
+    plan = json.loads((out / "shelves" / "plan.json").read_text())
+    assert plan["sheets_used"] == summary["shelves"]["sheets_used"] == 1
+    assert (out / "shelves" / "sheet-01.svg").read_text().startswith("<svg")
+    assert "<html" in (out / "kitchen" / "print.html").read_text().lower()
@@ -0,0 +1,57 @@
+"""Unit tests for the benchmark generator, regression check and load report."""
+import pytest
+from benchmarks.instances import FAMILIES, generate
+from benchmarks.load import Recorder, percentile
+from benchmarks.run import ENGINES, compare, measure
+
+
+@pytest.mark.parametrize("family", list(FAMILIES))
+def test_instances_are_seeded_and_sized(family: str) -> None:
+    """Same arguments give the same instance, with exactly the asked piece count."""
+    first = generate(family, 57, seed=3)
+
+    assert first.cuts == generate(family, 57, seed=3).cuts
+    assert first.cuts != generate(family, 57, seed=4).cuts
+    assert sum(c.quantity for c in first.cuts) == 57
+    assert {c.thickness for c in first.cuts} == {s.thickness for s in first.sheets}
+
+
+def test_generated_stock_fits_every_piece() -> None:
+    """Benchmarks measure packing, so no piece may be left without stock."""
+    result = measure(ENGINES["guillotine"], generate("cabinets", 60), memory=False)
+
+    assert result["unplaced"] == 0
+    assert 0 < result["yield_pct"] <= 100
+
+
+def test_compare_flags_speed_and_quality_regressions() -> None:
+    """Slower beyond tolerance, more sheets or lower yield are regressions."""
+    base = {"e/f/10": {"seconds": 1.0, "sheets": 3, "unplaced": 0, "yield_pct": 80.0}}
+
+    within = {"e/f/10": {"seconds": 1.4, "sheets": 3, "unplaced": 0, "yield_pct": 80.0}}
+    worse = {"e/f/10": {"seconds": 1.6, "sheets": 4, "unplaced": 0, "yield_pct": 70.0}}
+
+    assert compare(within, base, time_tolerance=0.5) == []
+    assert len(compare(worse, base, time_tolerance=0.5)) == 3
+    assert compare({"e/f/10": {"skipped": True}}, base, 0.5) == []
+
+
+def test_load_report_percentiles_and_error_rates() -> None:
+    """Percentiles are nearest-rank; 5xx and transport errors count as errors, 429 apart."""
+    recorder = Recorder()
+    for i in range(1, 101):
+        recorder.record("GET /api/cuts/", i / 1000, "200")
+    recorder.record("POST /api/optimize/", 1.0, "200")
+    recorder.record("POST /api/optimize/", 2.0, "429")
+    recorder.record("POST /api/optimize/", 3.0, "503")
+    recorder.record("POST /api/optimize/", 4.0, "error")
+
+    report = recorder.summary(elapsed=2.0)
+
+    cuts = report["GET /api/cuts/"]
+    assert (cuts["p50_ms"], cuts["p95_ms"], cuts["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert cuts["throughput"] == 50.0 and cuts["error_rate"] == 0
+    optimize = report["POST /api/optimize/"]
+    assert optimize["error_rate"] == 0.5
+    assert optimize["rejected"] == 1
+    assert percentile([], 0.5) == 0.0
@@ -0,0 +1,63 @@
+"""Unit tests for bulk CSV parsing and import."""
+import io
+from pathlib import Path
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.database import Base
+from app.models.required_cut import RequiredCut
+from app.schemas.cut import RequiredCutCreate
+from app.services.bulk_io import CHUNK_SIZE, bulk_insert, iter_csv_records
+
+
+def test_csv_headers_are_normalized() -> None:
+    """Test header names are matched case-insensitively and trimmed."""
+    data = io.BytesIO(b"\xef\xbb\xbfLabel , Width,LENGTH,thickness\nSide,560,720,18\n")
+
+    records = list(iter_csv_records(data))
+
+    assert records == [{"label": "Side", "width": "560", "length": "720", "thickness": "18"}]
+
+
+def test_csv_blank_cells_and_rows_are_skipped() -> None:
+    """Test empty cells fall back to schema defaults and blank rows vanish."""
+    data = io.BytesIO(b"label,width,length,thickness,quantity\nShelf,300,560,18,\n,,,,\n")
+
+    records = list(iter_csv_records(data))
+
+    assert records == [{"label": "Shelf", "width": "300", "length": "560", "thickness": "18"}]
+
+
+def test_csv_is_parsed_lazily() -> None:
+    """Test rows are produced one at a time rather than read up front."""
+    data = io.BytesIO(b"label,width,length,thickness\n" + b"".join(
+        f"P{i},100,200,18\n".encode() for i in range(1000)
+    ))
+
+    records = iter_csv_records(data)
+
+    assert next(records)["label"] == "P0"
+    assert data.tell() < len(data.getvalue())
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_is_all_or_nothing(tmp_path: Path) -> None:
+    """Test records are inserted across chunks, and a bad record rolls back every chunk."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bulk.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    records = [{"label": f"P{i}", "width": 100, "length": 200, "thickness": 18} for i in range(CHUNK_SIZE + 10)]
+
+    async with async_sessionmaker(engine)() as db:
+        assert await bulk_insert(db, RequiredCut, RequiredCutCreate, iter(records)) == len(records)
+
+        with pytest.raises(ValueError, match="Row 2: width"):
+            await bulk_insert(db, RequiredCut, RequiredCutCreate,
+                              [{"label": "New", "width": 1, "length": 1, "thickness": 1},
+                               {"label": "Bad", "width": -1, "length": 1, "thickness": 1}])
+        with pytest.raises(ValueError, match="Label 'P3' already exists"):
+            await bulk_insert(db, RequiredCut, RequiredCutCreate,
+                              [{"label": "X", "width": 1, "length": 1, "thickness": 1}, records[3]])
+
+        assert await db.scalar(select(func.count()).select_from(RequiredCut)) == len(records)
+    await engine.dispose()
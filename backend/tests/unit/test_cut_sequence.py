@@ -0,0 +1,82 @@
+"""Unit tests for guillotine cut sequencing."""
+import pytest
+from app.services.cut_sequence import SawProfile, sequence_sheet, RIP, CROSSCUT, TRIM
+from app.services.optimizer import GuillotineBinPacker, Cut, Sheet
+
+
+def test_single_piece_needs_two_trims() -> None:
+    """A piece in the corner of a sheet is freed by one rip and one crosscut trim."""
+    sequence = sequence_sheet(1000, 2000, [(0, 0, 400, 600)], kerf=3.0)
+
+    assert [c.kind for c in sequence.cuts] == [TRIM, TRIM]
+    assert {c.vertical for c in sequence.cuts} == {True, False}
+    assert sequence.piece_order == [0]
+    assert sequence.rotations == 1
+
+
+def test_full_width_strips_need_no_rotation() -> None:
+    """Strips spanning the sheet are cut in a single crosscut stage."""
+    pieces = [(0, 0, 1000, 300), (0, 303, 1000, 300), (0, 606, 1000, 300)]
+    sequence = sequence_sheet(1000, 906, pieces, kerf=3.0)
+
+    assert [c.kind for c in sequence.cuts] == [CROSSCUT, CROSSCUT]
+    assert sequence.rotations == 0
+    # Equal strip widths share one fence setting
+    assert sequence.fence_moves == 1
+    assert sorted(sequence.piece_order) == [0, 1, 2]
+
+
+def test_rip_then_crosscut() -> None:
+    """Two columns of pieces are ripped apart and then crosscut."""
+    pieces = [(0, 0, 400, 500), (0, 503, 400, 500), (403, 0, 400, 500)]
+    sequence = sequence_sheet(803, 1003, pieces, kerf=3.0)
+
+    kinds = [c.kind for c in sequence.cuts]
+    assert kinds[0] == RIP
+    assert CROSSCUT in kinds
+    assert sorted(sequence.piece_order) == [0, 1, 2]
+    assert sequence.cuts[0].parent is None
+    assert all(c.parent is not None for c in sequence.cuts[1:])
+
+
+def test_offcuts_cover_waste() -> None:
+    """Offcut panels plus pieces and kerf account for the whole sheet."""
+    sequence = sequence_sheet(1000, 1000, [(0, 0, 500, 500)], kerf=0.0)
+
+    offcut_area = sum(r.area for r in sequence.offcuts)
+    assert offcut_area == pytest.approx(1000 * 1000 - 500 * 500)
+
+
+def test_non_guillotine_layout_rejected() -> None:
+    """A pinwheel layout has no full-span cut."""
+    pieces = [(0, 0, 200, 100), (200, 0, 100, 200), (100, 200, 200, 100),
+              (0, 100, 100, 200), (100, 100, 100, 100)]
+    with pytest.raises(ValueError):
+        sequence_sheet(300, 300, pieces, kerf=0.0)
+
+
+def test_saw_time_uses_profile() -> None:
+    """Saw time adds cut, fence and rotation costs from the profile."""
+    profile = SawProfile(feed_rate=100.0, cut_overhead=1.0, fence_move=2.0, rotation=5.0)
+    sequence = sequence_sheet(1000, 2000, [(0, 0, 400, 600)], kerf=0.0, profile=profile)
+
+    cut_time = sum(1.0 + c.length / 100.0 for c in sequence.cuts)
+    expected = cut_time + sequence.fence_moves * 2.0 + sequence.rotations * 5.0
+    assert sequence.saw_time == pytest.approx(expected)
+
+
+def test_packer_layouts_are_sequenced() -> None:
+    """Every packer layout can be turned into a cut sequence."""
+    packer = GuillotineBinPacker(kerf=3.0, saw_profile=SawProfile())
+    sheet = Sheet(id="s1", width=1220, length=2440, thickness=18, label="Ply", priority="normal")
+    cuts = [
+        Cut(id="a", width=560, length=720, thickness=18, label="Side", quantity=4),
+        Cut(id="b", width=300, length=560, thickness=18, label="Shelf", quantity=5),
+    ]
+
+    placements, unplaced = packer.optimize(cuts, [sheet])
+    sequence = sequence_sheet(sheet.width, sheet.length,
+                              [(p.x, p.y, p.width, p.length) for p in placements], kerf=3.0)
+
+    assert sorted(sequence.piece_order) == list(range(len(placements)))
+    assert sequence.saw_time > 0
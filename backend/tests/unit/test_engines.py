@@ -0,0 +1,120 @@
+"""Unit tests for the packing engine registry."""
+from dataclasses import replace
+from typing import Any
+import pytest
+from app.services.cut_sequence import SawProfile
+from app.services.engines import ENGINES, choose_engine, packing_score, resolve_engine, warm_start
+from app.services.optimizer import Cut, Placement, Sheet
+from app.services.planner import solve_plan, unchanged_sheets
+from benchmarks.instances import generate
+
+
+def _overlaps(a: Placement, b: Placement) -> bool:
+    return bool(a.x < b.x + b.width and b.x < a.x + a.width
+            and a.y < b.y + b.length and b.y < a.y + a.length)
+
+
+@pytest.mark.parametrize("name", list(ENGINES))
+def test_engines_place_pieces_inside_sheets_without_overlap(name: str) -> None:
+    """Every engine returns a valid layout for every piece it places."""
+    pieces = ENGINES[name].info.max_pieces or 60
+    instance = generate("cabinets", pieces, seed=1)
+
+    placements, unplaced, stats = ENGINES[name].optimize(instance.cuts, instance.sheets, 3.0, time_limit=0.05)
+
+    assert len(placements) + len(unplaced) == pieces == stats.pieces
+    for i, p in enumerate(placements):
+        assert p.x >= 0 and p.y >= 0
+        assert p.x + p.width <= p.sheet.width and p.y + p.length <= p.sheet.length
+        assert not any(_overlaps(p, q) for q in placements[i + 1:] if q.sheet.id == p.sheet.id)
+
+
+@pytest.mark.parametrize("name", ["search", "exhaustive"])
+def test_improving_engines_never_lose_to_first_fit(name: str) -> None:
+    """Search engines start from the first-fit-decreasing layout and only keep better ones."""
+    instance = generate("slivers", 7, seed=2)
+    first_fit = ENGINES["guillotine"].optimize(instance.cuts, instance.sheets, 3.0)
+
+    placements, unplaced, _ = ENGINES[name].optimize(instance.cuts, instance.sheets, 3.0, time_limit=0.05)
+
+    assert packing_score(placements, unplaced) <= packing_score(*first_fit[:2])
+
+
+def test_saw_time_packing_keeps_the_order_an_engine_found() -> None:
+    """Minimizing saw time still tries the exhaustive engine's order, which none of the fixed orderings match."""
+    sizes = [(40, 20), (70, 80), (70, 70), (60, 50), (70, 40)]
+    cuts = [Cut(f"c{i}", w, l, 18, f"C{i}", 1) for i, (w, l) in enumerate(sizes)]
+    sheets = [Sheet("ply", 100, 100, 18, "Ply", "normal")]
+
+    placements, _, _ = ENGINES["exhaustive"].optimize(cuts, sheets, 0.0, saw_profile=SawProfile())
+
+    assert sum(p.width * p.length for p in placements) == 6600
+
+
+def test_auto_picks_engine_by_size_time_and_remnants() -> None:
+    """Tiny jobs are solved exhaustively, huge ones on strips, time limits buy a search."""
+    assert choose_engine(5) == "exhaustive"
+    assert choose_engine(500) == "guillotine"
+    assert choose_engine(500, time_limit=2.0) == "search"
+    assert choose_engine(50_000) == "shelf"
+    assert choose_engine(50_000, use_remnants=True) == "shelf"
+    assert resolve_engine("auto", 50_000, fast_pieces=100_000) == "guillotine"
+
+
+def test_shelf_fills_remnants_before_stock() -> None:
+    """The shelf engine packs remnant sheets first, like the guillotine packer."""
+    cuts = [Cut("side", 400, 700, 18, "Side", 3)]
+    sheets = [Sheet("ply", 1220, 2440, 18, "Ply", "normal", 2), Sheet("offcut", 450, 1500, 18, "Offcut", "remnant")]
+
+    placements, unplaced, _ = ENGINES["shelf"].optimize(cuts, sheets, 3.0)
+
+    assert not unplaced
+    assert [p.sheet.id for p in placements].count("offcut") == 2
+
+
+def test_resolve_engine_rejects_unusable_choices() -> None:
+    """Unknown names, oversized jobs and restart counts for unseeded engines are errors."""
+    with pytest.raises(ValueError, match="Unknown algorithm"):
+        resolve_engine("simulated-annealing", 10)
+    with pytest.raises(ValueError, match="at most"):
+        resolve_engine("exhaustive", 100)
+    with pytest.raises(ValueError, match="restart count"):
+        resolve_engine("guillotine", 100, restarts=10)
+    assert resolve_engine("auto", 500, restarts=10) == "search"
+    assert resolve_engine("shelf", 100, use_remnants=True) == "shelf"
+
+
+def test_seeded_restarts_reproduce_the_plan_on_any_number_of_workers() -> None:
+    """A restart count gives the same layout from the same seed, in one process or several."""
+    instance = generate("thicknesses", 60, seed=2)
+    first_fit = ENGINES["guillotine"].optimize(instance.cuts, instance.sheets, 3.0)
+
+    def search(random_seed: int, workers: int) -> tuple[tuple[float, int, float], list[Any]]:
+        placements, unplaced, _ = ENGINES["search"].optimize(
+            instance.cuts, instance.sheets, 3.0, random_seed=random_seed, restarts=20, workers=workers)
+        return packing_score(placements, unplaced), [(p.cut.id, p.sheet.id, p.x, p.y, p.rotated) for p in placements]
+
+    score, layout = search(1, workers=1)
+    assert score < packing_score(*first_fit[:2])
+    assert search(1, workers=1) == search(1, workers=2) == (score, layout)
+    assert search(2, workers=1)[1] != layout
+
+
+def test_warm_start_keeps_sheets_that_are_still_valid() -> None:
+    """A previous plan survives extra stock; sheets holding a removed cut are repacked."""
+    instance = generate("cabinets", 40, seed=3)
+    previous = solve_plan(instance.cuts, instance.sheets, 3.0)
+    seed = [(layout.source_id, layout.instance, [(p.cut.id, p.x, p.y, p.rotated) for p in layout.placements])
+            for layout in previous.layouts]
+
+    more_stock = [replace(s, quantity=s.quantity + 1, priority="high") for s in instance.sheets]
+    resolved = solve_plan(instance.cuts, more_stock, 3.0, seed=seed)
+    assert unchanged_sheets(resolved, seed) == len(previous.layouts)
+
+    dropped = instance.cuts[0].id
+    fewer_cuts = [c for c in instance.cuts if c.id != dropped]
+    kept, _ = warm_start(ENGINES["guillotine"], seed, fewer_cuts, instance.sheets, 3.0)
+    assert dropped not in {p.cut.id for p in kept}
+    holding = sum(1 for _, _, rows in seed if any(cut_id == dropped for cut_id, *_ in rows))
+    resolved = solve_plan(fewer_cuts, instance.sheets, 3.0, seed=seed)
+    assert 0 < unchanged_sheets(resolved, seed) <= len(seed) - holding
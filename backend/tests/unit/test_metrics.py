@@ -0,0 +1,56 @@
+"""Unit tests for the metrics registry and optimizer statistics."""
+import pytest
+from app.services.metrics import Counter, Gauge, Histogram, Registry
+from app.services.optimizer import Cut, GuillotineBinPacker, Sheet
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    """Buckets are cumulative 'le' counts followed by _sum and _count."""
+    histogram = Histogram("phase_seconds", "Phase time", ("phase",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, phase="pack")
+
+    lines = histogram.render().splitlines()
+
+    assert lines[:2] == ["# HELP phase_seconds Phase time", "# TYPE phase_seconds histogram"]
+    assert lines[2:] == [
+        'phase_seconds_bucket{phase="pack",le="0.1"} 2',
+        'phase_seconds_bucket{phase="pack",le="1"} 3',
+        'phase_seconds_bucket{phase="pack",le="+Inf"} 4',
+        'phase_seconds_sum{phase="pack"} 3.65',
+        'phase_seconds_count{phase="pack"} 4',
+    ]
+
+
+def test_registry_renders_counters_and_callback_gauges() -> None:
+    """Callback gauges are read at render time; names must be unique."""
+    registry = Registry()
+    counter = registry.register(Counter("hits_total", "Hits", ("cache",)))
+    depth = {"small": 3}
+    registry.register(Gauge("queue_depth", "Waiting", ("lane",),
+                            callback=lambda: {(k,): v for k, v in depth.items()}))
+    counter.inc(cache="plans")
+    counter.inc(2, cache="plans")
+    depth["small"] = 5
+
+    text = registry.render()
+
+    assert 'hits_total{cache="plans"} 3' in text
+    assert 'queue_depth{lane="small"} 5' in text
+    with pytest.raises(ValueError):
+        registry.register(Counter("hits_total", "Again"))
+
+
+def test_packer_collects_phase_statistics() -> None:
+    """optimize() leaves per-sheet timings and free-rectangle peaks in stats."""
+    packer = GuillotineBinPacker(kerf=3.0)
+    packer.optimize(
+        [Cut("a", 600, 1200, 18, "A", 5), Cut("b", 300, 400, 12, "B", 2)],
+        [Sheet("s", 1220, 2440, 18, "Ply", "normal", 3)],
+    )
+
+    stats = packer.stats
+    assert stats.pieces == 7
+    assert len(stats.sheet_seconds) == len(stats.free_rects) == 2  # 5 x A needs two sheets
+    assert all(count >= 1 for count in stats.free_rects)
+    assert stats.expand_seconds >= 0 and stats.sort_seconds >= 0
@@ -1,6 +1,6 @@
 """Basic unit tests for optimizer algorithm."""
 import pytest
-from app.services.optimizer import GuillotineBinPacker, Cut, Sheet, Rectangle
+from app.services.optimizer import GuillotineBinPacker, Cut, PieceIndex, Sheet, Rectangle
 
 
 def test_rectangle_area() -> None:
@@ -83,6 +83,41 @@ def test_pack_sheet_simple() -> None:
     assert placements[1].cut.id == "cut2"
 
 
+def test_pack_sheet_keeps_input_quantities() -> None:
+    """Cuts of several pieces are packed piece by piece without changing the caller's cuts."""
+    packer = GuillotineBinPacker(kerf=3.0)
+    sheet = Sheet(id="sheet1", width=1000, length=1250, thickness=18, label="Test Sheet", priority="normal")
+    cuts = [
+        Cut(id="big", width=450, length=450, thickness=18, label="Big", quantity=5),
+        Cut(id="small", width=200, length=200, thickness=18, label="Small", quantity=2),
+    ]
+
+    placements, remaining = packer.pack_sheet(cuts, sheet)
+
+    assert [p.cut.id for p in placements] == ["big"] * 4 + ["small"] * 2
+    assert [(c.id, c.quantity) for c in remaining] == [("big", 1)]
+    assert [c.quantity for c in cuts] == [5, 2]
+
+
+def test_piece_index_finds_shapes_that_fit_a_sheet() -> None:
+    """Shapes are matched by sorted sides, so rotated pieces fit too."""
+    pieces = [
+        Cut(id="long", width=100, length=2500, thickness=18, label="Long", quantity=1),
+        Cut(id="side", width=700, length=300, thickness=18, label="Side", quantity=1),
+        Cut(id="side", width=700, length=300, thickness=18, label="Side", quantity=1),
+        Cut(id="wide", width=1300, length=200, thickness=18, label="Wide", quantity=1),
+    ]
+    index = PieceIndex(pieces)
+
+    fitting = index.fitting(2440, 1220, kerf=3.0)
+    assert [index.shapes[k] for k in fitting] == [(200, 1300), (300, 700)]
+
+    side = index.shapes.index((300, 700))
+    assert index.take(side) == 2
+    assert index.take(side) is None
+    assert [p.id for p in index.remaining()] == ["long", "wide"]
+
+
 def test_optimize_with_thickness_matching() -> None:
     """Test optimization respects thickness matching."""
     packer = GuillotineBinPacker(kerf=3.0)
@@ -97,7 +132,7 @@ def test_optimize_with_thickness_matching() -> None:
         Cut(id="c2", width=300, length=300, thickness=12, label="12mm Cut", quantity=1),
     ]
     
-    placements = packer.optimize(cuts, sheets)
+    placements, unplaced = packer.optimize(cuts, sheets)
     
     assert len(placements) == 2
     
@@ -123,8 +158,42 @@ def test_optimize_with_priority() -> None:
         Cut(id="c1", width=400, length=400, thickness=18, label="Cut 1", quantity=1),
     ]
     
-    placements = packer.optimize(cuts, sheets)
+    placements, unplaced = packer.optimize(cuts, sheets)
     
     # Should use high priority sheet first
     assert len(placements) == 1
     assert placements[0].sheet.id == "s2"
+
+
+def test_optimize_packs_remnants_first() -> None:
+    """Test remnants are used before any stock sheet."""
+    packer = GuillotineBinPacker(kerf=3.0)
+    
+    sheets = [
+        Sheet(id="s1", width=1000, length=2000, thickness=18, label="High Priority", priority="high"),
+        Sheet(id="r1", width=500, length=500, thickness=18, label="Offcut", priority="remnant"),
+    ]
+    
+    cuts = [
+        Cut(id="c1", width=400, length=400, thickness=18, label="Cut 1", quantity=1),
+    ]
+    
+    placements, unplaced = packer.optimize(cuts, sheets)
+    
+    assert len(placements) == 1
+    assert placements[0].sheet.id == "r1"
+
+
+def test_pack_stops_at_the_sheet_limit() -> None:
+    """A packing that has used the limit's sheets with pieces left can only be worse."""
+    packer = GuillotineBinPacker(kerf=3.0)
+    sheets = [Sheet(id=f"s{i}", width=1000, length=1000, thickness=18, label="Sheet", priority="normal")
+              for i in range(3)]
+    pieces = [Cut(id=f"c{i}", width=600, length=600, thickness=18, label="Cut", quantity=1) for i in range(2)]
+
+    assert packer.pack_limited(pieces, sheets, sheet_limit=lambda: 1) is None
+    packed = packer.pack_limited(pieces, sheets, sheet_limit=lambda: 2)
+    assert packed is not None
+    placements, unplaced = packed
+    assert len(placements) == 2 and not unplaced
+    assert packer.pack(pieces, sheets) == packed
@@ -0,0 +1,113 @@
+"""Unit tests for the file exports of cutting plans."""
+import csv
+import io
+from pathlib import Path
+from typing import Any
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.database import Base
+from app.models.plan_assignment import PlanAssignment
+from app.models.required_cut import RequiredCut
+from app.models.stock_sheet import StockSheet
+from app.services import export_service
+from app.services.cutting_service import load_plan_inputs, save_plan
+from app.services.export_service import check_plan_export, stream_plan_export
+from app.services.optimizer import Cut, Sheet
+from app.services.plan_export import CUT_LIST_COLUMNS, stream_cut_list, stream_dxf, stream_saw_program
+from app.services.plan_format import plan_body
+from app.services.planner import solve_plan
+
+
+def _sheet_plans() -> list[dict[str, Any]]:
+    cuts = [Cut("door", 400, 700, 18, "Door", 4), Cut("shelf", 300, 560, 18, "Shelf", 5)]
+    sheets = [Sheet("ply", 1220, 2440, 18, "Plywood", "normal", 3)]
+    sheet_plans: list[dict[str, Any]] = plan_body(solve_plan(cuts, sheets, 3.0), [], "plan-1")["sheet_plans"]
+    return sheet_plans
+
+
+def test_cut_list_has_a_row_per_piece() -> None:
+    """Every piece gets a row under its sheet number, streamed a sheet at a time."""
+    sheet_plans = _sheet_plans()
+    chunks = list(stream_cut_list(sheet_plans, first_sheet=3))
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+
+    assert len(chunks) == len(sheet_plans) + 1
+    assert list(rows[0]) == CUT_LIST_COLUMNS
+    assert len(rows) == 9
+    assert {r["sheet"] for r in rows} == {str(3 + i) for i in range(len(sheet_plans))}
+    assert sorted({r["label"] for r in rows}) == ["Door", "Shelf"]
+
+
+def test_dxf_draws_a_closed_outline_per_sheet_and_piece() -> None:
+    """Sheets and pieces are closed polylines on their layers, framed by header and EOF."""
+    sheet_plans = _sheet_plans()
+    text = "".join(stream_dxf(sheet_plans))
+    lines = text.splitlines()
+    pairs = list(zip(lines[::2], lines[1::2]))
+
+    assert pairs[:2] == [("0", "SECTION"), ("2", "HEADER")]
+    assert pairs[-1] == ("0", "EOF")
+    layers = [pairs[i + 1][1] for i, pair in enumerate(pairs) if pair == ("0", "POLYLINE")]
+    assert layers.count("SHEETS") == len(sheet_plans)
+    assert layers.count("PARTS") == 9
+    assert pairs.count(("0", "VERTEX")) == 4 * len(layers)
+
+
+def test_saw_program_lists_every_saw_cut() -> None:
+    """Each sheet block lists its sequence's cuts in order, with fence moves and rotations."""
+    sheet_plans = _sheet_plans()
+    program = "".join(stream_saw_program(sheet_plans, 3.0)).splitlines()
+
+    cut_lines = [line for line in program if line.split()[0] in ("RIP", "CROSSCUT", "TRIM")]
+    expected = [c for sheet_plan in sheet_plans for c in sheet_plan["cut_sequence"]]
+    assert [int(line.split()[1]) for line in cut_lines] == [c["step"] for c in expected]
+    assert program.count("ROTATE") == sum(c["rotate_before"] for c in expected)
+    assert sum(line.startswith("FENCE ") for line in program) == sum(c["move_fence"] for c in expected)
+    assert program[1] == f'SHEET 1 "{sheet_plans[0]["sheet_label"]}" 1220 x 2440 x 18'
+    assert program[-1] == f"END SHEET {len(sheet_plans)}"
+
+
+@pytest.mark.asyncio
+async def test_stored_plan_exports_as_planned_after_its_rows_are_deleted(tmp_path: Path,
+                                                                        monkeypatch: pytest.MonkeyPatch) -> None:
+    """Exports read the sheets and cuts as planned, in plan order, even once stock and cuts are gone."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'export.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(export_service, "AsyncSessionLocal", sessions)
+
+    async with sessions() as db:
+        db.add_all([
+            StockSheet(id="ply", width=1220, length=2440, thickness=18, label="Plywood", quantity=3),
+            RequiredCut(id="door", width=400, length=700, thickness=18, label="Door", quantity=4),
+            RequiredCut(id="shelf", width=300, length=560, thickness=18, label="Shelf", quantity=5),
+        ])
+        await db.commit()
+        _, cuts, sheets = await load_plan_inputs(db)
+        solved = solve_plan(cuts, sheets, 3.0)
+        plan = await save_plan(db, solved)
+        expected = plan_body(solved, [], plan.id)["sheet_plans"]
+
+        await db.execute(delete(RequiredCut))
+        await db.execute(delete(StockSheet))
+        await db.commit()
+        await check_plan_export(db, plan)
+
+    rows = list(csv.DictReader(io.StringIO("".join([chunk async for chunk in stream_plan_export(plan, "csv")]))))
+    assert [(r["sheet"], r["sheet_label"], r["label"], r["x"], r["y"]) for r in rows] == [
+        (str(number), sheet_plan["sheet_label"], a["cut_label"], f'{a["x_position"]:g}', f'{a["y_position"]:g}')
+        for number, sheet_plan in enumerate(expected, start=1) for a in sheet_plan["assignments"]
+    ]
+
+    last = len(expected)
+    program = "".join([chunk async for chunk in stream_plan_export(plan, "saw", sheet=last)]).splitlines()
+    assert program[1] == f'SHEET {last} "{expected[-1]["sheet_label"]}" 1220 x 2440 x 18'
+
+    async with sessions() as db:
+        # Plans stored without the planned sizes need the deleted rows
+        await db.execute(update(PlanAssignment).values(cut_width=None))
+        with pytest.raises(ValueError, match="required cuts"):
+            await check_plan_export(db, plan)
+    await engine.dispose()
@@ -0,0 +1,142 @@
+"""Unit tests for plan response building and the columnar format."""
+import gzip
+import zlib
+import pytest
+from starlette.types import Message, Receive, Scope, Send
+from app.models.cutting_plan import CuttingPlan
+from app.services.compression import CompressionMiddleware
+from app.services.cutting_service import build_plan_response
+from app.services.optimizer import Cut, Sheet
+from app.services.plan_format import COLUMNAR
+from app.services.planner import solve_plan
+from app.schemas.plan import ColumnarCuttingPlanResponse, CuttingPlanResponse
+
+
+def _body(columnar: bool = False) -> dict:
+    cuts = [Cut("door", 400, 700, 18, "Door", 4), Cut("shelf", 300, 560, 18, "Shelf", 3)]
+    sheets = [Sheet("ply", 1220, 2440, 18, "Plywood", "normal", 2)]
+    solved = solve_plan(cuts, sheets, 3.0, True)
+    plan = CuttingPlan(id="plan-1", total_waste=solved.total_waste, kerf_width=3.0,
+                       sheets_used=len(solved.layouts), estimated_saw_time=solved.saw_time)
+    return build_plan_response(plan, solved, [], columnar)
+
+
+def test_plan_body_matches_response_schema() -> None:
+    """The plain-dict body validates against CuttingPlanResponse."""
+    body = _body()
+    body["created_at"] = "2024-01-01T00:00:00"
+    plan = CuttingPlanResponse.model_validate(body)
+    assert sum(len(s.assignments) for s in plan.sheet_plans) == 7
+
+
+def test_columnar_body_matches_response_schema() -> None:
+    """The columnar body validates against ColumnarCuttingPlanResponse."""
+    body = _body(columnar=True)
+    body["created_at"] = "2024-01-01T00:00:00"
+    plan = ColumnarCuttingPlanResponse.model_validate(body)
+    assert sum(len(s.assignments.cut) for s in plan.sheet_plans) == 7
+    assert len(plan.cuts.id) == 2
+
+
+def test_columnar_body_rebuilds_the_object_body() -> None:
+    """Each assignment and saw cut of the object body can be rebuilt from the columnar body."""
+    body = _body()
+    columnar = _body(columnar=True)
+
+    assert columnar["format"] == COLUMNAR
+    assert sorted(columnar["cuts"]["id"]) == ["door", "shelf"]  # each cut listed once
+    cuts = columnar["cuts"]
+    for original, packed in zip(body["sheet_plans"], columnar["sheet_plans"], strict=True):
+        columns = packed["assignments"]
+        rebuilt = [
+            {
+                "cut_id": cuts["id"][c],
+                "cut_label": cuts["label"][c],
+                "sheet_id": packed["sheet_id"],
+                "sheet_label": packed["sheet_label"],
+                "x_position": x,
+                "y_position": y,
+                "rotation": r,
+                "sequence_number": i + 1,
+                "width": cuts["width"][c],
+                "length": cuts["length"][c],
+                "thickness": cuts["thickness"][c],
+            }
+            for i, (c, x, y, r) in enumerate(zip(columns["cut"], columns["x_position"],
+                                                 columns["y_position"], columns["rotation"]))
+        ]
+        assert rebuilt == original["assignments"]
+        saw_cuts = packed["cut_sequence"]
+        assert [
+            {"step": i + 1, **{column: saw_cuts[column][i] for column in saw_cuts}}
+            for i in range(len(saw_cuts["kind"]))
+        ] == original["cut_sequence"]
+        assert packed["waste_area"] == original["waste_area"]
+    for key in ("total_waste", "sheets_used", "estimated_saw_time", "unplaced_cuts", "unused_sheets"):
+        assert columnar[key] == body[key]
+
+
+@pytest.mark.asyncio
+async def test_compression_skips_small_and_gzips_large() -> None:
+    """Bodies under the minimum size pass through; larger ones are gzipped."""
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        body = b"x" * int(scope["path"].strip("/"))
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    middleware = CompressionMiddleware(app, minimum_size=100)
+
+    async def receive() -> Message:
+        return {"type": "http.request"}
+
+    async def call(size: int) -> list:
+        sent = []
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+
+        scope = {"type": "http", "path": f"/{size}", "headers": [(b"accept-encoding", b"gzip")]}
+        await middleware(scope, receive, send)
+        return sent
+
+    start, body = await call(10)
+    assert (b"content-encoding", b"gzip") not in start["headers"]
+    assert body["body"] == b"x" * 10
+
+    start, body = await call(5000)
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert int(headers[b"content-length"]) == len(body["body"])
+    assert gzip.decompress(body["body"]) == b"x" * 5000
+
+
+@pytest.mark.asyncio
+async def test_compression_flushes_each_streamed_chunk() -> None:
+    """Every chunk of a streamed body decodes on arrival, so a preview line isn't held back."""
+    preview, plan = b'{"preview":true}\n', b'{"preview":false}\n'
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/x-ndjson")]})
+        await send({"type": "http.response.body", "body": preview, "more_body": True})
+        await send({"type": "http.response.body", "body": plan, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive() -> Message:
+        return {"type": "http.request"}
+
+    sent = []
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+    await CompressionMiddleware(app, minimum_size=100)(scope, receive, send)
+
+    start, *chunks = sent
+    assert dict(start["headers"])[b"content-encoding"] == b"gzip"
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(chunks[0]["body"]) == preview
+    assert decoder.decompress(chunks[1]["body"]) == plan
+    assert gzip.decompress(b"".join(chunk["body"] for chunk in chunks)) == preview + plan
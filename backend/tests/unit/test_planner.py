@@ -0,0 +1,63 @@
+"""Unit tests for the database-free planning pipeline."""
+import pickle
+from app.services.optimizer import Cut, Sheet
+from app.services.planner import SolvedPlan, plan_input_key, solve_plan, solve_preview, split_instance_id
+
+
+def test_split_instance_id() -> None:
+    """Expanded sheet ids map back to the stored sheet and its instance."""
+    assert split_instance_id("abc__inst2") == ("abc", 2)
+    assert split_instance_id("abc") == ("abc", 0)
+
+
+def test_solve_plan_layouts_follow_saw_order() -> None:
+    """Each used sheet instance gets a layout whose placements follow its cut sequence."""
+    cuts = [Cut(id="c1", width=560, length=720, thickness=18, label="Side", quantity=6)]
+    sheets = [Sheet(id="s1", width=1220, length=2440, thickness=18, label="Ply", priority="normal", quantity=2)]
+
+    solved = solve_plan(cuts, sheets, kerf_width=3.0)
+
+    assert not solved.unplaced
+    assert sum(len(layout.placements) for layout in solved.layouts) == 6
+    assert {layout.source_id for layout in solved.layouts} == {"s1"}
+    for layout in solved.layouts:
+        assert len(layout.sequence.piece_order) == len(layout.placements)
+    assert solved.saw_time == sum(layout.sequence.saw_time for layout in solved.layouts)
+
+    # Results cross the solver pool's process boundary
+    assert pickle.loads(pickle.dumps(solved)).total_waste == solved.total_waste
+
+
+def test_solve_preview_packs_like_the_full_solve_without_sequencing() -> None:
+    """The preview places the same pieces as a guillotine solve, in packing order and with no saw cuts."""
+    cuts = [
+        Cut(id="c1", width=560, length=720, thickness=18, label="Side", quantity=6),
+        Cut(id="c2", width=300, length=500, thickness=18, label="Shelf", quantity=5),
+    ]
+    sheets = [Sheet(id="s1", width=1220, length=2440, thickness=18, label="Ply", priority="normal", quantity=3)]
+
+    preview = solve_preview(cuts, sheets, kerf_width=3.0)
+    solved = solve_plan(cuts, sheets, kerf_width=3.0, algorithm="guillotine")
+
+    def pieces(plan: SolvedPlan) -> list[tuple[str, str, float, float, bool]]:
+        return sorted((layout.sheet.id, p.cut.id, p.x, p.y, p.rotated)
+                      for layout in plan.layouts for p in layout.placements)
+
+    assert pieces(preview) == pieces(solved)
+    assert preview.total_waste == solved.total_waste
+    assert preview.saw_time == 0
+    assert all(not layout.sequence.cuts for layout in preview.layouts)
+
+
+def test_plan_input_key_ignores_load_order() -> None:
+    """The coalescing key depends on what is solved, not the order it was loaded in."""
+    cuts = [
+        Cut(id="c1", width=560, length=720, thickness=18, label="Side", quantity=2),
+        Cut(id="c2", width=300, length=500, thickness=18, label="Shelf", quantity=4),
+    ]
+    sheets = [Sheet(id="s1", width=1220, length=2440, thickness=18, label="Ply", priority="normal")]
+
+    key = plan_input_key(cuts, sheets, 3.0)
+    assert plan_input_key(cuts[::-1], sheets, 3) == key
+    assert plan_input_key(cuts, sheets, 3.0, minimize_saw_time=True) != key
+    assert plan_input_key(cuts, sheets, 4.0) != key
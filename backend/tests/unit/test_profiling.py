@@ -0,0 +1,49 @@
+"""Unit tests for optimization profiles and replayable fixtures."""
+from pathlib import Path
+import pytest
+from app.config import settings
+from app.services.optimizer import Cut, Sheet
+from app.services.profiling import (PROFILE, artifact_path, hotspots, load_fixture, new_artifact_id,
+                                    save_fixture, save_profile)
+from app.services.solver_worker import Job, encode_job, profile_job, solve_job
+
+
+def _job() -> Job:
+    return encode_job(
+        [Cut("c1", 560, 720, 18, "Side", 4), Cut("c2", 300, 400, 18, "Shelf", 3)],
+        [Sheet("s1", 1220, 2440, 18, "Ply", "normal", 2)],
+        3.0,
+        minimize_saw_time=True,
+    )
+
+
+def test_fixture_replays_the_same_solve(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A saved fixture loads back into a job with an identical result."""
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    job = _job()
+
+    path = save_fixture(new_artifact_id(), job)
+
+    assert load_fixture(path) == job
+    assert solve_job(load_fixture(path))[:2] == solve_job(job)[:2]  # [2] is timings
+
+
+def test_profile_summarises_hotspots(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Profiled solves return the plain result plus stats pstats can read."""
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    job = _job()
+
+    result, raw_stats = profile_job(job)
+    spots = hotspots(save_profile(new_artifact_id(), raw_stats), 5)
+
+    assert result[:2] == solve_job(job)[:2]
+    assert len(spots) == 5
+    assert spots == sorted(spots, key=lambda s: s["own_seconds"], reverse=True)
+
+
+def test_artifact_ids_cannot_escape_the_profile_dir() -> None:
+    """Only generated ids and known kinds map to a path."""
+    assert artifact_path("../../etc/passwd", PROFILE) is None
+    assert artifact_path(new_artifact_id(), "settings") is None
+    path = artifact_path(new_artifact_id(), PROFILE)
+    assert path is not None and path.suffix == ".prof"
@@ -0,0 +1,45 @@
+"""Unit tests for the stock purchase planner."""
+import pytest
+from app.services.optimizer import Cut
+from app.services.purchase import SheetType, plan_purchase
+from app.services.solver_worker import Job, pack_job
+
+FULL = SheetType("Full", 1220, 2440, 18, unit_price=60)
+QUARTER = SheetType("Quarter", 610, 1220, 18, unit_price=10)
+
+
+async def _pack(job: Job) -> tuple[dict[str, int], int]:
+    return pack_job(job)
+
+
+@pytest.mark.asyncio
+async def test_mixing_sizes_beats_any_single_size() -> None:
+    """The table top needs a full sheet, the small parts are cheaper on quarter sheets."""
+    cuts = [
+        Cut(id="top", width=1000, length=2000, thickness=18, label="Top", quantity=1),
+        Cut(id="rail", width=500, length=500, thickness=18, label="Rail", quantity=4),
+    ]
+
+    purchase = await plan_purchase(cuts, [FULL, QUARTER], 3.0, _pack, parallelism=2)
+
+    # Full sheets only would need two (120); quarter sheets can't hold the top
+    assert purchase.quantities == [1, 2]
+    assert purchase.cost == 80
+    assert purchase.complete and purchase.evaluated >= 2
+    assert [s.quantity for s in purchase.sheets()] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_lower_bound_prunes_and_rejects_unfittable_cuts() -> None:
+    """Mixes that can't beat the incumbent on area alone are never packed."""
+    cuts = [Cut(id="side", width=560, length=720, thickness=18, label="Side", quantity=7)]
+    pricey = SheetType("Pricey", 1220, 2440, 18, unit_price=500)
+
+    purchase = await plan_purchase(cuts, [FULL, pricey], 3.0, _pack)
+
+    assert purchase.quantities == [2, 0]
+    # Two singles and one Full-first mix are packed; Pricey-first is bounded out
+    assert purchase.evaluated == 3 and purchase.pruned == 1
+    with pytest.raises(ValueError, match="6mm"):
+        await plan_purchase([Cut(id="back", width=600, length=700, thickness=6, label="Back", quantity=1)],
+                            [FULL], 3.0, _pack)
@@ -0,0 +1,77 @@
+"""Unit tests for the remnant inventory."""
+from pathlib import Path
+from typing import AsyncIterator
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.database import Base
+from app.models.plan_assignment import PlanAssignment
+from app.models.remnant import Remnant
+from app.models.required_cut import RequiredCut
+from app.models.stock_sheet import StockSheet
+from app.services.cutting_service import load_plan_inputs, save_plan
+from app.services.optimizer import Cut
+from app.services.planner import solve_plan
+from app.services.remnant_service import REMNANT_PRIORITY, find_remnants, harvest_plan_remnants, remnant_sheets
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> AsyncIterator[AsyncSession]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'remnants.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_find_remnants_filters_by_thickness_and_size(db: AsyncSession) -> None:
+    """Only in-stock remnants of the thickness with both sides big enough match, smallest first."""
+    db.add_all([
+        Remnant(id="big", width=600, length=1200, thickness=18, label="Big"),
+        Remnant(id="small", width=400, length=800, thickness=18, label="Small"),
+        Remnant(id="narrow", width=200, length=2000, thickness=18, label="Narrow"),
+        Remnant(id="thin", width=600, length=1200, thickness=12, label="Thin"),
+        Remnant(id="used", width=500, length=900, thickness=18, label="Used", consumed_plan_id="plan-0"),
+    ])
+    await db.commit()
+
+    assert [r.id for r in await find_remnants(db, 18, 300, 700)] == ["small", "big"]
+    assert [r.id for r in await find_remnants(db, 18, 150, 1500)] == ["narrow"]
+    assert await find_remnants(db, 25, 100, 100) == []
+
+    sheets = await remnant_sheets(db, [Cut(id="c", width=1000, length=500, thickness=18, label="C", quantity=1)])
+    assert {s.id for s in sheets} == {"big"}
+    assert all(s.priority == REMNANT_PRIORITY and s.quantity == 1 for s in sheets)
+
+
+@pytest.mark.asyncio
+async def test_harvest_consumes_used_remnants_once(db: AsyncSession) -> None:
+    """Harvesting marks the remnants a plan used as consumed, saves its offcuts and can't run twice."""
+    db.add_all([
+        StockSheet(id="ply", width=1220, length=2440, thickness=18, label="Ply", quantity=2),
+        Remnant(id="offcut", width=500, length=1300, thickness=18, label="Offcut"),
+        Remnant(id="spare", width=500, length=1300, thickness=12, label="Spare"),
+        RequiredCut(id="side", width=450, length=1250, thickness=18, label="Side", quantity=2),
+    ])
+    await db.commit()
+
+    _, cuts, sheets = await load_plan_inputs(db, use_remnants=True)
+    plan = await save_plan(db, solve_plan(cuts, sheets, 3.0))
+    assignments = (await db.scalars(select(PlanAssignment))).all()
+    assert {a.remnant_id for a in assignments} == {"offcut", None}
+    assert all((a.sheet_id is None) != (a.remnant_id is None) for a in assignments)
+
+    created, consumed = await harvest_plan_remnants(db, plan, min_width=100, min_length=300)
+
+    assert consumed == 1
+    assert created and all(r.source_plan_id == plan.id for r in created)
+    offcut, spare = await db.get(Remnant, "offcut"), await db.get(Remnant, "spare")
+    assert offcut is not None and offcut.consumed_plan_id == plan.id
+    assert spare is not None and not spare.consumed_plan_id
+    assert "offcut" not in {r.id for r in await find_remnants(db, 18, 100, 100)}
+
+    with pytest.raises(ValueError, match="already been saved"):
+        await harvest_plan_remnants(db, plan, min_width=100, min_length=300)
@@ -0,0 +1,62 @@
+"""Unit tests for single-flight request coalescing."""
+import asyncio
+import pytest
+from app.services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_one_run() -> None:
+    """Calls with the same key made while one is in flight get its result."""
+    flight = SingleFlight()
+    runs = 0
+
+    async def work() -> int:
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        return runs
+
+    results = await asyncio.gather(*[flight.run("a", work) for _ in range(5)], flight.run("b", work))
+
+    assert results[:5] == [results[0]] * 5
+    assert runs == 2
+    assert len(flight) == 0
+    assert await flight.run("a", work) == 3  # finished keys run again
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared() -> None:
+    """Waiters receive the leader's exception."""
+    flight = SingleFlight()
+
+    async def work() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("No stock sheets available")
+
+    results = await asyncio.gather(*[flight.run("a", work) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_from_cancelled_leader() -> None:
+    """If the leading call is cancelled, a waiter runs the work itself."""
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow() -> str:
+        started.set()
+        await asyncio.sleep(10)
+        return "leader"
+
+    async def fast() -> str:
+        return "waiter"
+
+    leader = asyncio.create_task(flight.run("a", slow))
+    await started.wait()
+    waiter = asyncio.create_task(flight.run("a", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == "waiter"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
@@ -0,0 +1,34 @@
+"""Unit tests for the optimizer worker job/result encoding."""
+import pickle
+from app.services.optimizer import Cut, Sheet
+from app.services.planner import solve_plan
+from app.services.solver_worker import decode_result, encode_job, solve_job
+
+
+def test_encoded_solve_matches_in_process_solve() -> None:
+    """Decoding a worker's result rebuilds exactly what solve_plan returns."""
+    cuts = [
+        Cut(id="c1", width=560, length=720, thickness=18, label="Side", quantity=5),
+        Cut(id="c2", width=300, length=400, thickness=12, label="Back", quantity=1),
+    ]
+    sheets = [Sheet(id="s1", width=1220, length=2440, thickness=18, label="Ply", priority="normal", quantity=2)]
+
+    job = encode_job(cuts, sheets, 3.0, minimize_saw_time=True)
+    result = pickle.loads(pickle.dumps(solve_job(job)))
+    solved = decode_result(result, cuts, sheets, 3.0)
+
+    assert solved == solve_plan(cuts, sheets, 3.0, minimize_saw_time=True)
+    assert [u.cut.label for u in solved.unplaced] == ["Back"]
+
+
+def test_encoded_result_is_smaller_than_dataclass_graph() -> None:
+    """The flat encoding is what keeps worker round trips cheap."""
+    cuts = [Cut(id=f"c{i}", width=100 + i, length=200 + i, thickness=18, label=f"P{i}", quantity=3)
+            for i in range(30)]
+    sheets = [Sheet(id="s1", width=1220, length=2440, thickness=18, label="Ply", priority="normal", quantity=10)]
+
+    encoded = solve_job(encode_job(cuts, sheets, 3.0))
+    solved = solve_plan(cuts, sheets, 3.0)
+    graph = [(layout.placements, layout.sequence) for layout in solved.layouts]
+
+    assert len(pickle.dumps(encoded)) < len(pickle.dumps(graph)) / 2
@@ -127,6 +127,27 @@ async function apiCall(url, options = {}) {
     return response.json();
 }
 
+// Bulk import: upload a CSV of stock sheets or cuts in one request
+async function importCsv(kind, input) {
+    const file = input.files[0];
+    if (!file) return;
+    const form = new FormData();
+    form.append('file', file);
+    try {
+        const response = await fetch(`${API_BASE}/api/${kind}/bulk`, { method: 'POST', body: form });
+        const result = await response.json();
+        if (!response.ok) {
+            throw new Error(result.detail || 'Import failed');
+        }
+        showToast(`Imported ${result.created} row${result.created !== 1 ? 's' : ''}`, 'success');
+        await (kind === 'stock' ? loadStockSheets() : loadRequiredCuts());
+    } catch (error) {
+        showToast('Import failed: ' + error.message, 'error');
+    } finally {
+        input.value = '';
+    }
+}
+
 // Stock Sheet Functions
 async function loadStockSheets() {
     try {
@@ -444,19 +465,48 @@ async function submitRequiredCut(event) {
 // Optimization Functions
 async function runOptimization() {
     const kerfWidth = parseFloat(document.getElementById('kerf-width').value);
+    const minimizeSawTime = document.getElementById('minimize-saw-time')?.checked || false;
+    const useRemnants = document.getElementById('use-remnants')?.checked || false;
     const button = document.getElementById('optimize-btn');
     
     button.disabled = true;
     button.textContent = 'Optimizing...';
     
     try {
-        const result = await apiCall('/api/optimize/', {
+        // Preview first, then the full plan under the same id (NDJSON)
+        const response = await fetch(API_BASE + '/api/optimize/', {
             method: 'POST',
-            body: JSON.stringify({ kerf_width: kerfWidth })
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                kerf_width: kerfWidth,
+                minimize_saw_time: minimizeSawTime,
+                use_remnants: useRemnants,
+                response_format: 'columnar',
+                preview: true
+            })
         });
-        
-        state.optimizationResult = result;
-        renderOptimizationResults(result);
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.detail || 'Request failed');
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        for (;;) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffered += decoder.decode(value, { stream: true });
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            for (const line of lines.filter(Boolean)) {
+                const result = JSON.parse(line);
+                if (result.error) throw new Error(result.error);
+                state.optimizationResult = expandColumnarPlan(result);
+                renderOptimizationResults(state.optimizationResult);
+                if (result.preview) button.textContent = 'Refining...';
+            }
+        }
     } catch (error) {
         alert('Optimization failed: ' + error.message);
     } finally {
@@ -466,6 +516,12 @@ async function runOptimization() {
 }
 
 
+function formatSawTime(seconds) {
+    const minutes = Math.floor(seconds / 60);
+    const rest = Math.round(seconds % 60);
+    return minutes > 0 ? `${minutes} min ${rest} s` : `${rest} s`;
+}
+
 function renderOptimizationResults(result) {
     const container = document.getElementById('results-content');
     const section = document.getElementById('results-section');
@@ -481,6 +537,22 @@ function renderOptimizationResults(result) {
                 <div class="text-3xl font-bold text-emerald-700">${result.sheet_plans.reduce((s, p) => s + p.assignments.length, 0)}</div>
             </div>
         </div>
+        ${result.preview ? `
+            <p class="text-sm text-gray-500 text-center -mt-3 mb-6">Quick preview — refining the plan and its saw sequence...</p>
+        ` : ''}
+        ${result.estimated_saw_time ? `
+            <p class="text-sm text-gray-500 text-center -mt-3 mb-6">Estimated saw time: <span class="font-semibold text-gray-700">${formatSawTime(result.estimated_saw_time)}</span></p>
+        ` : ''}
+        ${result.sheet_plans.length && !result.preview ? `
+            <button onclick="saveOffcuts()" class="w-full mb-6 border border-gray-300 hover:bg-gray-50 text-gray-700 text-sm font-semibold py-2 px-4 rounded-lg transition-colors">
+                Save usable offcuts to inventory
+            </button>
+            <div class="grid grid-cols-3 gap-2 -mt-3 mb-6">
+                ${[['csv', 'Cut list (CSV)'], ['dxf', 'CNC (DXF)'], ['saw', 'Saw program']].map(([format, label]) => `
+                    <a href="${API_BASE}/api/plans/${result.id}/export?format=${format}" class="text-center border border-gray-300 hover:bg-gray-50 text-gray-700 text-xs font-semibold py-2 px-2 rounded-lg transition-colors">${label}</a>
+                `).join('')}
+            </div>
+        ` : ''}
         
         ${result.sheet_plans.map((plan, idx) => `
             <div class="border border-gray-200 rounded-xl overflow-hidden mb-4 shadow-sm">
@@ -488,6 +560,7 @@ function renderOptimizationResults(result) {
                     <div>
                         <span class="text-white font-semibold">Sheet ${idx + 1}: ${plan.sheet_label}</span>
                         <span class="text-blue-200 text-sm ml-3">${plan.sheet_width} × ${plan.sheet_length} mm</span>
+                        ${plan.cut_sequence?.length ? `<span class="text-blue-200 text-xs ml-3">${plan.cut_sequence.length} saw cuts · ${formatSawTime(plan.saw_time)}</span>` : ''}
                     </div>
                     <span class="bg-white/20 text-white text-xs px-2 py-1 rounded-full">
                         ${plan.assignments.length} cut${plan.assignments.length !== 1 ? 's' : ''}
@@ -572,59 +645,56 @@ function hideModal() {
     document.getElementById('modal-overlay').style.display = 'none';
 }
 
-// Storage: save unused sheets to localStorage
-function sendToStorage() {
+// Remnants: keep the offcuts of the current plan for later projects
+async function saveOffcuts() {
+    if (!state.optimizationResult) return;
+    try {
+        const result = await apiCall(`/api/remnants/harvest/${state.optimizationResult.id}`, {
+            method: 'POST',
+            body: JSON.stringify({})
+        });
+        showToast(`${result.created.length} offcut${result.created.length !== 1 ? 's' : ''} saved to inventory`, 'success');
+    } catch (error) {
+        showToast('Failed to save offcuts: ' + error.message, 'error');
+    }
+}
+
+// Storage: send unused sheets to server-side storage
+async function sendToStorage() {
     if (!state.optimizationResult?.unused_sheets?.length) return;
-    const stored = state.optimizationResult.unused_sheets.map(s => ({
+    const sheets = state.optimizationResult.unused_sheets.map(s => ({
         label: s.label,
         width: s.width,
         length: s.length,
         thickness: s.thickness,
         quantity: s.quantity,
-        priority: s.priority
+        priority: s.priority || 'normal'
     }));
-    localStorage.setItem('woodcutter_stored_sheets', JSON.stringify(stored));
-    showToast(`${stored.length} sheet type${stored.length !== 1 ? 's' : ''} sent to storage`, 'success');
-}
-
-// Load stored sheets from localStorage via API
-async function loadStoredSheets() {
-    const raw = localStorage.getItem('woodcutter_stored_sheets');
-    if (!raw) return;
     try {
-        const sheets = JSON.parse(raw);
-        for (const s of sheets) {
-            await apiCall('/api/stock/', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    label: `[Stored] ${s.label}`,
-                    width: s.width,
-                    length: s.length,
-                    thickness: s.thickness,
-                    quantity: s.quantity,
-                    priority: s.priority || 'normal'
-                })
-            });
-        }
-        localStorage.removeItem('woodcutter_stored_sheets');
-        showToast(`Loaded ${sheets.length} stored sheet type${sheets.length !== 1 ? 's' : ''}`, 'success');
-    } catch (e) {
-        console.error('Failed to load stored sheets:', e);
+        await apiCall('/api/storage/', {
+            method: 'PUT',
+            body: JSON.stringify(sheets)
+        });
+        showToast(`${sheets.length} sheet type${sheets.length !== 1 ? 's' : ''} sent to storage`, 'success');
+    } catch (error) {
+        showToast('Failed to send sheets to storage: ' + error.message, 'error');
     }
 }
 
 async function newProject() {
     if (!confirm('Start a new project? Current stock sheets and cuts will be cleared. Stored sheets will be loaded.')) return;
     try {
-        await Promise.all([
-            apiCall('/api/stock', { method: 'DELETE' }),
-            apiCall('/api/cuts', { method: 'DELETE' })
-        ]);
+        // Clears cuts and stock and loads storage in a single transaction
+        const result = await apiCall('/api/storage/new-project', { method: 'POST' });
         state.optimizationResult = null;
         document.getElementById('results-section').style.display = 'none';
-        await loadStoredSheets();
-        await Promise.all([loadStockSheets(), loadRequiredCuts()]);
+        state.stockSheets = result.stock_sheets;
+        state.requiredCuts = [];
+        renderStockSheets();
+        renderRequiredCuts();
+        if (result.loaded_from_storage) {
+            showToast(`Loaded ${result.loaded_from_storage} stored sheet type${result.loaded_from_storage !== 1 ? 's' : ''}`, 'success');
+        }
     } catch (error) {
         alert('Failed to start new project: ' + error.message);
     }
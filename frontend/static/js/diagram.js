@@ -328,6 +328,46 @@ function renderSheetDiagram(sheetPlan, containerWidth = 800) {
     return svg;
 }
 
+/**
+ * Turn a plan returned with response_format "columnar" back into the
+ * object form (assignments and saw cuts as arrays of objects).
+ */
+function expandColumnarPlan(plan) {
+    if (plan.format !== 'columnar') return plan;
+    const cuts = plan.cuts;
+    const rows = (columns, build) => {
+        const keys = Object.keys(columns);
+        const n = keys.length ? columns[keys[0]].length : 0;
+        return Array.from({ length: n }, (_, i) => build(i, keys));
+    };
+    const sheetPlans = plan.sheet_plans.map(sheetPlan => ({
+        ...sheetPlan,
+        assignments: rows(sheetPlan.assignments, i => {
+            const c = sheetPlan.assignments.cut[i];
+            return {
+                cut_id: cuts.id[c],
+                cut_label: cuts.label[c],
+                sheet_id: sheetPlan.sheet_id,
+                sheet_label: sheetPlan.sheet_label,
+                x_position: sheetPlan.assignments.x_position[i],
+                y_position: sheetPlan.assignments.y_position[i],
+                width: cuts.width[c],
+                length: cuts.length[c],
+                thickness: cuts.thickness[c],
+                rotation: sheetPlan.assignments.rotation[i],
+                sequence_number: i + 1
+            };
+        }),
+        cut_sequence: rows(sheetPlan.cut_sequence, (i, keys) => {
+            const cut = { step: i + 1 };
+            keys.forEach(key => { cut[key] = sheetPlan.cut_sequence[key][i]; });
+            return cut;
+        })
+    }));
+    const { format, cuts: _cuts, ...rest } = plan;
+    return { ...rest, sheet_plans: sheetPlans };
+}
+
 /**
  * Render all sheet diagrams into the given container element.
  */